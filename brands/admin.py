@@ -16,6 +16,8 @@ class BrandAdmin(admin.ModelAdmin):
         'name', 
         'daily_budget', 
         'monthly_budget', 
+        'timezone',
+        'budget_enforcement',
         'total_daily_spend_display',
         'total_monthly_spend_display',
         'daily_remaining_display',
@@ -23,13 +25,19 @@ class BrandAdmin(admin.ModelAdmin):
         'created_at'
     ]
     
-    list_filter = ['created_at', 'updated_at']
+    list_filter = ['timezone', 'budget_enforcement', 'created_at', 'updated_at']
     search_fields = ['name']
-    readonly_fields = ['id', 'created_at', 'updated_at']
+    readonly_fields = [
+        'id', 'daily_spend', 'daily_period', 'monthly_spend', 'monthly_period', 'created_at', 'updated_at'
+    ]
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('name', 'daily_budget', 'monthly_budget')
+            'fields': ('name', 'daily_budget', 'monthly_budget', 'timezone', 'budget_enforcement')
+        }),
+        ('Spend Totals', {
+            'fields': ('daily_spend', 'daily_period', 'monthly_spend', 'monthly_period'),
+            'classes': ('collapse',)
         }),
         ('System Information', {
             'fields': ('id', 'created_at', 'updated_at'),
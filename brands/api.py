@@ -1,11 +1,23 @@
+from typing import Any, Dict
 from rest_framework import serializers, viewsets
-from .models import Brand
+from .models import BUDGET_PERIODS, Brand, current_spend
 
 class BrandSerializer(serializers.ModelSerializer):
     class Meta:
         model = Brand
         fields = '__all__'
 
+    def to_representation(self, instance: Brand) -> Dict[str, Any]:
+        data = super().to_representation(instance)
+        # Totals from an earlier day or month read as zero
+        today = instance.local_date()
+        for period in BUDGET_PERIODS:
+            spend = current_spend(
+                period, getattr(instance, f'{period}_spend'), getattr(instance, f'{period}_period'), today
+            )
+            data[f'{period}_spend'] = self.fields[f'{period}_spend'].to_representation(spend)
+        return data
+
 class BrandViewSet(viewsets.ModelViewSet):
     queryset = Brand.objects.all()
-    serializer_class = BrandSerializer 
\ No newline at end of file
+    serializer_class = BrandSerializer 
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:10
+
+import brands.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brands', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brand',
+            name='timezone',
+            field=models.CharField(default='UTC', help_text="IANA timezone the brand's budget days and schedules are in", max_length=64, validators=[brands.models.validate_timezone]),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:20
+
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def initialize_totals(apps, schema_editor):
+    """Sum the current counters of each brand's campaigns into its totals."""
+    from brands.models import current_spend, period_start
+
+    Brand = apps.get_model('brands', 'Brand')
+    Campaign = apps.get_model('campaigns', 'Campaign')
+    now = timezone.now()
+
+    for brand in Brand.objects.all():
+        today = now.astimezone(ZoneInfo(brand.timezone)).date()
+        totals = {'daily': Decimal('0.00'), 'monthly': Decimal('0.00')}
+        for campaign in Campaign.objects.filter(brand_id=brand.pk):
+            for period in totals:
+                totals[period] += current_spend(
+                    period,
+                    getattr(campaign, f'{period}_spend'),
+                    getattr(campaign, f'{period}_period'),
+                    today
+                )
+        Brand.objects.filter(pk=brand.pk).update(
+            daily_spend=totals['daily'],
+            daily_period=today,
+            monthly_spend=totals['monthly'],
+            monthly_period=period_start('monthly', today)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brands', '0002_brand_timezone'),
+        ('campaigns', '0003_campaign_spend_periods'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brand',
+            name='budget_enforcement',
+            field=models.CharField(choices=[('CAMPAIGN', 'Per Campaign'), ('BRAND', 'Brand Total')], default='CAMPAIGN', help_text="Compare the budgets with each campaign's spend, or with the brand's total spend and pause every campaign once it is reached", max_length=20),
+        ),
+        migrations.AddField(
+            model_name='brand',
+            name='daily_spend',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text="Total spend of the brand's campaigns for the current day", max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='brand',
+            name='monthly_spend',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, help_text="Total spend of the brand's campaigns for the current month", max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='brand',
+            name='daily_period',
+            field=models.DateField(blank=True, editable=False, help_text='Local date the daily spend belongs to; an earlier date means the daily spend is zero', null=True),
+        ),
+        migrations.AddField(
+            model_name='brand',
+            name='monthly_period',
+            field=models.DateField(blank=True, editable=False, help_text='First day of the local month the monthly spend belongs to; an earlier month means it is zero', null=True),
+        ),
+        migrations.RunPython(initialize_totals, migrations.RunPython.noop),
+    ]
@@ -3,20 +3,76 @@ Brand models for budget management system.
 """
 
 from __future__ import annotations
-from typing import Any, Optional
-from django.db import models
+from typing import Any, Dict, Iterable, Optional, Tuple
+from datetime import date, datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
+from django.utils import timezone as django_timezone
 from decimal import Decimal
 from typing import List
 import uuid
 
 
+# Budget periods with a spend counter on each brand and campaign
+BUDGET_PERIODS = ('daily', 'monthly')
+
+# Brand counters maintained by the campaign spend writes, never by saves
+SPEND_TOTAL_FIELDS = ('daily_spend', 'daily_period', 'monthly_spend', 'monthly_period')
+
+
+def period_start(period: str, local_date: date) -> date:
+    """Get the first day of the budget period containing a local date."""
+    if period == 'daily':
+        return local_date
+    if period == 'monthly':
+        return local_date.replace(day=1)
+    raise ValueError(f"Invalid budget period: {period}")
+
+
+def current_spend(period: str, spend: Decimal, stamp: Optional[date], local_date: date) -> Decimal:
+    """
+    Get a spend counter's value for the period containing a local date.
+
+    Args:
+        period: ``'daily'`` or ``'monthly'``
+        spend: The stored counter
+        stamp: The period the counter belongs to (None if never stamped)
+        local_date: Today in the brand's timezone
+
+    Returns:
+        The counter, or zero if it belongs to an earlier period
+    """
+    if stamp is not None and stamp < period_start(period, local_date):
+        return Decimal('0.00')
+    return Decimal(spend)
+
+
+def validate_timezone(value: str) -> None:
+    """Validate that a value is an IANA timezone name."""
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValidationError(f"Unknown timezone: {value}")
+
+
+class BudgetEnforcement(models.TextChoices):
+    """How a brand's budgets are enforced."""
+    CAMPAIGN = 'CAMPAIGN', 'Per Campaign'
+    BRAND = 'BRAND', 'Brand Total'
+
+
 class Brand(models.Model):
     """
     Brand model representing a client/advertiser.
     
     Each brand has daily and monthly budgets that control
-    the spending limits for all its campaigns.
+    the spending limits for all its campaigns. The brand's total spend
+    across its campaigns is kept in its own counters, incremented in the
+    same transaction as the campaign counters.
     """
     
     id: models.UUIDField = models.UUIDField(
@@ -45,8 +101,56 @@ class Brand(models.Model):
         help_text="Monthly budget for the brand"
     )
     
+    timezone: models.CharField = models.CharField(
+        max_length=64,
+        default='UTC',
+        validators=[validate_timezone],
+        help_text="IANA timezone the brand's budget days and schedules are in"
+    )
+    
+    budget_enforcement: models.CharField = models.CharField(
+        max_length=20,
+        choices=BudgetEnforcement.choices,
+        default=BudgetEnforcement.CAMPAIGN,
+        help_text="Compare the budgets with each campaign's spend, or with the brand's total "
+                  "spend and pause every campaign once it is reached"
+    )
+    
+    daily_spend: models.DecimalField = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+        help_text="Total spend of the brand's campaigns for the current day"
+    )
+    
+    monthly_spend: models.DecimalField = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        editable=False,
+        help_text="Total spend of the brand's campaigns for the current month"
+    )
+    
+    daily_period: models.DateField = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Local date the daily spend belongs to; an earlier date means the daily spend is zero"
+    )
+    
+    monthly_period: models.DateField = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="First day of the local month the monthly spend belongs to; an earlier month means it is zero"
+    )
+    
     created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
     updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+
+    # Timezone as loaded; the scheduling app replans campaigns when it changes
+    _initial_timezone: Optional[str] = None
     
     class Meta:
         db_table = 'brands'
@@ -58,6 +162,18 @@ class Brand(models.Model):
     def __str__(self) -> str:
         return str(self.name)
     
+    def get_tzinfo(self) -> ZoneInfo:
+        """Get the brand's timezone."""
+        return ZoneInfo(self.timezone)
+    
+    def localtime(self, moment: Optional[datetime] = None) -> datetime:
+        """Convert a moment (defaults to now) to the brand's local time."""
+        return (moment or django_timezone.now()).astimezone(self.get_tzinfo())
+    
+    def local_date(self, moment: Optional[datetime] = None) -> date:
+        """Get the brand's local date at a moment (defaults to now)."""
+        return self.localtime(moment).date()
+    
     def get_daily_budget(self) -> Decimal:
         return Decimal(str(self.daily_budget))
     
@@ -67,17 +183,170 @@ class Brand(models.Model):
     def get_total_campaigns(self) -> int:
         return self.campaigns.count() if hasattr(self, 'campaigns') else 0
     
-    def get_total_daily_spend(self) -> Decimal:
-        try:
-            return sum((Decimal(str(c.daily_spend)) for c in self.campaigns.all()), Decimal('0.00'))
-        except Exception:
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Save the brand without writing its spend totals.
+
+        The totals are only changed by UPDATEs applied alongside the campaign
+        counters, so saving a brand loaded earlier must not overwrite them.
+        """
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.fields
+                if not field.primary_key and field.name not in SPEND_TOTAL_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
+    def enforces_brand_total(self) -> bool:
+        """Check whether the budgets apply to the brand's total spend."""
+        return bool(self.budget_enforcement == BudgetEnforcement.BRAND)
+    
+    def get_spend(self, period: str, moment: Optional[datetime] = None) -> Decimal:
+        """
+        Get the brand's total spend of the current day or month.
+
+        The totals are re-read from the brand's row (one primary key lookup)
+        so spends tracked since the brand was loaded are included.
+
+        Args:
+            period: ``'daily'`` or ``'monthly'``
+            moment: The moment to check (defaults to now)
+
+        Returns:
+            The total, or zero if it belongs to an earlier period
+        """
+        if self._state.adding:
             return Decimal('0.00')
+        self.refresh_from_db(fields=list(SPEND_TOTAL_FIELDS))
+        return current_spend(
+            period,
+            getattr(self, f'{period}_spend'),
+            getattr(self, f'{period}_period'),
+            self.local_date(moment)
+        )
+    
+    def get_total_daily_spend(self) -> Decimal:
+        return self.get_spend('daily')
     
     def get_total_monthly_spend(self) -> Decimal:
-        try:
-            return sum((Decimal(str(c.monthly_spend)) for c in self.campaigns.all()), Decimal('0.00'))
-        except Exception:
-            return Decimal('0.00')
+        return self.get_spend('monthly')
+    
+    @staticmethod
+    def _rolled_over(period: str, start: Any, amount: Any) -> Case:
+        """
+        Build a spend total's value after adding an amount.
+
+        A total stamped with a period before ``start`` restarts from
+        ``amount`` (never below zero).
+        """
+        return Case(
+            When(**{f'{period}_period__lt': start}, then=Value(max(amount, Decimal('0.00')))),
+            default=F(f'{period}_spend') + Value(amount),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2)
+        )
+    
+    @classmethod
+    def add_to_totals(cls, deltas: Dict[Any, Tuple[Decimal, Decimal, date]]) -> None:
+        """
+        Add to the daily and monthly totals of several brands.
+
+        Called in the transaction that changed the campaign counters, after
+        the campaign rows, so brand rows are always locked second. Brands are
+        updated in primary key order, one UPDATE per brand.
+
+        Args:
+            deltas: Mapping of brand ID to ``(daily, monthly, local_date)``,
+                the change in the current day's and month's spend and the
+                brand's local date the change belongs to
+        """
+        now = django_timezone.now()
+        for brand_id in sorted(deltas, key=str):
+            daily, monthly, today = deltas[brand_id]
+            if not daily and not monthly:
+                continue
+            month = period_start('monthly', today)
+            cls.objects.filter(pk=brand_id).update(
+                daily_spend=cls._rolled_over('daily', today, daily),
+                daily_period=Case(
+                    When(daily_period__gt=today, then=F('daily_period')),
+                    default=Value(today)
+                ),
+                monthly_spend=cls._rolled_over('monthly', month, monthly),
+                monthly_period=Case(
+                    When(monthly_period__gt=month, then=F('monthly_period')),
+                    default=Value(month)
+                ),
+                updated_at=now
+            )
+    
+    @classmethod
+    def reconcile_totals(
+        cls,
+        brand_ids: Optional[Iterable[Any]] = None,
+        moment: Optional[datetime] = None,
+        repair: bool = True
+    ) -> Dict[Any, Tuple[Decimal, Decimal]]:
+        """
+        Compare brand totals with the sum of their campaigns' counters.
+
+        Args:
+            brand_ids: Brands to check (defaults to every brand)
+            moment: The moment whose local day and month are checked
+                (defaults to now)
+            repair: Rewrite the totals that disagree
+
+        Returns:
+            Mapping of drifted brand ID to its ``(daily, monthly)`` drift
+        """
+        moment = moment or django_timezone.now()
+        brands = cls.objects.order_by('pk')
+        if brand_ids is not None:
+            brands = brands.filter(pk__in=list(brand_ids))
+
+        drifts: Dict[Any, Tuple[Decimal, Decimal]] = {}
+        with transaction.atomic():
+            rows = list(brands.select_for_update().values_list('pk', 'timezone', *SPEND_TOTAL_FIELDS))
+            by_timezone: Dict[str, list] = {}
+            for row in rows:
+                by_timezone.setdefault(row[1], []).append(row)
+
+            for tz, tz_rows in by_timezone.items():
+                today = moment.astimezone(ZoneInfo(tz)).date()
+                starts = {period: period_start(period, today) for period in BUDGET_PERIODS}
+                totals = cls.objects.filter(pk__in=[row[0] for row in tz_rows]).annotate(**{
+                    f'true_{period}': Coalesce(
+                        Sum(
+                            f'campaigns__{period}_spend',
+                            filter=Q(**{f'campaigns__{period}_period__isnull': True})
+                            | Q(**{f'campaigns__{period}_period__gte': starts[period]})
+                        ),
+                        Value(Decimal('0.00')),
+                        output_field=models.DecimalField(max_digits=12, decimal_places=2)
+                    )
+                    for period in BUDGET_PERIODS
+                }).values_list('pk', 'true_daily', 'true_monthly')
+                true_totals = {brand_id: (daily, monthly) for brand_id, daily, monthly in totals}
+
+                for brand_id, _, daily_spend, daily_period, monthly_spend, monthly_period in tz_rows:
+                    true_daily, true_monthly = true_totals[brand_id]
+                    drift = (
+                        true_daily - current_spend('daily', daily_spend, daily_period, today),
+                        true_monthly - current_spend('monthly', monthly_spend, monthly_period, today)
+                    )
+                    if not any(drift):
+                        continue
+
+                    drifts[brand_id] = drift
+                    if repair:
+                        cls.objects.filter(pk=brand_id).update(
+                            daily_spend=true_daily,
+                            daily_period=starts['daily'],
+                            monthly_spend=true_monthly,
+                            monthly_period=starts['monthly'],
+                            updated_at=django_timezone.now()
+                        )
+
+        return drifts
     
     def get_remaining_daily_budget(self) -> Decimal:
         return Decimal(str(self.daily_budget)) - self.get_total_daily_spend()
@@ -183,9 +183,126 @@ class BrandModelTest(TestCase):
         )
         self.assertTrue(self.brand.is_over_monthly_budget())
 
+    def test_brand_timezone(self) -> None:
+        """Test brand timezone default, validation and local dates."""
+        from datetime import date, datetime, timezone as dt_timezone
+
+        self.assertEqual(self.brand.timezone, 'UTC')
+
+        self.brand.timezone = 'Asia/Tokyo'
+        self.brand.full_clean()
+        moment = datetime(2024, 1, 1, 16, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(self.brand.local_date(moment), date(2024, 1, 2))
+        self.assertEqual(self.brand.localtime(moment).hour, 1)
+
+        self.brand.timezone = 'Mars/Olympus_Mons'
+        with self.assertRaises(ValidationError):
+            self.brand.full_clean()
+
     def test_brand_meta_options(self) -> None:
         """Test brand meta options."""
         self.assertEqual(Brand._meta.db_table, 'brands')
         self.assertEqual(Brand._meta.ordering, ['name'])
         self.assertEqual(Brand._meta.verbose_name, 'Brand')
         self.assertEqual(Brand._meta.verbose_name_plural, 'Brands')
+
+
+class BrandSpendTotalsTest(TestCase):
+    """Test cases for the denormalized brand spend totals."""
+
+    def setUp(self) -> None:
+        """Set up a brand with two campaigns."""
+        self.brand = Brand.objects.create(
+            name="Totals Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.first = Campaign.objects.create(brand=self.brand, name="First")
+        self.second = Campaign.objects.create(brand=self.brand, name="Second")
+
+    def test_totals_follow_campaign_spends(self) -> None:
+        """Test that single, bulk and saved counter changes reach the brand totals."""
+        self.first.add_spend(Decimal('10.00'))
+        Campaign.add_spends_bulk({self.first.pk: Decimal('5.00'), self.second.pk: Decimal('20.00')})
+        self.assertEqual(self.brand.get_total_daily_spend(), Decimal('35.00'))
+        self.assertEqual(self.brand.get_total_monthly_spend(), Decimal('35.00'))
+
+        self.second.refresh_from_db()
+        self.second.reset_daily_spend()
+        self.assertEqual(self.brand.get_total_daily_spend(), Decimal('15.00'))
+        self.assertEqual(self.brand.get_total_monthly_spend(), Decimal('35.00'))
+
+        self.first.delete()
+        self.assertEqual(self.brand.get_total_daily_spend(), Decimal('0.00'))
+        self.assertEqual(self.brand.get_total_monthly_spend(), Decimal('20.00'))
+
+    def test_saving_unchanged_counters_does_not_reread_campaign(self) -> None:
+        """Test that a full save leaving the counters as loaded neither reads nor writes them."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        campaign = Campaign.objects.get(pk=self.first.pk)
+        self.first.add_spend(Decimal('100.00'))
+        campaign.name = 'Renamed'
+        with CaptureQueriesContext(connection) as queries:
+            campaign.save()
+
+        self.assertFalse([query for query in queries if query['sql'].startswith('SELECT "campaigns"."daily_spend"')])
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.name, 'Renamed')
+        self.assertEqual(self.first.daily_spend, Decimal('100.00'))
+        self.assertEqual(self.brand.get_total_daily_spend(), Decimal('100.00'))
+
+    def test_saving_stale_counters_diffs_against_stored_row(self) -> None:
+        """Test that a counter saved from a stale instance moves the brand total by what it overwrote."""
+        campaign = Campaign.objects.get(pk=self.first.pk)
+        self.first.add_spend(Decimal('100.00'))
+
+        campaign.reset_daily_spend()
+
+        self.first.refresh_from_db()
+        self.assertEqual(self.first.daily_spend, Decimal('0.00'))
+        self.assertEqual(self.brand.get_total_daily_spend(), Decimal('0.00'))
+
+    def test_total_read_is_one_query(self) -> None:
+        """Test that a brand total is read without touching its campaigns."""
+        self.first.add_spend(Decimal('10.00'))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.brand.get_total_daily_spend(), Decimal('10.00'))
+
+    def test_stale_totals_read_as_zero_and_roll_over(self) -> None:
+        """Test that totals from an earlier period read as zero until the next spend."""
+        from datetime import timedelta
+
+        self.first.add_spend(Decimal('10.00'))
+        yesterday = self.brand.local_date() - timedelta(days=1)
+        Brand.objects.filter(pk=self.brand.pk).update(daily_period=yesterday)
+        Campaign.objects.filter(pk=self.first.pk).update(daily_period=yesterday)
+        self.assertEqual(self.brand.get_total_daily_spend(), Decimal('0.00'))
+
+        self.second.add_spend(Decimal('4.00'))
+        self.assertEqual(self.brand.get_total_daily_spend(), Decimal('4.00'))
+        self.assertEqual(self.brand.daily_period, self.brand.local_date())
+
+    def test_saving_brand_keeps_totals(self) -> None:
+        """Test that saving a brand loaded before a spend does not overwrite its totals."""
+        loaded = Brand.objects.get(pk=self.brand.pk)
+        self.first.add_spend(Decimal('10.00'))
+
+        loaded.daily_budget = Decimal('50.00')
+        loaded.save()
+
+        self.assertEqual(self.brand.get_total_daily_spend(), Decimal('10.00'))
+        self.assertEqual(Brand.objects.get(pk=self.brand.pk).daily_budget, Decimal('50.00'))
+
+    def test_reconcile_totals(self) -> None:
+        """Test that drifted totals are reported and repaired from the campaign counters."""
+        self.first.add_spend(Decimal('10.00'))
+        Brand.objects.filter(pk=self.brand.pk).update(daily_spend=Decimal('3.00'))
+
+        drifts = Brand.reconcile_totals()
+
+        self.assertEqual(drifts, {self.brand.pk: (Decimal('7.00'), Decimal('0.00'))})
+        self.assertEqual(self.brand.get_total_daily_spend(), Decimal('10.00'))
+        self.assertEqual(Brand.reconcile_totals(), {})
@@ -4,6 +4,7 @@ Celery configuration for budget_system project.
 
 import os
 from celery import Celery
+from celery.signals import worker_init
 from typing import Any
 
 # Set the default Django settings module for the 'celery' program.
@@ -23,4 +24,22 @@ app.autodiscover_tasks()
 def debug_task(self: Any) -> str:
     """Debug task to test Celery configuration."""
     print(f'Request: {self.request!r}')
-    return 'Celery is working!' 
\ No newline at end of file
+    return 'Celery is working!'
+
+
+@worker_init.connect  # type: ignore[misc]
+def require_shared_cache(**kwargs: Any) -> None:
+    """
+    Refuse to start a worker whose cache is local to its own process.
+
+    Budget cache invalidation, dayparting wake-ups and the cache stats only
+    work when the web processes and workers share one cache.
+    """
+    from django.conf import settings
+    from django.core.exceptions import ImproperlyConfigured
+
+    backend = settings.CACHES['default']['BACKEND']
+    if backend == 'django.core.cache.backends.locmem.LocMemCache':
+        raise ImproperlyConfigured(
+            "Celery workers need a shared cache; set CACHE_BACKEND=redis (and CACHE_URL)"
+        )
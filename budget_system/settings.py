@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 from typing import List
 from dotenv import load_dotenv
 
@@ -162,6 +163,73 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Redis Configuration
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+
+# Cache (budget state, invalidation generation, dayparting wake-ups, cache
+# stats): Redis unless CACHE_BACKEND=locmem, local memory for testing. Local
+# memory is private to each process, so Celery workers refuse to start with
+# it (see budget_system/celery.py)
+RUNNING_TESTS = bool(os.getenv('TESTING')) or sys.argv[1:2] == ['test']
+if os.getenv('CACHE_BACKEND', 'redis') == 'redis' and not RUNNING_TESTS:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('CACHE_URL', REDIS_URL),
+            'KEY_PREFIX': 'budget_system',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds cached brand budgets and campaign counters stay valid; changes
+# made through the ORM invalidate them sooner
+BUDGET_CACHE_TTL = int(os.getenv('BUDGET_CACHE_TTL', '300'))
+
+# Spend accumulator (write-behind) mode: spends are summed in Redis and
+# flushed to the database periodically by flush_spend_accumulator_task. Each
+# campaign's persisted counters are cached in Redis for
+# SPEND_ACCUMULATOR_BUDGET_TTL seconds; budgets come from the budget cache
+SPEND_ACCUMULATOR_ENABLED = os.getenv('SPEND_ACCUMULATOR_ENABLED', 'False').lower() == 'true'
+SPEND_ACCUMULATOR_BUDGET_TTL = int(os.getenv('SPEND_ACCUMULATOR_BUDGET_TTL', '300'))
+
+# Rewrite every campaign's spend counter at each day/month rollover. When
+# disabled, counters stamped with an earlier period read as zero and are
+# rolled over by their next spend, and resets only reactivate campaigns
+# paused for budget
+SPEND_COUNTERS_EAGER_RESET = os.getenv('SPEND_COUNTERS_EAGER_RESET', 'True').lower() == 'true'
+
+# Predictive pacing: each tracked spend updates the campaign's spend velocity
+# (decaying with a PACING_VELOCITY_WINDOW second time constant) and, if the
+# budget is projected to run out within PACING_LOOKAHEAD seconds, schedules
+# a pause PACING_LEAD seconds before it does
+PACING_ENABLED = os.getenv('PACING_ENABLED', 'False').lower() == 'true'
+PACING_VELOCITY_WINDOW = int(os.getenv('PACING_VELOCITY_WINDOW', '300'))
+PACING_LOOKAHEAD = int(os.getenv('PACING_LOOKAHEAD', '300'))
+PACING_LEAD = int(os.getenv('PACING_LEAD', '5'))
+
+# Monthly spends partitions (PostgreSQL only), maintained by
+# maintain_spend_partitions_task
+SPEND_PARTITION_MONTHS_AHEAD = int(os.getenv('SPEND_PARTITION_MONTHS_AHEAD', '3'))
+SPEND_PARTITION_RETENTION_MONTHS = int(os.getenv('SPEND_PARTITION_RETENTION_MONTHS', '24'))
+
+# Longest the dayparting transitions task sleeps between runs (seconds),
+# even when no schedule boundary is due sooner
+DAYPARTING_TRANSITION_MAX_SLEEP = int(os.getenv('DAYPARTING_TRANSITION_MAX_SLEEP', '900'))
+
+# Lease locks of the periodic tasks: 'database' (task_leases table) or 'redis'
+# (REDIS_URL). Leases are renewed every TASK_LOCK_TTL / 3 seconds while a
+# task runs and lapse TASK_LOCK_TTL seconds after a worker dies
+TASK_LOCK_BACKEND = os.getenv('TASK_LOCK_BACKEND', 'database')
+TASK_LOCK_TTL = int(os.getenv('TASK_LOCK_TTL', '60'))
+
+# Number of campaign ID ranges run_sharded_task splits enforcement and resets into
+ENFORCEMENT_SHARDS = int(os.getenv('ENFORCEMENT_SHARDS', '8'))
+
 # Celery Beat Configuration
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
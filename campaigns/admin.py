@@ -6,7 +6,8 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from .models import Campaign, CampaignStatus, PauseReason
+from typing import Any
+from .models import Campaign, CampaignStatus, CampaignTransition, PauseReason
 
 
 @admin.register(Campaign)
@@ -33,14 +34,14 @@ class CampaignAdmin(admin.ModelAdmin):
     ]
     
     search_fields = ['name', 'brand__name']
-    readonly_fields = ['id', 'created_at', 'updated_at']
+    readonly_fields = ['id', 'pause_reasons_display', 'daily_period', 'monthly_period', 'created_at', 'updated_at']
     
     fieldsets = (
         ('Basic Information', {
             'fields': ('brand', 'name')
         }),
         ('Status & Budget', {
-            'fields': ('status', 'pause_reason', 'paused_at', 'daily_spend', 'monthly_spend')
+            'fields': ('status', 'pause_reason', 'pause_reasons_display', 'paused_at', 'daily_spend', 'daily_period', 'monthly_spend', 'monthly_period')
         }),
         ('System Information', {
             'fields': ('id', 'created_at', 'updated_at'),
@@ -69,7 +70,8 @@ class CampaignAdmin(admin.ModelAdmin):
     
     def daily_spend_display(self, obj: Campaign) -> str:
         """Display daily spend with color coding."""
-        percentage = (obj.daily_spend / obj.brand.daily_budget) * 100 if obj.brand.daily_budget > 0 else 0
+        spend = obj.get_daily_spend()
+        percentage = (spend / obj.brand.daily_budget) * 100 if obj.brand.daily_budget > 0 else 0
         
         if percentage >= 90:
             color = 'red'
@@ -80,14 +82,15 @@ class CampaignAdmin(admin.ModelAdmin):
         
         return format_html(
             '<span style="color: {};">${:.2f} ({:.1f}%)</span>',
-            color, obj.daily_spend, percentage
+            color, spend, percentage
         )
     daily_spend_display.short_description = 'Daily Spend'
     daily_spend_display.admin_order_field = 'daily_spend'
     
     def monthly_spend_display(self, obj: Campaign) -> str:
         """Display monthly spend with color coding."""
-        percentage = (obj.monthly_spend / obj.brand.monthly_budget) * 100 if obj.brand.monthly_budget > 0 else 0
+        spend = obj.get_monthly_spend()
+        percentage = (spend / obj.brand.monthly_budget) * 100 if obj.brand.monthly_budget > 0 else 0
         
         if percentage >= 90:
             color = 'red'
@@ -98,7 +101,7 @@ class CampaignAdmin(admin.ModelAdmin):
         
         return format_html(
             '<span style="color: {};">${:.2f} ({:.1f}%)</span>',
-            color, obj.monthly_spend, percentage
+            color, spend, percentage
         )
     monthly_spend_display.short_description = 'Monthly Spend'
     monthly_spend_display.admin_order_field = 'monthly_spend'
@@ -110,6 +113,14 @@ class CampaignAdmin(admin.ModelAdmin):
         return '-'
     pause_reason_display.short_description = 'Pause Reason'
     
+    def pause_reasons_display(self, obj: Campaign) -> str:
+        """Display every reason the campaign is paused for."""
+        reasons = obj.get_pause_reasons()
+        if reasons:
+            return ', '.join(PauseReason(reason).label for reason in reasons)
+        return '-'
+    pause_reasons_display.short_description = 'All Pause Reasons'
+    
     def activate_campaigns(self, request, queryset) -> None:
         """Admin action to activate selected campaigns."""
         activated = 0
@@ -155,3 +166,22 @@ class CampaignAdmin(admin.ModelAdmin):
             f'Successfully reset monthly spends for {queryset.count()} campaigns.'
         )
     reset_monthly_spends.short_description = "Reset monthly spends"
+
+
+@admin.register(CampaignTransition)
+class CampaignTransitionAdmin(admin.ModelAdmin):
+    """Read-only admin interface for CampaignTransition model."""
+    
+    list_display = ['campaign', 'status', 'pause_reason', 'timestamp']
+    
+    list_filter = ['status', 'pause_reason', 'campaign__brand']
+    
+    search_fields = ['campaign__name', 'campaign__brand__name']
+    
+    ordering = ['-timestamp']
+    
+    def has_add_permission(self, request: Any) -> bool:
+        return False
+    
+    def has_change_permission(self, request: Any, obj: Any = None) -> bool:
+        return False
@@ -1,11 +1,61 @@
+from typing import Any, Dict
+from django.utils import timezone
 from rest_framework import serializers, viewsets
-from .models import Campaign
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
+from .models import Campaign, CampaignTransition
 
 class CampaignSerializer(serializers.ModelSerializer):
     class Meta:
         model = Campaign
-        fields = '__all__'
+        exclude = ['schedule_bitmap', 'pause_flags']
+        read_only_fields = ['daily_period', 'monthly_period']
+
+    def to_representation(self, instance: Campaign) -> Dict[str, Any]:
+        data = super().to_representation(instance)
+        # Counters from an earlier day or month read as zero
+        data['daily_spend'] = self.fields['daily_spend'].to_representation(instance.get_daily_spend())
+        data['monthly_spend'] = self.fields['monthly_spend'].to_representation(instance.get_monthly_spend())
+        data['pause_reasons'] = instance.get_pause_reasons()
+        return data
+
+class CampaignUptimeQuerySerializer(serializers.Serializer):
+    """Range and campaigns of an uptime report (the end defaults to now)."""
+    start = serializers.DateTimeField()
+    end = serializers.DateTimeField(required=False)
+    campaign = serializers.ListField(child=serializers.UUIDField(), required=False)
+    brand = serializers.UUIDField(required=False)
+
+    def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        data.setdefault('end', timezone.now())
+        if data['start'] >= data['end']:
+            raise serializers.ValidationError("start must be before end")
+        return data
 
 class CampaignViewSet(viewsets.ModelViewSet):
-    queryset = Campaign.objects.all()
-    serializer_class = CampaignSerializer 
\ No newline at end of file
+    queryset = Campaign.objects.select_related('brand')
+    serializer_class = CampaignSerializer
+
+    # Untyped without the DRF stubs; unused-ignore keeps it quiet when they are installed
+    @action(detail=False, methods=['get'], serializer_class=CampaignUptimeQuerySerializer)  # type: ignore[misc, unused-ignore]
+    def uptime(self, request: Request) -> Response:
+        query = request.query_params
+        serializer = CampaignUptimeQuerySerializer(data={
+            **{key: query[key] for key in ('start', 'end', 'brand') if key in query},
+            **({'campaign': query.getlist('campaign')} if 'campaign' in query else {}),
+        })
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        report = CampaignTransition.time_in_state(
+            data['start'],
+            data['end'],
+            campaign_ids=data.get('campaign'),
+            brand_id=data.get('brand')
+        )
+        return Response({
+            'start': data['start'],
+            'end': data['end'],
+            'campaigns': [{'campaign': campaign_id, **entry} for campaign_id, entry in report.items()],
+        })
@@ -0,0 +1,289 @@
+"""
+Cached budget state for hot-path budget checks.
+
+Brand budgets and campaign counters/status are kept in Django's cache
+(Redis in production, local memory in tests) so budget checks and stats
+endpoints do not query the database. Entries are invalidated by the
+``Brand`` and ``Campaign`` save/delete signals. Set-based updates that
+bypass the signals call ``invalidate_campaigns`` with the rows they touched,
+or ``invalidate_all_campaigns`` when they only know a count, and every entry
+expires after ``BUDGET_CACHE_TTL`` seconds as a backstop.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+BRAND_KEY = 'budget:brand:{}'
+
+CAMPAIGN_KEY = 'budget:campaign:{}'
+
+# Bumped to invalidate every campaign entry at once
+GENERATION_KEY = 'budget:campaigns:generation'
+
+STATS_KEY = 'budget:stats:{}:{}'
+
+# Kinds of cached entries, as reported by cache_stats()
+KINDS = ('brand', 'campaign')
+
+
+@dataclass(frozen=True)
+class BrandBudget:
+    """Cached budgets of a brand (its spend totals change too often to cache)."""
+    name: str
+    daily_budget: Decimal
+    monthly_budget: Decimal
+    timezone: str
+    budget_enforcement: str
+
+    @classmethod
+    def from_brand(cls, brand: Any) -> 'BrandBudget':
+        """Build the budgets of a loaded brand."""
+        return cls(brand.name, brand.daily_budget, brand.monthly_budget, brand.timezone, brand.budget_enforcement)
+
+    def enforces_brand_total(self) -> bool:
+        """Check whether the budgets apply to the brand's total spend."""
+        from brands.models import BudgetEnforcement
+
+        return self.budget_enforcement == BudgetEnforcement.BRAND
+
+    def localtime(self, moment: Optional[datetime] = None) -> datetime:
+        """Convert a moment (defaults to now) to the brand's timezone."""
+        return (moment or timezone.now()).astimezone(ZoneInfo(self.timezone))
+
+    def local_date(self, moment: Optional[datetime] = None) -> date:
+        """Get the date in the brand's timezone."""
+        return self.localtime(moment).date()
+
+
+@dataclass(frozen=True)
+class CampaignBudget:
+    """Cached counters, status and compiled schedule of a campaign."""
+    name: str
+    brand_id: Any
+    status: str
+    pause_reason: Optional[str]
+    daily_spend: Decimal
+    daily_period: Optional[date]
+    monthly_spend: Decimal
+    monthly_period: Optional[date]
+    schedule_bitmap: Optional[bytes]
+    generation: int
+
+    def spend(self, period: str, local_date: date) -> Decimal:
+        """Get the spend of the period containing a local date (zero if the counter is stale)."""
+        from brands.models import current_spend
+
+        return current_spend(
+            period,
+            getattr(self, f'{period}_spend'),
+            getattr(self, f'{period}_period'),
+            local_date
+        )
+
+
+def _record(kind: str, outcome: str) -> None:
+    """Count a cache hit or miss."""
+    key = STATS_KEY.format(kind, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_brand_budget(brand_id: Any) -> BrandBudget:
+    """
+    Get a brand's budgets, loading them on a miss.
+
+    Raises:
+        Brand.DoesNotExist: If the brand does not exist
+    """
+    from brands.models import Brand
+
+    key = BRAND_KEY.format(brand_id)
+    cached: Optional[BrandBudget] = cache.get(key)
+    if cached is not None:
+        _record('brand', 'hits')
+        return cached
+
+    _record('brand', 'misses')
+    name, daily_budget, monthly_budget, tz, budget_enforcement = Brand.objects.values_list(
+        'name', 'daily_budget', 'monthly_budget', 'timezone', 'budget_enforcement'
+    ).get(pk=brand_id)
+    budget = BrandBudget(
+        name=name,
+        daily_budget=daily_budget,
+        monthly_budget=monthly_budget,
+        timezone=tz,
+        budget_enforcement=budget_enforcement
+    )
+    cache.set(key, budget, timeout=settings.BUDGET_CACHE_TTL)
+    return budget
+
+
+def brand_budget_for(campaign: Any) -> BrandBudget:
+    """
+    Get the budgets of a campaign's brand without fetching the brand.
+
+    Uses the brand already loaded on the campaign if there is one and the
+    cache otherwise.
+    """
+    if type(campaign).brand.is_cached(campaign):
+        return BrandBudget.from_brand(campaign.brand)
+    return get_brand_budget(campaign.brand_id)
+
+
+def can_be_activated(
+    brand_id: Any,
+    brand: BrandBudget,
+    daily_spend: Decimal,
+    monthly_spend: Decimal,
+    scheduled: bool
+) -> bool:
+    """
+    Check whether a campaign with these spends may be activated.
+
+    The campaign's spends must be under its brand's budgets, and so must the
+    brand's totals when the brand enforces them. The totals change too
+    often to cache, so they are read from the brand's row, and only then.
+
+    Args:
+        brand_id: The campaign's brand
+        brand: The brand's budgets
+        daily_spend: The campaign's spend today
+        monthly_spend: The campaign's spend this month
+        scheduled: Whether the campaign's schedule covers now
+    """
+    from brands.models import SPEND_TOTAL_FIELDS, Brand, current_spend
+
+    if daily_spend >= brand.daily_budget or monthly_spend >= brand.monthly_budget:
+        return False
+
+    if brand.enforces_brand_total():
+        daily_total, daily_period, monthly_total, monthly_period = Brand.objects.values_list(
+            *SPEND_TOTAL_FIELDS
+        ).get(pk=brand_id)
+        today = brand.local_date()
+        if (
+            current_spend('daily', daily_total, daily_period, today) >= brand.daily_budget
+            or current_spend('monthly', monthly_total, monthly_period, today) >= brand.monthly_budget
+        ):
+            return False
+
+    return scheduled
+
+
+def get_campaign_budget(campaign_id: Any) -> CampaignBudget:
+    """
+    Get a campaign's counters and status, loading them on a miss.
+
+    The entry is fetched together with the campaign generation, so
+    ``invalidate_all_campaigns`` costs no extra round trip here.
+
+    Raises:
+        Campaign.DoesNotExist: If the campaign does not exist
+    """
+    from .models import Campaign
+
+    key = CAMPAIGN_KEY.format(campaign_id)
+    values = cache.get_many([GENERATION_KEY, key])
+    generation: int = values.get(GENERATION_KEY, 0)
+    cached: Optional[CampaignBudget] = values.get(key)
+    if cached is not None and cached.generation == generation:
+        _record('campaign', 'hits')
+        return cached
+
+    _record('campaign', 'misses')
+    (
+        name, brand_id, status, pause_reason,
+        daily_spend, daily_period, monthly_spend, monthly_period, bitmap
+    ) = Campaign.objects.values_list(
+        'name', 'brand_id', 'status', 'pause_reason',
+        'daily_spend', 'daily_period', 'monthly_spend', 'monthly_period', 'schedule_bitmap'
+    ).get(pk=campaign_id)
+    budget = CampaignBudget(
+        name=name,
+        brand_id=brand_id,
+        status=status,
+        pause_reason=pause_reason,
+        daily_spend=daily_spend,
+        daily_period=daily_period,
+        monthly_spend=monthly_spend,
+        monthly_period=monthly_period,
+        schedule_bitmap=bytes(bitmap) if bitmap is not None else None,
+        generation=generation
+    )
+    cache.set(key, budget, timeout=settings.BUDGET_CACHE_TTL)
+    return budget
+
+
+def _on_commit_too(invalidate: Any) -> None:
+    """
+    Invalidate now and again once the surrounding transaction commits.
+
+    The second pass drops entries that concurrent readers reloaded from
+    the database before the change was committed.
+    """
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def invalidate_brand(brand_id: Any) -> None:
+    """Drop a brand's cached budgets."""
+    key = BRAND_KEY.format(brand_id)
+    _on_commit_too(lambda: cache.delete(key))
+
+
+def invalidate_campaigns(campaign_ids: Iterable[Any]) -> None:
+    """Drop the cached state of several campaigns."""
+    keys = [CAMPAIGN_KEY.format(campaign_id) for campaign_id in campaign_ids]
+    if keys:
+        _on_commit_too(lambda: cache.delete_many(keys))
+
+
+def invalidate_all_campaigns() -> None:
+    """Drop the cached state of every campaign by bumping the generation."""
+    def bump() -> None:
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            # Start from the clock so a lost generation never matches old entries
+            cache.set(GENERATION_KEY, int(time.time() * 1000), timeout=None)
+
+    _on_commit_too(bump)
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the hit and miss counts of the budget cache.
+
+    Returns:
+        Mapping of entry kind (``'brand'``, ``'campaign'``) to its hits,
+        misses and hit rate (None before the first lookup)
+    """
+    keys = [STATS_KEY.format(kind, outcome) for kind in KINDS for outcome in ('hits', 'misses')]
+    counts = cache.get_many(keys)
+
+    stats = {}
+    for kind in KINDS:
+        hits = counts.get(STATS_KEY.format(kind, 'hits'), 0)
+        misses = counts.get(STATS_KEY.format(kind, 'misses'), 0)
+        stats[kind] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None
+        }
+    return stats
+
+
+def reset_stats() -> None:
+    """Reset the hit and miss counts."""
+    cache.delete_many([STATS_KEY.format(kind, outcome) for kind in KINDS for outcome in ('hits', 'misses')])
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+def compile_schedule_bitmaps(apps, schema_editor):
+    """Compile the weekly schedule bitmap of every existing campaign."""
+    from scheduling.bitmap import WeeklyScheduleBitmap
+
+    Campaign = apps.get_model('campaigns', 'Campaign')
+    Schedule = apps.get_model('scheduling', 'Schedule')
+
+    campaign_ids = list(Campaign.objects.values_list('id', flat=True))
+    for start in range(0, len(campaign_ids), 1000):
+        chunk = campaign_ids[start:start + 1000]
+        bitmaps = {campaign_id: WeeklyScheduleBitmap() for campaign_id in chunk}
+        windows = Schedule.objects.filter(campaign_id__in=chunk, is_active=True).values_list(
+            'campaign_id', 'day_of_week', 'start_time', 'end_time'
+        )
+        for campaign_id, day_of_week, start_time, end_time in windows:
+            bitmaps[campaign_id].add_window(day_of_week, start_time, end_time)
+        for campaign_id, bitmap in bitmaps.items():
+            Campaign.objects.filter(pk=campaign_id).update(schedule_bitmap=bitmap.to_bytes())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0001_initial'),
+        ('scheduling', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='schedule_bitmap',
+            field=models.BinaryField(blank=True, help_text='Compiled weekly dayparting schedule (one bit per minute), rebuilt when schedules change', null=True),
+        ),
+        migrations.RunPython(compile_schedule_bitmaps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0002_campaign_schedule_bitmap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='daily_period',
+            field=models.DateField(blank=True, help_text='Local date the daily spend belongs to; an earlier date means the daily spend is zero', null=True),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='monthly_period',
+            field=models.DateField(blank=True, help_text='First day of the local month the monthly spend belongs to; an earlier month means it is zero', null=True),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def log_current_states(apps, schema_editor):
+    """Start each campaign's log with its current state."""
+    Campaign = apps.get_model('campaigns', 'Campaign')
+    CampaignTransition = apps.get_model('campaigns', 'CampaignTransition')
+    now = django.utils.timezone.now()
+
+    # Paused campaigns are known to have been paused since paused_at
+    transitions = [
+        CampaignTransition(
+            campaign_id=campaign_id,
+            status=status,
+            pause_reason=pause_reason,
+            timestamp=paused_at if status == 'PAUSED' and paused_at else now
+        )
+        for campaign_id, status, pause_reason, paused_at in Campaign.objects.values_list(
+            'pk', 'status', 'pause_reason', 'paused_at'
+        ).iterator()
+    ]
+    CampaignTransition.objects.bulk_create(transitions, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0003_campaign_spend_periods'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CampaignTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('ACTIVE', 'Active'), ('PAUSED', 'Paused')], help_text='Status the campaign moved to', max_length=20)),
+                ('pause_reason', models.CharField(blank=True, choices=[('DAILY_BUDGET_EXCEEDED', 'Daily Budget Exceeded'), ('MONTHLY_BUDGET_EXCEEDED', 'Monthly Budget Exceeded'), ('OUTSIDE_SCHEDULE', 'Outside Schedule'), ('NO_SCHEDULE', 'No Schedule'), ('MANUAL', 'Manual Pause')], help_text='Reason the campaign was paused', max_length=50, null=True)),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now, help_text='When the campaign moved to this state')),
+                ('campaign', models.ForeignKey(db_index=False, help_text='Campaign that changed state', on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='campaigns.campaign')),
+            ],
+            options={
+                'verbose_name': 'Campaign Transition',
+                'verbose_name_plural': 'Campaign Transitions',
+                'db_table': 'campaign_transitions',
+                'indexes': [models.Index(fields=['campaign', 'timestamp'], name='campaign_tr_campaig_b7b731_idx')],
+            },
+        ),
+        migrations.RunPython(log_current_states, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+# Inlined so later changes to campaigns.models.PAUSE_FLAGS cannot alter this migration
+PAUSE_FLAGS = {
+    'DAILY_BUDGET_EXCEEDED': 1,
+    'MONTHLY_BUDGET_EXCEEDED': 2,
+    'OUTSIDE_SCHEDULE': 4,
+    'NO_SCHEDULE': 8,
+    'MANUAL': 16,
+}
+
+
+def flag_paused_campaigns(apps, schema_editor):
+    """Set the flag of each paused campaign's reason (manual if it has none)."""
+    Campaign = apps.get_model('campaigns', 'Campaign')
+    for reason, flag in PAUSE_FLAGS.items():
+        Campaign.objects.filter(status='PAUSED', pause_reason=reason).update(pause_flags=flag)
+    Campaign.objects.filter(status='PAUSED', pause_reason__isnull=True).update(pause_flags=PAUSE_FLAGS['MANUAL'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0004_campaign_transitions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='pause_flags',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Bitmask of every reason the campaign is paused for; it runs only when none is set'),
+        ),
+        migrations.RunPython(flag_paused_campaigns, migrations.RunPython.noop),
+    ]
@@ -3,14 +3,20 @@ Campaign models for budget management system.
 """
 
 from __future__ import annotations
-from typing import Any, Optional, List
+from typing import Any, Collection, Dict, Iterable, List, Optional, Sequence, Tuple
+from datetime import date
 from decimal import Decimal
-from django.db import models
+from zoneinfo import ZoneInfo
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 import uuid
-from brands.models import Brand
-from django.db.models import F
+from brands.models import BUDGET_PERIODS, Brand, BudgetEnforcement, current_spend, period_start
+from django.db.models import F, Q, Case, When, Value, QuerySet, Window
+from django.db.models.functions import Lead
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
 from django.utils import timezone
+from . import budget_cache
 
 
 class CampaignStatus(models.TextChoices):
@@ -28,6 +34,77 @@ class PauseReason(models.TextChoices):
     MANUAL = 'MANUAL', 'Manual Pause'
 
 
+# Bit of each pause reason in Campaign.pause_flags
+PAUSE_FLAGS = {reason: 1 << index for index, reason in enumerate(PauseReason.values)}
+
+# Pause reasons set and lifted by dayparting
+SCHEDULE_PAUSE_REASONS = (PauseReason.OUTSIDE_SCHEDULE, PauseReason.NO_SCHEDULE)
+
+# Pause reasons set by budget enforcement and lifted by the spend resets
+BUDGET_PAUSE_REASONS = (PauseReason.DAILY_BUDGET_EXCEEDED, PauseReason.MONTHLY_BUDGET_EXCEEDED)
+
+# Order in which the remaining reasons are shown once the shown one is lifted
+PAUSE_REASON_PRIORITY = (
+    PauseReason.MANUAL,
+    PauseReason.MONTHLY_BUDGET_EXCEEDED,
+    PauseReason.DAILY_BUDGET_EXCEEDED,
+    PauseReason.NO_SCHEDULE,
+    PauseReason.OUTSIDE_SCHEDULE,
+)
+
+
+def pause_flags(*reasons: str) -> int:
+    """Get the bitmask of several pause reasons."""
+    flags = 0
+    for reason in reasons:
+        flags |= PAUSE_FLAGS[reason]
+    return flags
+
+
+def primary_pause_reason(flags: int, current: Optional[str] = None) -> Optional[str]:
+    """
+    Get the pause reason shown for a set of pause flags.
+
+    Args:
+        flags: The campaign's pause flags
+        current: The reason shown so far, kept while its flag is still set
+
+    Returns:
+        The reason to show, or None if no flag is set
+    """
+    if current and flags & PAUSE_FLAGS[current]:
+        return current
+    return next((reason for reason in PAUSE_REASON_PRIORITY if flags & PAUSE_FLAGS[reason]), None)
+
+
+# A slice of the campaigns: (shard index, shard count)
+Shard = Tuple[int, int]
+
+
+def shard_bounds(index: int, count: int) -> Tuple[Optional[uuid.UUID], Optional[uuid.UUID]]:
+    """
+    Get the campaign ID range of a shard.
+
+    The UUID space is split into ``count`` equal ranges; random (version 4)
+    campaign IDs spread evenly over them.
+
+    Args:
+        index: Shard index, from 0 to ``count - 1``
+        count: Number of shards
+
+    Returns:
+        The inclusive lower and exclusive upper ID of the shard (None for
+        the open ends of the first and last shard)
+    """
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {index} of {count}")
+
+    size = 2 ** 128
+    lower = uuid.UUID(int=size * index // count) if index > 0 else None
+    upper = uuid.UUID(int=size * (index + 1) // count) if index < count - 1 else None
+    return lower, upper
+
+
 class Campaign(models.Model):
     """
     Campaign model representing an advertising campaign.
@@ -78,6 +155,18 @@ class Campaign(models.Model):
         help_text="Total spend for current month"
     )
     
+    daily_period: models.DateField = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Local date the daily spend belongs to; an earlier date means the daily spend is zero"
+    )
+    
+    monthly_period: models.DateField = models.DateField(
+        null=True,
+        blank=True,
+        help_text="First day of the local month the monthly spend belongs to; an earlier month means it is zero"
+    )
+    
     pause_reason: models.CharField = models.CharField(
         max_length=50,
         choices=PauseReason.choices,
@@ -92,6 +181,19 @@ class Campaign(models.Model):
         help_text="When the campaign was paused"
     )
     
+    pause_flags: models.PositiveIntegerField = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Bitmask of every reason the campaign is paused for; it runs only when none is set"
+    )
+    
+    schedule_bitmap: models.BinaryField = models.BinaryField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Compiled weekly dayparting schedule (one bit per minute), rebuilt when schedules change"
+    )
+    
     created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
     updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
     
@@ -102,9 +204,137 @@ class Campaign(models.Model):
         verbose_name_plural = 'Campaigns'
         unique_together = ['brand', 'name']
     
+    # Counter and state values as last read from or written to the row, so a
+    # save can carry counter changes over to the brand totals and log status
+    # changes without re-reading it
+    _loaded_values: Optional[Dict[str, Any]] = None
+    
+    # Counters of a campaign being deleted, read just before the DELETE
+    _deleted_counters: Optional[Tuple[Any, ...]] = None
+    
     def __str__(self) -> str:
         return f"{self.brand.name} - {self.name}"
     
+    @classmethod
+    def from_db(cls, db: Optional[str], field_names: Collection[str], values: Collection[Any]) -> Campaign:
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded(TRACKED_FIELDS)
+        return instance
+    
+    def refresh_from_db(self, using: Optional[str] = None, fields: Optional[Sequence[str]] = None) -> None:
+        super().refresh_from_db(using, fields)
+        self._remember_loaded(TRACKED_FIELDS if fields is None else fields)
+    
+    def _remember_loaded(self, fields: Iterable[str]) -> None:
+        """Remember the current values of the tracked fields among some fields."""
+        loaded = {
+            field: self.__dict__[field] for field in fields
+            if field in TRACKED_FIELDS and field in self.__dict__
+        }
+        self._loaded_values = {**(self._loaded_values or {}), **loaded}
+    
+    def _stored_values(self, fields: Sequence[str], initial: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        """
+        Get tracked fields as stored, re-reading the row only if they were never loaded.
+
+        Args:
+            fields: The tracked fields to get
+            initial: Their values for a campaign not saved yet
+        """
+        if self._state.adding:
+            return initial
+        loaded = self._loaded_values or {}
+        if all(field in loaded for field in fields):
+            return tuple(loaded[field] for field in fields)
+        row = Campaign.objects.filter(pk=self.pk).values_list(*fields).first()
+        return tuple(row) if row is not None else initial
+    
+    def _locked_counters(self) -> Tuple[Any, ...]:
+        """Get the counters as stored now, locking the row until the transaction ends."""
+        if self._state.adding:
+            return UNSAVED_COUNTERS
+        row = Campaign.objects.select_for_update().filter(pk=self.pk).values_list(*SPEND_COUNTER_FIELDS).first()
+        return tuple(row) if row is not None else UNSAVED_COUNTERS
+    
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Save the campaign, keeping its pause flags in line with its status.
+
+        Setting the status or pause reason directly (admin, API) sets the
+        matching flag, or clears them all when the campaign is activated.
+        Status changes are logged as transitions, diffed against the values
+        as they were loaded.
+
+        A full save does not write back counters left as they were loaded,
+        so it cannot undo increments the database applied since. Counters
+        that are written are diffed against the row as it is now, read under
+        a lock, and the difference is carried over to the brand's totals.
+        """
+        if self.status == CampaignStatus.ACTIVE:
+            self.pause_flags = 0
+        elif self.pause_reason and not self.has_pause_reason(self.pause_reason):
+            self.pause_flags |= PAUSE_FLAGS[self.pause_reason]
+        elif not self.pause_flags:
+            self.pause_flags = PAUSE_FLAGS[PauseReason.MANUAL]
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'status', 'pause_reason'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'pause_flags'}
+
+        saved_counters = [
+            field for field in SPEND_COUNTER_FIELDS if update_fields is None or field in update_fields
+        ]
+        loaded = self._loaded_values or {}
+        if update_fields is None and not self._state.adding and not args and not kwargs.get('force_insert'):
+            unchanged = {
+                field for field in saved_counters if field in loaded and getattr(self, field) == loaded[field]
+            }
+            if unchanged:
+                saved_counters = [field for field in saved_counters if field not in unchanged]
+                kwargs['update_fields'] = [
+                    field.name for field in self._meta.fields
+                    if field.concrete and not field.primary_key and field.name not in unchanged
+                ]
+
+        saves_state = update_fields is None or bool(set(STATE_FIELDS) & set(update_fields))
+        stored_state = self._stored_values(STATE_FIELDS, (None, None)) if saves_state else None
+        with transaction.atomic():
+            stored = self._locked_counters() if saved_counters else None
+            super().save(*args, **kwargs)
+            self._log_state_change(stored_state)
+            if stored is not None:
+                self._carry_counters_to_brand(stored, saved_counters)
+    
+    def _log_state_change(self, stored_state: Optional[Tuple[Any, ...]]) -> None:
+        """Log a transition if a save changed the status or pause reason."""
+        if stored_state is not None:
+            self._remember_loaded(STATE_FIELDS)
+            if stored_state != (self.status, self.pause_reason):
+                # Only a campaign just paused changed state at paused_at;
+                # a reason change while paused happens now
+                just_paused = self.is_paused() and stored_state[0] != CampaignStatus.PAUSED
+                CampaignTransition.record(
+                    [self.pk],
+                    self.status,
+                    self.pause_reason,
+                    self.paused_at if just_paused else None
+                )
+
+    def _carry_counters_to_brand(self, stored: Tuple[Any, ...], saved_counters: Sequence[str]) -> None:
+        """Add the change a save made to the stored counters to the brand's totals."""
+        self._remember_loaded(saved_counters)
+        current = tuple(
+            getattr(self, field) if field in saved_counters else value
+            for field, value in zip(SPEND_COUNTER_FIELDS, stored)
+        )
+        if current != stored:
+            before = _current_spends(self, stored)
+            after = _current_spends(self, current)
+            if before != after:
+                Brand.add_to_totals({self.brand_id: (
+                    after[0] - before[0], after[1] - before[1], self.local_date()
+                )})
+    
     def is_active(self) -> bool:
         """Check if campaign is currently active."""
         return bool(self.status == CampaignStatus.ACTIVE)
@@ -113,60 +343,642 @@ class Campaign(models.Model):
         """Check if campaign is currently paused."""
         return bool(self.status == CampaignStatus.PAUSED)
     
+    def has_pause_reason(self, *reasons: str) -> bool:
+        """Check if the campaign is paused for any of several reasons."""
+        return bool(self.pause_flags & pause_flags(*reasons))
+    
+    def get_pause_reasons(self) -> List[str]:
+        """Get every reason the campaign is paused for, most lasting first."""
+        return [reason for reason in PAUSE_REASON_PRIORITY if self.pause_flags & PAUSE_FLAGS[reason]]
+    
     def pause(self, reason: str) -> None:
-        """Pause the campaign with a specific reason."""
-        from django.utils import timezone
+        """
+        Pause the campaign for a reason, in addition to any it is paused for.
+
+        Nothing is written if the campaign is already paused for the reason.
+        A campaign already paused for another reason keeps showing that one.
+        """
+        if self.is_paused() and self.has_pause_reason(reason):
+            return
         
+        if not self.is_paused():
+            self.paused_at = timezone.now()
+            self.pause_reason = None
+        self.pause_flags |= PAUSE_FLAGS[reason]
         self.status = CampaignStatus.PAUSED
-        self.pause_reason = reason
-        self.paused_at = timezone.now()
-        self.save(update_fields=['status', 'pause_reason', 'paused_at', 'updated_at'])
+        self.pause_reason = primary_pause_reason(self.pause_flags, self.pause_reason)
+        self.save(update_fields=['status', 'pause_reason', 'pause_flags', 'paused_at', 'updated_at'])
     
-    def activate(self) -> bool:
-        """Activate the campaign if possible."""
-        from scheduling.services import SchedulingService
+    def lift_pause(self, *reasons: str) -> bool:
+        """
+        Lift some of the reasons the campaign is paused for.
+
+        The campaign runs again once no reason is left, unless it cannot be
+        activated (over budget or outside its schedule), in which case
+        nothing is written.
+
+        Returns:
+            True if the campaign was activated
+        """
+        flags = self.pause_flags & ~pause_flags(*reasons)
+        if flags == self.pause_flags:
+            return False
+        if not flags and not self.can_be_activated():
+            return False
         
+        self.pause_flags = flags
+        self.pause_reason = primary_pause_reason(flags, self.pause_reason)
+        if not flags:
+            self.status = CampaignStatus.ACTIVE
+            self.paused_at = None
+        self.save(update_fields=['status', 'pause_reason', 'pause_flags', 'paused_at', 'updated_at'])
+        return not flags
+    
+    def activate(self) -> bool:
+        """Activate the campaign if possible, lifting every pause reason."""
         # Check if campaign can be activated
         if not self.can_be_activated():
             return False
         
+        if self.is_active() and not self.pause_flags:
+            return True
+        
         self.status = CampaignStatus.ACTIVE
         self.pause_reason = None
+        self.pause_flags = 0
         self.paused_at = None
-        self.save(update_fields=['status', 'pause_reason', 'paused_at', 'updated_at'])
+        self.save(update_fields=['status', 'pause_reason', 'pause_flags', 'paused_at', 'updated_at'])
         return True
     
     def can_be_activated(self) -> bool:
         """Check if campaign can be activated based on budget and schedule."""
         from scheduling.services import SchedulingService
         
-        # Check budget limits
-        if self.daily_spend >= self.brand.daily_budget:
-            return False
-        
-        if self.monthly_spend >= self.brand.monthly_budget:
-            return False
-        
-        # Check dayparting schedule
-        scheduling_service = SchedulingService()
-        if not scheduling_service.is_campaign_scheduled_now(self):
-            return False
-        
-        return True
+        return budget_cache.can_be_activated(
+            self.brand_id,
+            budget_cache.brand_budget_for(self),
+            self.get_daily_spend(),
+            self.get_monthly_spend(),
+            SchedulingService().is_campaign_scheduled_now(self)
+        )
     
     def add_spend(self, amount: Decimal) -> None:
-        """Add spend to the campaign and update totals."""
-        from decimal import Decimal
-        from django.utils import timezone
+        """
+        Add spend to the campaign and update totals.
+
+        The increment is applied by the database (``col = col + amount``) so
+        concurrent writers never lose updates. A counter stamped with an
+        earlier day or month is rolled over to ``amount`` by the same UPDATE.
+        The brand's totals are incremented in the same transaction, right
+        after the campaign row. Both rows stay locked until the surrounding
+        transaction ends, so the refreshed totals are the post-increment
+        values any budget decision should use.
+        """
         if amount <= Decimal('0.00'):
             raise ValueError("Spend amount must be positive")
-        
-        # Update the instance directly
-        self.daily_spend += amount
-        self.monthly_spend += amount
-        self.updated_at = timezone.now()
-        self.save(update_fields=['daily_spend', 'monthly_spend', 'updated_at'])
-    
+
+        today = self.local_date()
+        with transaction.atomic():
+            Campaign.objects.filter(pk=self.pk).update(
+                daily_spend=self._rolled_over('daily', Value(today), Value(amount)),
+                daily_period=today,
+                monthly_spend=self._rolled_over('monthly', Value(period_start('monthly', today)), Value(amount)),
+                monthly_period=period_start('monthly', today),
+                updated_at=timezone.now()
+            )
+            self.refresh_from_db(
+                fields=['daily_spend', 'daily_period', 'monthly_spend', 'monthly_period', 'updated_at']
+            )
+            Brand.add_to_totals({self.brand_id: (amount, amount, today)})
+            budget_cache.invalidate_campaigns([self.pk])
+
+    def local_date(self, moment: Optional[Any] = None) -> date:
+        """
+        Get the date in the brand's timezone.
+
+        Uses the loaded brand if there is one and the cached brand budget
+        otherwise, so the brand is never fetched just for its timezone.
+        """
+        return budget_cache.brand_budget_for(self).local_date(moment)
+
+    @staticmethod
+    def _rolled_over(period: str, start: Any, amount: Any) -> Case:
+        """
+        Build a spend counter's value after adding an amount.
+
+        A counter stamped with a period before ``start`` belongs to an
+        earlier day or month, so it restarts from ``amount``.
+        """
+        return Case(
+            When(**{f'{period}_period__lt': start}, then=amount),
+            default=F(f'{period}_spend') + amount,
+            output_field=models.DecimalField(max_digits=10, decimal_places=2)
+        )
+
+    @classmethod
+    def local_dates(cls, campaign_ids: Any, moment: Optional[Any] = None) -> Dict[Any, date]:
+        """
+        Get the date in the brand timezone of several campaigns.
+
+        Args:
+            campaign_ids: Campaigns to look up
+            moment: The moment to convert (defaults to now)
+
+        Returns:
+            Mapping of campaign ID to local date (missing campaigns are omitted)
+        """
+        moment = moment or timezone.now()
+        return {
+            campaign_id: moment.astimezone(ZoneInfo(tz)).date()
+            for campaign_id, tz in cls.objects.filter(pk__in=list(campaign_ids)).values_list(
+                'pk', 'brand__timezone'
+            )
+        }
+
+    @classmethod
+    def _period_starts(cls, period: str, moment: Optional[Any] = None) -> Dict[str, date]:
+        """Get the first day of the current period in each brand timezone."""
+        moment = moment or timezone.now()
+        return {
+            tz: period_start(period, moment.astimezone(ZoneInfo(tz)).date())
+            for tz in Brand.objects.order_by().values_list('timezone', flat=True).distinct()
+        }
+
+    @classmethod
+    def current_period_condition(cls, period: str, moment: Optional[Any] = None, prefix: str = '') -> Q:
+        """
+        Build a filter matching campaigns whose counter belongs to the current period.
+
+        Counters never stamped with a period are treated as current.
+
+        Args:
+            period: ``'daily'`` or ``'monthly'``
+            moment: The moment to check (defaults to now)
+            prefix: ``'brand__'`` to check the brand's total instead
+        """
+        condition = Q(**{f'{prefix}{period}_period__isnull': True})
+        for tz, start in cls._period_starts(period, moment).items():
+            condition |= Q(brand__timezone=tz, **{f'{prefix}{period}_period__gte': start})
+        return condition
+
+    @classmethod
+    def stale_period_condition(cls, period: str, moment: Optional[Any] = None, prefix: str = '') -> Q:
+        """
+        Build a filter matching campaigns whose counter belongs to an earlier period.
+
+        Such counters read as zero until the campaign's next spend rolls
+        them over.
+
+        Args:
+            period: ``'daily'`` or ``'monthly'``
+            moment: The moment to check (defaults to now)
+            prefix: ``'brand__'`` to check the brand's total instead
+        """
+        condition = Q(pk__in=[])
+        for tz, start in cls._period_starts(period, moment).items():
+            condition |= Q(brand__timezone=tz, **{f'{prefix}{period}_period__lt': start})
+        return condition
+
+    @classmethod
+    def under_budget_condition(cls, moment: Optional[Any] = None) -> Q:
+        """
+        Build a filter matching campaigns under both brand budgets.
+
+        Brands enforcing their total also need the total under budget.
+        Counters from an earlier period count as zero.
+
+        Args:
+            moment: The moment to check (defaults to now)
+        """
+        condition = Q()
+        for period in BUDGET_PERIODS:
+            condition &= (
+                Q(**{f'{period}_spend__lt': F(f'brand__{period}_budget')})
+                | cls.stale_period_condition(period, moment)
+            )
+            condition &= (
+                ~Q(brand__budget_enforcement=BudgetEnforcement.BRAND)
+                | Q(**{f'brand__{period}_spend__lt': F(f'brand__{period}_budget')})
+                | cls.stale_period_condition(period, moment, prefix='brand__')
+            )
+        return condition
+
+    @classmethod
+    def shard_condition(cls, shard: Optional[Shard] = None) -> Q:
+        """
+        Build a filter matching the campaigns of a shard.
+
+        Args:
+            shard: ``(index, count)`` of the shard, or None for every campaign
+        """
+        if shard is None:
+            return Q()
+        lower, upper = shard_bounds(*shard)
+        condition = Q()
+        if lower is not None:
+            condition &= Q(pk__gte=lower)
+        if upper is not None:
+            condition &= Q(pk__lt=upper)
+        return condition
+
+    @classmethod
+    def pause_flag_condition(cls, *reasons: str) -> Q:
+        """
+        Get the condition matching campaigns paused for any of several reasons.
+
+        The bitmask test is spelled as the list of flag values that contain
+        one of the bits, so it works as a plain ``IN`` filter on any database.
+        """
+        bits = pause_flags(*reasons)
+        return Q(pause_flags__in=[flags for flags in range(pause_flags(*PauseReason.values) + 1) if flags & bits])
+
+    @classmethod
+    def add_spends_bulk(cls, amounts: Dict[Any, Decimal], chunk_size: int = 500) -> int:
+        """
+        Add aggregated spend to many campaigns with set-based UPDATEs.
+
+        Each chunk of campaigns is incremented by a single UPDATE whose
+        per-row amount and local period come from CASE expressions, rolling
+        over counters stamped with an earlier period. Campaigns are processed
+        in primary key order so concurrent bulk writers lock rows in the
+        same order. The brand totals are incremented once every campaign
+        chunk is written, so campaign rows are always locked before brands.
+
+        Args:
+            amounts: Mapping of campaign ID to the total amount to add
+            chunk_size: Maximum number of campaigns per UPDATE statement
+
+        Returns:
+            Number of campaign rows updated
+        """
+        campaign_ids = sorted(amounts, key=str)
+        updated = 0
+        now = timezone.now()
+        brand_deltas: Dict[Any, Any] = {}
+
+        for start in range(0, len(campaign_ids), chunk_size):
+            chunk = campaign_ids[start:start + chunk_size]
+            local_dates = {}
+            for campaign_id, brand_id, tz in cls.objects.filter(pk__in=chunk).values_list(
+                'pk', 'brand_id', 'brand__timezone'
+            ):
+                local_dates[campaign_id] = now.astimezone(ZoneInfo(tz)).date()
+                total = brand_deltas.get(brand_id, (Decimal('0.00'),))[0] + amounts[campaign_id]
+                brand_deltas[brand_id] = (total, total, local_dates[campaign_id])
+            increment = Case(
+                *[When(pk=campaign_id, then=Value(amounts[campaign_id])) for campaign_id in chunk],
+                default=Value(Decimal('0.00')),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2)
+            )
+            # Each campaign's counters are stamped with its brand's local period
+            starts = {
+                period: Case(
+                    *[
+                        When(pk=campaign_id, then=Value(period_start(period, today)))
+                        for campaign_id, today in local_dates.items()
+                    ],
+                    default=Value(period_start(period, now.date())),
+                    output_field=models.DateField()
+                )
+                for period in BUDGET_PERIODS
+            }
+            updated += cls.objects.filter(pk__in=chunk).update(
+                daily_spend=cls._rolled_over('daily', starts['daily'], increment),
+                daily_period=starts['daily'],
+                monthly_spend=cls._rolled_over('monthly', starts['monthly'], increment),
+                monthly_period=starts['monthly'],
+                updated_at=now
+            )
+            budget_cache.invalidate_campaigns(chunk)
+
+        Brand.add_to_totals(brand_deltas)
+
+        return updated
+
+    @classmethod
+    def pause_exceeding_budget(cls, period: str, reason: str, shard: Optional[Shard] = None) -> List[Any]:
+        """
+        Flag every campaign whose spend reached its brand budget.
+
+        The matching campaigns not yet flagged for the reason are selected
+        with one joined query and flagged with grouped UPDATEs (see
+        ``_update_pause_flags``); campaigns already paused for another reason
+        get the flag too, so lifting that reason leaves them paused. Counters
+        from an earlier period read as zero and never pause a campaign.
+
+        Args:
+            period: ``'daily'`` or ``'monthly'``
+            reason: Pause reason to record
+            shard: Only check the campaigns of this ``(index, count)`` shard
+
+        Returns:
+            IDs of the active campaigns that were paused
+        """
+        if period not in ('daily', 'monthly'):
+            raise ValueError(f"Invalid budget period: {period}")
+
+        now = timezone.now()
+        campaigns = cls.objects.filter(
+            cls.current_period_condition(period, now),
+            cls.shard_condition(shard),
+            ~cls.pause_flag_condition(reason),
+            **{f'{period}_spend__gte': F(f'brand__{period}_budget')}
+        )
+
+        return cls._update_pause_flags(campaigns, set_flags=PAUSE_FLAGS[reason], now=now)
+
+    @classmethod
+    def pause_exceeding_brand_budget(
+        cls,
+        period: str,
+        reason: str,
+        brand_ids: Optional[List[Any]] = None,
+        shard: Optional[Shard] = None
+    ) -> List[Any]:
+        """
+        Flag every campaign of the brands whose total reached their budget.
+
+        Only brands enforcing their total (``BudgetEnforcement.BRAND``) are
+        checked. Totals from an earlier period read as zero.
+
+        Args:
+            period: ``'daily'`` or ``'monthly'``
+            reason: Pause reason to record
+            brand_ids: Only check these brands
+            shard: Only pause the campaigns of this ``(index, count)`` shard
+
+        Returns:
+            IDs of the active campaigns that were paused
+        """
+        if period not in BUDGET_PERIODS:
+            raise ValueError(f"Invalid budget period: {period}")
+
+        now = timezone.now()
+        campaigns = cls.objects.filter(
+            cls.current_period_condition(period, now, prefix='brand__'),
+            cls.shard_condition(shard),
+            ~cls.pause_flag_condition(reason),
+            brand__budget_enforcement=BudgetEnforcement.BRAND,
+            **{f'brand__{period}_spend__gte': F(f'brand__{period}_budget')}
+        )
+        if brand_ids is not None:
+            campaigns = campaigns.filter(brand_id__in=brand_ids)
+
+        return cls._update_pause_flags(campaigns, set_flags=PAUSE_FLAGS[reason], now=now)
+
+    @classmethod
+    def pause_brand_campaigns(cls, brand_id: Any, reason: str) -> List[Any]:
+        """
+        Flag every campaign of a brand with a pause reason.
+
+        Args:
+            brand_id: The brand whose campaigns are paused
+            reason: Pause reason to record
+
+        Returns:
+            IDs of the active campaigns that were paused
+        """
+        return cls._update_pause_flags(
+            cls.objects.filter(~cls.pause_flag_condition(reason), brand_id=brand_id),
+            set_flags=PAUSE_FLAGS[reason]
+        )
+
+    @classmethod
+    def _update_pause_flags(
+        cls,
+        campaigns: QuerySet,
+        set_flags: int = 0,
+        clear_flags: int = 0,
+        now: Optional[Any] = None
+    ) -> List[Any]:
+        """
+        Set and clear pause flags of the matching campaigns.
+
+        The campaigns are locked and read with one query. Campaigns whose
+        flags would not change are skipped; the others are written with one
+        UPDATE per resulting state (900 IDs at a time), which also moves
+        their status: paused while any flag is set, active once none is.
+        Status and reason changes are logged with one bulk insert, all in
+        one transaction.
+
+        Args:
+            campaigns: Campaigns to update
+            set_flags: Flags to set
+            clear_flags: Flags to clear
+            now: When the flags change (defaults to now)
+
+        Returns:
+            IDs of the campaigns whose status changed
+        """
+        now = now or timezone.now()
+        with transaction.atomic():
+            rows = campaigns.select_for_update(of=('self',)).order_by('pk').values_list(
+                'pk', 'status', 'pause_reason', 'pause_flags'
+            )
+
+            updates: Dict[Tuple[Any, ...], List[Any]] = {}
+            transitions: Dict[Tuple[str, Optional[str]], List[Any]] = {}
+            moved: List[Any] = []
+            for campaign_id, status, reason, flags in rows:
+                new_flags = (flags & ~clear_flags) | set_flags
+                if new_flags == flags:
+                    continue
+
+                new_status = CampaignStatus.PAUSED if new_flags else CampaignStatus.ACTIVE
+                new_reason = primary_pause_reason(new_flags, reason if status == CampaignStatus.PAUSED else None)
+                updates.setdefault((new_flags, new_status, new_reason, new_status != status), []).append(campaign_id)
+                if (new_status, new_reason) != (status, reason):
+                    transitions.setdefault((new_status, new_reason), []).append(campaign_id)
+                if new_status != status:
+                    moved.append(campaign_id)
+
+            for (new_flags, new_status, new_reason, status_changed), campaign_ids in updates.items():
+                values = {'pause_flags': new_flags, 'status': new_status, 'pause_reason': new_reason, 'updated_at': now}
+                if status_changed:
+                    values['paused_at'] = now if new_status == CampaignStatus.PAUSED else None
+                for start in range(0, len(campaign_ids), 900):
+                    cls.objects.filter(pk__in=campaign_ids[start:start + 900]).update(**values)
+
+            for (to_status, to_reason), campaign_ids in transitions.items():
+                CampaignTransition.record(campaign_ids, to_status, to_reason, now)
+            budget_cache.invalidate_campaigns(
+                [campaign_id for campaign_ids in updates.values() for campaign_id in campaign_ids]
+            )
+
+        return moved
+
+    @classmethod
+    def reset_spend_counters(
+        cls,
+        period: str,
+        timezones: Optional[List[str]] = None,
+        shard: Optional[Shard] = None
+    ) -> int:
+        """
+        Reset the daily or monthly spend of every campaign with one UPDATE.
+
+        The matching brand totals are reset along with them (by the first
+        shard only, when sharded).
+
+        Not needed when counters roll over lazily (``SPEND_COUNTERS_EAGER_RESET``
+        disabled): a counter stamped with an earlier period already reads as
+        zero.
+
+        Args:
+            period: ``'daily'`` or ``'monthly'``
+            timezones: Only reset campaigns of brands in these timezones
+            shard: Only reset the campaigns of this ``(index, count)`` shard
+
+        Returns:
+            Number of campaigns reset
+        """
+        if period not in ('daily', 'monthly'):
+            raise ValueError(f"Invalid budget period: {period}")
+
+        campaigns = cls.objects.filter(cls.shard_condition(shard))
+        brands = Brand.objects.all()
+        if timezones is not None:
+            campaigns = campaigns.filter(brand__timezone__in=timezones)
+            brands = brands.filter(timezone__in=timezones)
+
+        now = timezone.now()
+        reset = campaigns.update(**{f'{period}_spend': Decimal('0.00')}, updated_at=now)
+        if shard is None or shard[0] == 0:
+            brands.update(**{f'{period}_spend': Decimal('0.00')}, updated_at=now)
+        budget_cache.invalidate_all_campaigns()
+        return reset
+
+    @classmethod
+    def reactivate_paused(
+        cls,
+        reason: str,
+        chunk_size: int = 1000,
+        timezones: Optional[List[str]] = None,
+        shard: Optional[Shard] = None
+    ) -> List[Any]:
+        """
+        Lift a pause reason from the campaigns that are under budget again.
+
+        Candidates are selected with one query joining brand budgets, and
+        handled in chunks, each in its own short transaction with the
+        selected rows locked. Only the reason's flag is cleared: campaigns
+        still paused for another reason stay paused, and campaigns outside
+        their dayparting window are flagged ``OUTSIDE_SCHEDULE`` instead of
+        being reactivated only to be paused again by the next dayparting run.
+
+        Args:
+            reason: Pause reason to lift
+            chunk_size: Campaigns handled per transaction
+            timezones: Only handle campaigns of brands in these timezones
+            shard: Only handle the campaigns of this ``(index, count)`` shard
+
+        Returns:
+            IDs of the campaigns that were reactivated
+        """
+        from scheduling.models import Schedule
+
+        now = timezone.now()
+        flag = PAUSE_FLAGS[reason]
+        candidates = cls.objects.filter(
+            cls.under_budget_condition(now),
+            cls.shard_condition(shard),
+            cls.pause_flag_condition(reason)
+        ).order_by('pk')
+        if timezones is not None:
+            candidates = candidates.filter(brand__timezone__in=timezones)
+
+        reactivated: List[Any] = []
+        last_id = None
+        while True:
+            with transaction.atomic():
+                chunk = candidates if last_id is None else candidates.filter(pk__gt=last_id)
+                campaign_ids = list(
+                    chunk.select_for_update(of=('self',)).values_list('pk', flat=True)[:chunk_size]
+                )
+                if not campaign_ids:
+                    break
+
+                campaigns = cls.objects.filter(pk__in=campaign_ids)
+                scheduled = Schedule.scheduled_condition(now)
+                reactivated += cls._update_pause_flags(campaigns.filter(scheduled), clear_flags=flag, now=now)
+                cls._update_pause_flags(
+                    campaigns.filter(~scheduled),
+                    set_flags=PAUSE_FLAGS[PauseReason.OUTSIDE_SCHEDULE],
+                    clear_flags=flag,
+                    now=now
+                )
+
+            last_id = campaign_ids[-1]
+
+        return reactivated
+
+    @classmethod
+    def pause_outside_schedule(cls, moment: Optional[Any] = None, shard: Optional[Shard] = None) -> int:
+        """
+        Flag every campaign without a schedule window covering a moment.
+
+        The campaigns not yet flagged for their schedule are selected with
+        ``NOT EXISTS`` subqueries over their schedules, evaluated in each
+        brand's local time, and flagged ``OUTSIDE_SCHEDULE`` in one
+        transaction, including campaigns already paused for another reason.
+
+        Args:
+            moment: The moment to check (defaults to now)
+            shard: Only check the campaigns of this ``(index, count)`` shard
+
+        Returns:
+            Number of active campaigns paused
+        """
+        from scheduling.models import Schedule
+
+        now = timezone.now()
+        scheduled = Schedule.scheduled_condition(moment or now)
+
+        return len(cls._update_pause_flags(
+            cls.objects.filter(
+                ~scheduled,
+                ~cls.pause_flag_condition(*SCHEDULE_PAUSE_REASONS),
+                cls.shard_condition(shard)
+            ),
+            set_flags=PAUSE_FLAGS[PauseReason.OUTSIDE_SCHEDULE],
+            now=now
+        ))
+
+    @classmethod
+    def activate_within_schedule(cls, moment: Optional[Any] = None, shard: Optional[Shard] = None) -> int:
+        """
+        Lift the schedule pause reasons of campaigns scheduled at a moment.
+
+        The campaigns are selected with ``EXISTS`` subqueries over their
+        schedules (in each brand's local time) and their brand budgets, and
+        their schedule flags cleared in one transaction. Campaigns over
+        budget that are not yet flagged for it keep their schedule flag, so
+        they are not activated before budget enforcement pauses them again;
+        campaigns still paused for another reason stay paused.
+
+        Args:
+            moment: The moment to check (defaults to now)
+            shard: Only check the campaigns of this ``(index, count)`` shard
+
+        Returns:
+            Number of campaigns activated
+        """
+        from scheduling.models import Schedule
+
+        now = timezone.now()
+        scheduled = Schedule.scheduled_condition(moment or now)
+
+        return len(cls._update_pause_flags(
+            cls.objects.filter(
+                scheduled,
+                cls.under_budget_condition(moment or now) | cls.pause_flag_condition(*BUDGET_PAUSE_REASONS),
+                cls.shard_condition(shard),
+                cls.pause_flag_condition(*SCHEDULE_PAUSE_REASONS)
+            ),
+            clear_flags=pause_flags(*SCHEDULE_PAUSE_REASONS),
+            now=now
+        ))
+
     def reset_daily_spend(self) -> None:
         """Reset daily spend to zero."""
         self.daily_spend = Decimal('0.00')
@@ -177,14 +989,244 @@ class Campaign(models.Model):
         self.monthly_spend = Decimal('0.00')
         self.save(update_fields=['monthly_spend', 'updated_at'])
     
+    def get_spend(self, period: str, moment: Optional[Any] = None) -> Decimal:
+        """
+        Get the spend of the current day or month.
+
+        Args:
+            period: ``'daily'`` or ``'monthly'``
+            moment: The moment to check (defaults to now)
+
+        Returns:
+            The counter's value, or zero if it belongs to an earlier period
+        """
+        return current_spend(
+            period,
+            getattr(self, f'{period}_spend'),
+            getattr(self, f'{period}_period'),
+            self.local_date(moment)
+        )
+
     def get_daily_spend(self) -> Decimal:
-        return Decimal(self.daily_spend)
+        return self.get_spend('daily')
 
     def get_monthly_spend(self) -> Decimal:
-        return Decimal(self.monthly_spend)
+        return self.get_spend('monthly')
 
     def get_remaining_daily_budget(self) -> Decimal:
-        return Decimal(self.brand.daily_budget) - Decimal(self.daily_spend)
+        return Decimal(self.brand.daily_budget) - self.get_daily_spend()
 
     def get_remaining_monthly_budget(self) -> Decimal:
-        return Decimal(self.brand.monthly_budget) - Decimal(self.monthly_spend)
+        return Decimal(self.brand.monthly_budget) - self.get_monthly_spend()
+
+
+class CampaignTransition(models.Model):
+    """
+    A change of a campaign's status or pause reason.
+
+    The table is append-only: every pause and activation adds a row, single
+    saves through the ``Campaign`` signals and bulk enforcement with one
+    ``bulk_create``. Rows are indexed by campaign and time, so the time a
+    campaign spent in each state over a range is read back with one query
+    (see ``time_in_state``).
+    """
+
+    campaign: models.ForeignKey = models.ForeignKey(
+        Campaign,
+        on_delete=models.CASCADE,
+        related_name='transitions',
+        db_index=False,
+        help_text="Campaign that changed state"
+    )
+
+    status: models.CharField = models.CharField(
+        max_length=20,
+        choices=CampaignStatus.choices,
+        help_text="Status the campaign moved to"
+    )
+
+    pause_reason: models.CharField = models.CharField(
+        max_length=50,
+        choices=PauseReason.choices,
+        null=True,
+        blank=True,
+        help_text="Reason the campaign was paused"
+    )
+
+    timestamp: models.DateTimeField = models.DateTimeField(
+        default=timezone.now,
+        help_text="When the campaign moved to this state"
+    )
+
+    class Meta:
+        db_table = 'campaign_transitions'
+        verbose_name = 'Campaign Transition'
+        verbose_name_plural = 'Campaign Transitions'
+        indexes = [
+            models.Index(fields=['campaign', 'timestamp']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.campaign_id} {self.status} at {self.timestamp}"
+
+    @classmethod
+    def record(
+        cls,
+        campaign_ids: List[Any],
+        status: str,
+        reason: Optional[str] = None,
+        moment: Optional[Any] = None,
+        batch_size: int = 1000
+    ) -> int:
+        """
+        Log the same transition for several campaigns with a bulk insert.
+
+        Args:
+            campaign_ids: Campaigns that changed state
+            status: The status they moved to
+            reason: The pause reason (None when activated)
+            moment: When they changed state (defaults to now)
+            batch_size: Rows per INSERT
+
+        Returns:
+            Number of transitions logged
+        """
+        moment = moment or timezone.now()
+        cls.objects.bulk_create(
+            [cls(campaign_id=campaign_id, status=status, pause_reason=reason, timestamp=moment)
+             for campaign_id in campaign_ids],
+            batch_size=batch_size
+        )
+        return len(campaign_ids)
+
+    @classmethod
+    def time_in_state(
+        cls,
+        start: Any,
+        end: Any,
+        campaign_ids: Optional[List[Any]] = None,
+        brand_id: Optional[Any] = None
+    ) -> Dict[Any, Dict[str, Any]]:
+        """
+        Get how long campaigns were active and paused over a time range.
+
+        One query reads the transitions inside the range together with the
+        last one before it (the state at ``start``); each transition lasts
+        until the next one of its campaign, found with a ``LEAD`` window.
+
+        Args:
+            start: Start of the range
+            end: End of the range
+            campaign_ids: Only report these campaigns
+            brand_id: Only report the campaigns of this brand
+
+        Returns:
+            Mapping of campaign ID to its ``uptime`` and ``downtime`` in
+            seconds, the downtime per pause reason, the ``untracked`` seconds
+            before its first transition and its ``uptime_ratio`` (None if
+            nothing was tracked). Campaigns without transitions up to
+            ``end`` are left out.
+        """
+        transitions = cls.objects.filter(timestamp__lt=end)
+        if campaign_ids is not None:
+            transitions = transitions.filter(campaign_id__in=campaign_ids)
+        if brand_id is not None:
+            transitions = transitions.filter(campaign__brand_id=brand_id)
+
+        rows = transitions.annotate(
+            ended_at=Window(
+                Lead('timestamp'),
+                partition_by=[F('campaign_id')],
+                order_by=[F('timestamp').asc(), F('id').asc()]
+            )
+        ).filter(
+            Q(ended_at__isnull=True) | Q(ended_at__gt=start)
+        ).order_by('campaign_id', 'timestamp', 'id').values_list(
+            'campaign_id', 'status', 'pause_reason', 'timestamp', 'ended_at'
+        )
+
+        report: Dict[Any, Dict[str, Any]] = {}
+        for campaign_id, status, reason, began_at, ended_at in rows:
+            entry = report.get(campaign_id)
+            if entry is None:
+                # Without a transition before the range, its start is untracked
+                entry = report[campaign_id] = {
+                    'uptime': 0.0,
+                    'downtime': 0.0,
+                    'downtime_by_reason': {},
+                    'untracked': max((began_at - start).total_seconds(), 0.0),
+                }
+
+            seconds = (min(ended_at or end, end) - max(began_at, start)).total_seconds()
+            if seconds <= 0:
+                continue
+            if status == CampaignStatus.ACTIVE:
+                entry['uptime'] += seconds
+            else:
+                entry['downtime'] += seconds
+                reason = reason or 'UNKNOWN'
+                entry['downtime_by_reason'][reason] = entry['downtime_by_reason'].get(reason, 0.0) + seconds
+
+        for entry in report.values():
+            tracked = entry['uptime'] + entry['downtime']
+            entry['uptime_ratio'] = round(entry['uptime'] / tracked, 4) if tracked else None
+
+        return report
+
+
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+def invalidate_brand_budget(sender: Any, instance: Brand, **kwargs: Any) -> None:
+    """Drop a brand's cached budgets when it changes."""
+    budget_cache.invalidate_brand(instance.pk)
+
+
+# Campaign counters summed into the brand totals
+SPEND_COUNTER_FIELDS = ('daily_spend', 'daily_period', 'monthly_spend', 'monthly_period')
+
+# Counter values of a campaign not saved yet
+UNSAVED_COUNTERS = (Decimal('0.00'), None, Decimal('0.00'), None)
+
+# Campaign fields logged as transitions when they change
+STATE_FIELDS = ('status', 'pause_reason')
+
+# Fields whose loaded values Campaign.save() diffs against
+TRACKED_FIELDS = SPEND_COUNTER_FIELDS + STATE_FIELDS
+
+
+def _current_spends(campaign: Campaign, values: Any) -> Any:
+    """Get the current daily and monthly spend from stored counter values."""
+    daily_spend, daily_period, monthly_spend, monthly_period = values
+    if not daily_spend and not monthly_spend:
+        return Decimal('0.00'), Decimal('0.00')
+    today = campaign.local_date()
+    return (
+        current_spend('daily', daily_spend, daily_period, today),
+        current_spend('monthly', monthly_spend, monthly_period, today)
+    )
+
+
+@receiver(pre_delete, sender=Campaign)
+def remember_deleted_spend(sender: Any, instance: Campaign, **kwargs: Any) -> None:
+    """Remember a campaign's stored counters before it is deleted."""
+    instance._deleted_counters = Campaign.objects.filter(pk=instance.pk).values_list(*SPEND_COUNTER_FIELDS).first()
+
+
+@receiver(post_delete, sender=Campaign)
+def remove_deleted_spend(sender: Any, instance: Campaign, **kwargs: Any) -> None:
+    """Take a deleted campaign's current spend off its brand's totals."""
+    stored = instance._deleted_counters
+    instance._deleted_counters = None
+    if stored is None:
+        return
+
+    daily, monthly = _current_spends(instance, stored)
+    if daily or monthly:
+        Brand.add_to_totals({instance.brand_id: (-daily, -monthly, instance.local_date())})
+
+
+@receiver(post_save, sender=Campaign)
+@receiver(post_delete, sender=Campaign)
+def invalidate_campaign_budget(sender: Any, instance: Campaign, **kwargs: Any) -> None:
+    """Drop a campaign's cached state when it changes."""
+    budget_cache.invalidate_campaigns([instance.pk])
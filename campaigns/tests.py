@@ -2,13 +2,21 @@
 Unit tests for campaigns app.
 """
 
+import random
+import threading
+import time
 from decimal import Decimal
-from django.test import TestCase
+from typing import Callable, List, TypeVar
+from django.db import connection, OperationalError
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from .models import Campaign, CampaignStatus, PauseReason
 from brands.models import Brand
 
+T = TypeVar('T')
+
 
 class CampaignModelTest(TestCase):
     """Test cases for Campaign model."""
@@ -258,3 +266,426 @@ class PauseReasonTest(TestCase):
         self.assertIn('OUTSIDE_SCHEDULE', choice_values)
         self.assertIn('NO_SCHEDULE', choice_values)
         self.assertIn('MANUAL', choice_values)
+
+
+class CampaignShardTest(TestCase):
+    """Test cases for splitting campaigns into ID range shards."""
+
+    def test_shards_partition_campaigns(self) -> None:
+        """Test that every campaign falls in exactly one shard."""
+        from .models import shard_bounds
+
+        self.assertEqual(shard_bounds(0, 1), (None, None))
+        with self.assertRaises(ValueError):
+            shard_bounds(3, 3)
+
+        brand = Brand.objects.create(
+            name="Shard Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        for index in range(20):
+            Campaign.objects.create(brand=brand, name=f"Campaign {index}")
+
+        counts = [
+            Campaign.objects.filter(Campaign.shard_condition((index, 3))).count()
+            for index in range(3)
+        ]
+        self.assertEqual(sum(counts), 20)
+
+
+class CampaignTransitionTest(TestCase):
+    """Test cases for the campaign transition log."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        self.brand = Brand.objects.create(
+            name="Transition Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(brand=self.brand, name="Transition Campaign")
+
+    def test_status_changes_are_logged(self) -> None:
+        """Test that creating, pausing and activating a campaign log transitions."""
+        from scheduling.models import Schedule
+
+        for day in range(7):
+            Schedule.objects.create(campaign=self.campaign, day_of_week=day, start_time='00:00', end_time='23:59')
+
+        self.campaign.pause(PauseReason.MANUAL)
+        self.campaign.name = "Renamed Campaign"
+        with CaptureQueriesContext(connection) as queries:
+            self.campaign.save()
+        self.assertTrue(self.campaign.activate())
+
+        # The loaded status is diffed against without re-reading the row
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT "campaigns"."status"')
+        ])
+        self.assertEqual(
+            list(self.campaign.transitions.order_by('id').values_list('status', 'pause_reason')),
+            [
+                (CampaignStatus.ACTIVE, None),
+                (CampaignStatus.PAUSED, PauseReason.MANUAL),
+                (CampaignStatus.ACTIVE, None),
+            ]
+        )
+
+    def test_bulk_enforcement_is_logged(self) -> None:
+        """Test that set-based pauses log one transition per campaign paused."""
+        from .models import CampaignTransition
+
+        over = [
+            Campaign.objects.create(brand=self.brand, name=f"Over {index}", daily_spend=Decimal('150.00'))
+            for index in range(3)
+        ]
+        for campaign in over:
+            campaign.add_spend(Decimal('1.00'))
+        self.campaign.pause(PauseReason.MANUAL)
+
+        paused = Campaign.pause_exceeding_budget('daily', PauseReason.DAILY_BUDGET_EXCEEDED)
+
+        self.assertEqual(sorted(paused), sorted(campaign.pk for campaign in over))
+        self.assertEqual(
+            CampaignTransition.objects.filter(pause_reason=PauseReason.DAILY_BUDGET_EXCEEDED).count(), 3
+        )
+        # Campaigns already paused are flagged without logging a transition
+        self.assertEqual(Campaign.pause_brand_campaigns(self.brand.pk, PauseReason.MANUAL), [])
+        self.assertEqual(self.campaign.transitions.count(), 2)
+        self.assertEqual(CampaignTransition.objects.filter(pause_reason=PauseReason.MANUAL).count(), 1)
+
+    def test_time_in_state(self) -> None:
+        """Test uptime and downtime over a range computed from the log in one query."""
+        from datetime import datetime, timedelta, timezone as dt_timezone
+        from .models import CampaignTransition
+
+        other = Campaign.objects.create(brand=self.brand, name="Late Campaign")
+        CampaignTransition.objects.all().delete()
+        start = datetime(2024, 6, 1, tzinfo=dt_timezone.utc)
+        end = start + timedelta(hours=10)
+        log = [
+            (self.campaign, CampaignStatus.ACTIVE, None, start - timedelta(days=3)),
+            (self.campaign, CampaignStatus.PAUSED, PauseReason.DAILY_BUDGET_EXCEEDED, start + timedelta(hours=2)),
+            (self.campaign, CampaignStatus.ACTIVE, None, start + timedelta(hours=5)),
+            (self.campaign, CampaignStatus.PAUSED, PauseReason.MANUAL, start + timedelta(hours=9)),
+            (self.campaign, CampaignStatus.ACTIVE, None, end + timedelta(hours=1)),
+            (other, CampaignStatus.ACTIVE, None, start + timedelta(hours=4)),
+        ]
+        for campaign, status, reason, moment in log:
+            CampaignTransition.record([campaign.pk], status, reason, moment)
+
+        with self.assertNumQueries(1):
+            report = CampaignTransition.time_in_state(start, end)
+
+        hour = 3600.0
+        self.assertEqual(report[self.campaign.pk], {
+            'uptime': 6 * hour,
+            'downtime': 4 * hour,
+            'downtime_by_reason': {PauseReason.DAILY_BUDGET_EXCEEDED: 3 * hour, PauseReason.MANUAL: hour},
+            'untracked': 0.0,
+            'uptime_ratio': 0.6,
+        })
+        self.assertEqual(report[other.pk]['uptime'], 6 * hour)
+        self.assertEqual(report[other.pk]['untracked'], 4 * hour)
+        self.assertEqual(
+            set(CampaignTransition.time_in_state(start, end, campaign_ids=[other.pk])), {other.pk}
+        )
+
+    def test_time_in_state_across_reason_change(self) -> None:
+        """Test that a reason change while paused is logged when it happens."""
+        from datetime import datetime, timedelta, timezone as dt_timezone
+        from unittest import mock
+        from .models import CampaignTransition
+
+        start = datetime(2024, 6, 1, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=start):
+            self.campaign.pause(PauseReason.DAILY_BUDGET_EXCEEDED)
+        with mock.patch('django.utils.timezone.now', return_value=start + timedelta(hours=2)):
+            self.campaign.pause(PauseReason.MANUAL)
+        with mock.patch('django.utils.timezone.now', return_value=start + timedelta(hours=5)):
+            self.campaign.lift_pause(PauseReason.DAILY_BUDGET_EXCEEDED)
+
+        self.assertEqual(self.campaign.pause_reason, PauseReason.MANUAL)
+        report = CampaignTransition.time_in_state(start, start + timedelta(hours=8))
+        hour = 3600.0
+        self.assertEqual(report[self.campaign.pk]['downtime_by_reason'], {
+            PauseReason.DAILY_BUDGET_EXCEEDED: 5 * hour,
+            PauseReason.MANUAL: 3 * hour,
+        })
+
+    def test_uptime_endpoint(self) -> None:
+        """Test the uptime report endpoint."""
+        from datetime import timedelta
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        start = timezone.now() - timedelta(hours=1)
+        response = client.get('/api/campaigns/uptime/', {
+            'start': start.isoformat(),
+            'campaign': [str(self.campaign.pk)],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['campaigns']), 1)
+        self.assertEqual(response.data['campaigns'][0]['campaign'], self.campaign.pk)
+        self.assertEqual(response.data['campaigns'][0]['downtime'], 0.0)
+
+        response = client.get('/api/campaigns/uptime/', {'start': timezone.now().isoformat(), 'end': start.isoformat()})
+        self.assertEqual(response.status_code, 400)
+
+
+class PauseFlagsTest(TestCase):
+    """Test cases for campaigns paused for several reasons at once."""
+
+    def setUp(self) -> None:
+        """Set up a campaign over its daily budget without schedules."""
+        self.brand = Brand.objects.create(
+            name="Flags Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(brand=self.brand, name="Flags Campaign")
+        self.campaign.add_spend(Decimal('150.00'))
+
+    def _schedule_all_week(self) -> None:
+        from scheduling.models import Schedule
+
+        for day in range(7):
+            Schedule.objects.create(campaign=self.campaign, day_of_week=day, start_time='00:00', end_time='23:59')
+
+    def test_enforcers_toggle_their_own_flag(self) -> None:
+        """Test that dayparting and budget enforcement keep each other's reason."""
+        from .models import PAUSE_FLAGS, CampaignTransition
+
+        self.assertEqual(Campaign.pause_outside_schedule(), 1)
+        self.assertEqual(Campaign.pause_exceeding_budget('daily', PauseReason.DAILY_BUDGET_EXCEEDED), [])
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.pause_reason, PauseReason.OUTSIDE_SCHEDULE)
+        self.assertEqual(
+            self.campaign.pause_flags,
+            PAUSE_FLAGS[PauseReason.OUTSIDE_SCHEDULE] | PAUSE_FLAGS[PauseReason.DAILY_BUDGET_EXCEEDED]
+        )
+
+        # Entering the schedule lifts its reason but the budget keeps the campaign paused
+        self._schedule_all_week()
+        self.assertEqual(Campaign.activate_within_schedule(), 0)
+        self.campaign.refresh_from_db()
+        self.assertTrue(self.campaign.is_paused())
+        self.assertEqual(self.campaign.pause_reason, PauseReason.DAILY_BUDGET_EXCEEDED)
+
+        Campaign.reset_spend_counters('daily')
+        self.assertEqual(Campaign.reactivate_paused(PauseReason.DAILY_BUDGET_EXCEEDED), [self.campaign.pk])
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.status, self.campaign.pause_reason, self.campaign.pause_flags),
+                         (CampaignStatus.ACTIVE, None, 0))
+        self.assertEqual(
+            list(self.campaign.transitions.order_by('id').values_list('status', 'pause_reason')),
+            [
+                (CampaignStatus.ACTIVE, None),
+                (CampaignStatus.PAUSED, PauseReason.OUTSIDE_SCHEDULE),
+                (CampaignStatus.PAUSED, PauseReason.DAILY_BUDGET_EXCEEDED),
+                (CampaignStatus.ACTIVE, None),
+            ]
+        )
+        self.assertEqual(CampaignTransition.objects.count(), 4)
+
+    def test_reset_does_not_flap_outside_schedule(self) -> None:
+        """Test that the reset keeps unscheduled campaigns paused and re-running enforcement writes nothing."""
+        self.assertEqual(len(Campaign.pause_exceeding_budget('daily', PauseReason.DAILY_BUDGET_EXCEEDED)), 1)
+        Campaign.reset_spend_counters('daily')
+
+        self.assertEqual(Campaign.reactivate_paused(PauseReason.DAILY_BUDGET_EXCEEDED), [])
+        self.campaign.refresh_from_db()
+        self.assertTrue(self.campaign.is_paused())
+        self.assertTrue(self.campaign.has_pause_reason(PauseReason.OUTSIDE_SCHEDULE))
+        self.assertFalse(self.campaign.has_pause_reason(PauseReason.DAILY_BUDGET_EXCEEDED))
+
+        updated_at = self.campaign.updated_at
+        self.assertEqual(Campaign.pause_outside_schedule(), 0)
+        self.assertEqual(Campaign.pause_exceeding_budget('daily', PauseReason.DAILY_BUDGET_EXCEEDED), [])
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.updated_at, updated_at)
+
+    def test_manual_status_changes_set_flags(self) -> None:
+        """Test that pausing, lifting and editing the status keep the flags in line."""
+        from .models import PAUSE_FLAGS
+
+        self.campaign.pause(PauseReason.DAILY_BUDGET_EXCEEDED)
+        self.campaign.pause(PauseReason.MANUAL)
+        self.assertEqual(self.campaign.pause_reason, PauseReason.DAILY_BUDGET_EXCEEDED)
+        self.assertFalse(self.campaign.lift_pause(PauseReason.DAILY_BUDGET_EXCEEDED))
+        self.assertEqual(self.campaign.pause_reason, PauseReason.MANUAL)
+        self.assertEqual(self.campaign.pause_flags, PAUSE_FLAGS[PauseReason.MANUAL])
+
+        self.campaign.status = CampaignStatus.ACTIVE
+        self.campaign.save(update_fields=['status'])
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.pause_flags, 0)
+
+        paused = Campaign.objects.create(
+            brand=self.brand,
+            name="Paused Campaign",
+            status=CampaignStatus.PAUSED,
+            pause_reason=PauseReason.NO_SCHEDULE
+        )
+        self.assertTrue(paused.has_pause_reason(PauseReason.NO_SCHEDULE))
+
+
+class CampaignSpendConcurrencyTest(TransactionTestCase):
+    """Stress test for concurrent spend increments on a single campaign."""
+
+    THREADS = 8
+    INCREMENTS_PER_THREAD = 25
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100000.00'),
+            monthly_budget=Decimal('1000000.00')
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            status=CampaignStatus.ACTIVE
+        )
+
+    def test_concurrent_add_spend_loses_no_updates(self) -> None:
+        """Test that many threads adding spend to one campaign lose no increments."""
+        barrier = threading.Barrier(self.THREADS)
+        errors: List[BaseException] = []
+
+        def worker() -> None:
+            try:
+                # Every thread works on its own stale copy of the campaign; any
+                # query can hit the shared in-memory database's table locks
+                campaign = self._with_retry(lambda: Campaign.objects.get(pk=self.campaign.pk))
+                barrier.wait(timeout=60)
+                for _ in range(self.INCREMENTS_PER_THREAD):
+                    self._with_retry(lambda: campaign.add_spend(Decimal('1.00')))
+            except BaseException as e:  # pragma: no cover - reported below
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        expected = Decimal(self.THREADS * self.INCREMENTS_PER_THREAD)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, expected)
+        self.assertEqual(self.campaign.monthly_spend, expected)
+
+    @staticmethod
+    def _with_retry(operation: Callable[[], T], timeout: float = 30.0) -> T:
+        """
+        Retry an operation on SQLite's transient 'database/table is locked' errors.
+
+        The shared in-memory test database reports table locks at once
+        instead of waiting for them, so operations are retried with a
+        jittered pause until the timeout runs out.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return operation()
+            except OperationalError as e:
+                if 'locked' not in str(e) or time.monotonic() >= deadline:
+                    raise
+                time.sleep(random.uniform(0.001, 0.02))
+
+
+class BudgetCacheTest(TestCase):
+    """Test cases for the cached budget state."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        from django.core.cache import cache
+
+        cache.clear()
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            daily_spend=Decimal('40.00')
+        )
+
+    def test_budget_check_without_queries(self) -> None:
+        """Test that a warm cache checks budgets without fetching the brand."""
+        from spending.services import SpendingService
+        from . import budget_cache
+
+        budget_cache.get_brand_budget(self.brand.pk)
+        campaign = Campaign.objects.get(pk=self.campaign.pk)
+
+        with self.assertNumQueries(0):
+            results = SpendingService().check_budget_limits(campaign)
+
+        self.assertFalse(results['daily_exceeded'])
+
+    def test_saves_invalidate_entries(self) -> None:
+        """Test that brand and campaign saves drop their cached state."""
+        from . import budget_cache
+
+        self.assertEqual(budget_cache.get_brand_budget(self.brand.pk).daily_budget, Decimal('100.00'))
+        self.brand.daily_budget = Decimal('50.00')
+        self.brand.save()
+        self.assertEqual(budget_cache.get_brand_budget(self.brand.pk).daily_budget, Decimal('50.00'))
+
+        self.assertEqual(budget_cache.get_campaign_budget(self.campaign.pk).status, CampaignStatus.ACTIVE)
+        self.campaign.pause(PauseReason.MANUAL)
+        self.assertEqual(budget_cache.get_campaign_budget(self.campaign.pk).status, CampaignStatus.PAUSED)
+
+    def test_set_based_updates_invalidate_entries(self) -> None:
+        """Test that UPDATEs bypassing the signals still drop cached counters."""
+        from . import budget_cache
+
+        budget_cache.get_campaign_budget(self.campaign.pk)
+        self.campaign.add_spend(Decimal('5.00'))
+        self.assertEqual(budget_cache.get_campaign_budget(self.campaign.pk).daily_spend, Decimal('45.00'))
+
+        Campaign.reset_spend_counters('daily')
+        self.assertEqual(budget_cache.get_campaign_budget(self.campaign.pk).daily_spend, Decimal('0.00'))
+
+    def test_hit_and_miss_stats(self) -> None:
+        """Test that lookups are counted as hits and misses."""
+        from . import budget_cache
+
+        budget_cache.reset_stats()
+        budget_cache.get_campaign_budget(self.campaign.pk)
+        budget_cache.get_campaign_budget(self.campaign.pk)
+
+        stats = budget_cache.cache_stats()
+        self.assertEqual(stats['campaign'], {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+        self.assertEqual(stats['brand']['hit_rate'], None)
+
+    def test_stats_api_served_from_cache(self) -> None:
+        """Test that campaign stats are answered from a warm cache."""
+        import json
+        from django.http import Http404
+        from django.test import RequestFactory
+        from .views import campaign_stats_api
+
+        request = RequestFactory().get('/')
+        campaign_stats_api(request, str(self.campaign.pk))
+
+        with self.assertNumQueries(0):
+            response = campaign_stats_api(request, str(self.campaign.pk))
+
+        stats = json.loads(response.content)
+        self.assertEqual(stats['brand_name'], "Test Brand")
+        self.assertEqual(stats['daily_spend'], 40.0)
+        self.assertEqual(stats['remaining_daily_budget'], 60.0)
+        self.assertFalse(stats['can_be_activated'])
+        with self.assertRaises(Http404):
+            campaign_stats_api(request, 'not-a-uuid')
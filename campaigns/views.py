@@ -3,8 +3,10 @@ Views for campaigns app.
 """
 
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse, HttpRequest, HttpResponse
+from django.core.exceptions import ValidationError
+from django.http import Http404, JsonResponse, HttpRequest, HttpResponse
 from typing import Dict, List
+from . import budget_cache
 from .models import Campaign, CampaignStatus, PauseReason
 
 
@@ -16,8 +18,8 @@ def campaign_dashboard(request: HttpRequest) -> HttpResponse:
     total_campaigns = campaigns.count()
     active_campaigns = campaigns.filter(status=CampaignStatus.ACTIVE).count()
     paused_campaigns = campaigns.filter(status=CampaignStatus.PAUSED).count()
-    total_daily_spend = sum(campaign.daily_spend for campaign in campaigns)
-    total_monthly_spend = sum(campaign.monthly_spend for campaign in campaigns)
+    total_daily_spend = sum(campaign.get_daily_spend() for campaign in campaigns)
+    total_monthly_spend = sum(campaign.get_monthly_spend() for campaign in campaigns)
     
     # Group by pause reason
     pause_reasons: Dict[str, int] = {}
@@ -54,34 +56,54 @@ def campaign_detail(request: HttpRequest, campaign_id: str) -> HttpResponse:
         'schedules': schedules,
         'remaining_daily_budget': campaign.get_remaining_daily_budget(),
         'remaining_monthly_budget': campaign.get_remaining_monthly_budget(),
-        'daily_budget_percentage': float((campaign.daily_spend / campaign.brand.daily_budget) * 100),
-        'monthly_budget_percentage': float((campaign.monthly_spend / campaign.brand.monthly_budget) * 100),
+        'daily_budget_percentage': float((campaign.get_daily_spend() / campaign.brand.daily_budget) * 100),
+        'monthly_budget_percentage': float((campaign.get_monthly_spend() / campaign.brand.monthly_budget) * 100),
     }
     
     return render(request, 'campaigns/detail.html', context)
 
 
 def campaign_stats_api(request: HttpRequest, campaign_id: str) -> JsonResponse:
-    """API endpoint for campaign statistics."""
-    campaign = get_object_or_404(Campaign, id=campaign_id)
+    """
+    API endpoint for campaign statistics.
+
+    Served from the budget cache, so a warm cache answers without
+    querying the database.
+    """
+    from scheduling.bitmap import WeeklyScheduleBitmap, rebuild_campaign_bitmaps
+
+    try:
+        campaign = budget_cache.get_campaign_budget(campaign_id)
+    except (Campaign.DoesNotExist, ValidationError):
+        raise Http404("No Campaign matches the given query.")
+    brand = budget_cache.get_brand_budget(campaign.brand_id)
+
+    now = brand.localtime()
+    daily_spend = campaign.spend('daily', now.date())
+    monthly_spend = campaign.spend('monthly', now.date())
+    bitmap = campaign.schedule_bitmap
+    if bitmap is None:
+        bitmap = rebuild_campaign_bitmaps([campaign_id])[campaign_id]
     
     stats = {
-        'id': str(campaign.id),
+        'id': str(campaign_id),
         'name': campaign.name,
-        'brand_name': campaign.brand.name,
+        'brand_name': brand.name,
         'status': campaign.status,
         'pause_reason': campaign.pause_reason,
-        'daily_spend': float(campaign.daily_spend),
-        'monthly_spend': float(campaign.monthly_spend),
-        'daily_budget': float(campaign.brand.daily_budget),
-        'monthly_budget': float(campaign.brand.monthly_budget),
-        'remaining_daily_budget': float(campaign.get_remaining_daily_budget()),
-        'remaining_monthly_budget': float(campaign.get_remaining_monthly_budget()),
-        'daily_budget_percentage': float((campaign.daily_spend / campaign.brand.daily_budget) * 100),
-        'monthly_budget_percentage': float((campaign.monthly_spend / campaign.brand.monthly_budget) * 100),
-        'is_active': campaign.is_active(),
-        'is_paused': campaign.is_paused(),
-        'can_be_activated': campaign.can_be_activated(),
+        'daily_spend': float(daily_spend),
+        'monthly_spend': float(monthly_spend),
+        'daily_budget': float(brand.daily_budget),
+        'monthly_budget': float(brand.monthly_budget),
+        'remaining_daily_budget': float(brand.daily_budget - daily_spend),
+        'remaining_monthly_budget': float(brand.monthly_budget - monthly_spend),
+        'daily_budget_percentage': float((daily_spend / brand.daily_budget) * 100),
+        'monthly_budget_percentage': float((monthly_spend / brand.monthly_budget) * 100),
+        'is_active': campaign.status == CampaignStatus.ACTIVE,
+        'is_paused': campaign.status == CampaignStatus.PAUSED,
+        'can_be_activated': budget_cache.can_be_activated(
+            campaign.brand_id, brand, daily_spend, monthly_spend, WeeklyScheduleBitmap(bitmap).covers(now)
+        ),
     }
     
     return JsonResponse(stats)
@@ -5,7 +5,9 @@ Django admin for scheduling app.
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
-from .models import Schedule, DayOfWeek
+from typing import Any
+from .models import Schedule, DayOfWeek, ScheduleTransition
+from .transitions import replan_campaigns
 
 
 @admin.register(Schedule)
@@ -84,7 +86,9 @@ class ScheduleAdmin(admin.ModelAdmin):
     
     def activate_schedules(self, request, queryset) -> None:
         """Admin action to activate selected schedules."""
+        campaign_ids = list(queryset.values_list('campaign_id', flat=True).distinct())
         updated = queryset.update(is_active=True)
+        replan_campaigns(campaign_ids)
         self.message_user(
             request,
             f'Successfully activated {updated} schedules.'
@@ -93,9 +97,28 @@ class ScheduleAdmin(admin.ModelAdmin):
     
     def deactivate_schedules(self, request, queryset) -> None:
         """Admin action to deactivate selected schedules."""
+        campaign_ids = list(queryset.values_list('campaign_id', flat=True).distinct())
         updated = queryset.update(is_active=False)
+        replan_campaigns(campaign_ids)
         self.message_user(
             request,
             f'Successfully deactivated {updated} schedules.'
         )
     deactivate_schedules.short_description = "Deactivate selected schedules"
+
+
+@admin.register(ScheduleTransition)
+class ScheduleTransitionAdmin(admin.ModelAdmin):
+    """Read-only admin interface for ScheduleTransition model."""
+    
+    list_display = ['campaign', 'transition_at', 'scheduled', 'updated_at']
+    
+    list_filter = ['scheduled', 'campaign__brand']
+    
+    search_fields = ['campaign__name', 'campaign__brand__name']
+    
+    def has_add_permission(self, request: Any) -> bool:
+        return False
+    
+    def has_change_permission(self, request: Any, obj: Any = None) -> bool:
+        return False
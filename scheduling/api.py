@@ -10,8 +10,9 @@ class ScheduleSerializer(serializers.ModelSerializer):
     def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
         start_time = data.get('start_time')
         end_time = data.get('end_time')
-        if start_time and end_time and start_time >= end_time:
-            raise serializers.ValidationError("End time must be after start time")
+        # An end time before the start time is an overnight window
+        if start_time and end_time and start_time == end_time:
+            raise serializers.ValidationError("End time must differ from start time")
         return data
 
 class ScheduleViewSet(viewsets.ModelViewSet):
@@ -0,0 +1,168 @@
+"""
+Compiled weekly dayparting bitmaps.
+
+A campaign's active schedules are compiled into a 7 x 1440 bit set, one bit
+per minute of the week (Monday 00:00 is bit 0), so checking whether a
+campaign is scheduled at a moment is a single bit lookup without a query.
+"""
+
+from datetime import datetime, time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+
+WEEK_MINUTES = 7 * MINUTES_PER_DAY
+
+BITMAP_BYTES = WEEK_MINUTES // 8
+
+
+def minute_of_week(moment: datetime) -> int:
+    """Get the minute of the week (0 = Monday 00:00) for a moment."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+class WeeklyScheduleBitmap:
+    """
+    A 7 x 1440 minute bit set of the times a campaign is scheduled to run.
+
+    Windows are compiled at minute resolution: a window covers every
+    minute whose start lies within ``start_time``-``end_time`` (inclusive),
+    so 09:00-18:00 covers the minutes 09:00 through 18:00. An overnight
+    window (end before start) runs on into the next day, wrapping from
+    Sunday to Monday, so it compiles to one contiguous run of bits.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data: Optional[Any] = None) -> None:
+        """
+        Initialize the bitmap.
+
+        Args:
+            data: Serialized bitmap (``bytes`` or ``memoryview``); empty if omitted
+        """
+        self.data = bytearray(data) if data is not None else bytearray(BITMAP_BYTES)
+        if len(self.data) != BITMAP_BYTES:
+            raise ValueError(f"Schedule bitmap must be {BITMAP_BYTES} bytes, got {len(self.data)}")
+
+    @classmethod
+    def from_windows(cls, windows: Iterable[Tuple[int, time, time]]) -> 'WeeklyScheduleBitmap':
+        """
+        Compile a bitmap from ``(day_of_week, start_time, end_time)`` windows.
+        """
+        bitmap = cls()
+        for day_of_week, start_time, end_time in windows:
+            bitmap.add_window(day_of_week, start_time, end_time)
+        return bitmap
+
+    def add_window(self, day_of_week: int, start_time: time, end_time: time) -> None:
+        """Set the bits of every minute covered by a window."""
+        first = start_time.hour * 60 + start_time.minute
+        if start_time.second or start_time.microsecond:
+            first += 1
+        last = end_time.hour * 60 + end_time.minute
+        if start_time > end_time:
+            last += MINUTES_PER_DAY
+
+        offset = day_of_week * MINUTES_PER_DAY
+        for minute in range(offset + first, offset + last + 1):
+            minute %= WEEK_MINUTES
+            self.data[minute >> 3] |= 1 << (minute & 7)
+
+    def is_set(self, minute: int) -> bool:
+        """Check whether a minute of the week is scheduled."""
+        return bool(self.data[minute >> 3] & (1 << (minute & 7)))
+
+    def covers(self, moment: datetime) -> bool:
+        """Check whether the campaign is scheduled at a moment."""
+        return self.is_set(minute_of_week(moment))
+
+    def next_change(self, minute: int) -> Optional[int]:
+        """
+        Get the number of minutes until the schedule state next changes.
+
+        Args:
+            minute: Minute of the week to start from
+
+        Returns:
+            Minutes from ``minute`` to the first minute with the opposite
+            state, or None if the schedule never changes (empty or 24/7)
+        """
+        state = self.is_set(minute)
+        uniform = 0xFF if state else 0x00
+        offset = 1
+        while offset < WEEK_MINUTES:
+            candidate = (minute + offset) % WEEK_MINUTES
+            # Skip whole bytes that are all in the current state
+            if candidate & 7 == 0 and self.data[candidate >> 3] == uniform:
+                offset += 8
+                continue
+            if self.is_set(candidate) != state:
+                return offset
+            offset += 1
+
+        return None
+
+    def to_bytes(self) -> bytes:
+        """Serialize the bitmap for storage."""
+        return bytes(self.data)
+
+
+def compile_bitmaps(campaign_ids: List[Any]) -> Dict[Any, bytes]:
+    """
+    Compile the bitmaps of several campaigns with one schedules query.
+
+    Args:
+        campaign_ids: Campaigns to compile
+
+    Returns:
+        Mapping of campaign ID to serialized bitmap (empty for campaigns
+        without active schedules)
+    """
+    from .models import Schedule
+
+    bitmaps = {campaign_id: WeeklyScheduleBitmap() for campaign_id in campaign_ids}
+    windows = Schedule.objects.filter(
+        campaign_id__in=campaign_ids,
+        is_active=True
+    ).values_list('campaign_id', 'day_of_week', 'start_time', 'end_time')
+
+    for campaign_id, day_of_week, start_time, end_time in windows:
+        bitmaps[campaign_id].add_window(day_of_week, start_time, end_time)
+
+    return {campaign_id: bitmap.to_bytes() for campaign_id, bitmap in bitmaps.items()}
+
+
+def rebuild_campaign_bitmaps(campaign_ids: List[Any]) -> Dict[Any, bytes]:
+    """
+    Recompile and store the bitmaps of several campaigns.
+
+    Args:
+        campaign_ids: Campaigns to rebuild
+
+    Returns:
+        Mapping of campaign ID to the stored bitmap
+    """
+    from campaigns.models import Campaign
+
+    from campaigns import budget_cache
+
+    bitmaps = compile_bitmaps(campaign_ids)
+    for campaign_id, data in bitmaps.items():
+        Campaign.objects.filter(pk=campaign_id).update(schedule_bitmap=data)
+    budget_cache.invalidate_campaigns(bitmaps)
+
+    return bitmaps
+
+
+def campaign_bitmap(campaign: Any) -> WeeklyScheduleBitmap:
+    """
+    Get a campaign's bitmap, compiling and storing it if it was never built.
+
+    Args:
+        campaign: The campaign (its ``schedule_bitmap`` field is read)
+    """
+    if campaign.schedule_bitmap is None:
+        campaign.schedule_bitmap = rebuild_campaign_bitmaps([campaign.pk])[campaign.pk]
+
+    return WeeklyScheduleBitmap(campaign.schedule_bitmap)
@@ -0,0 +1,146 @@
+"""
+Django management command to benchmark dayparting enforcement.
+"""
+
+import time
+from datetime import time as dt_time
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+from brands.models import Brand
+from campaigns.models import PAUSE_FLAGS, Campaign, CampaignStatus, PauseReason
+from scheduling.models import Schedule
+from scheduling.services import SchedulingService
+from typing import Any, Callable, Dict, Tuple
+
+
+class Command(BaseCommand):
+    """Management command to time dayparting enforcement at several campaign counts."""
+
+    help = 'Benchmark dayparting enforcement on generated campaigns (all changes are rolled back)'
+
+    # Campaigns generated per brand
+    CAMPAIGNS_PER_BRAND = 1000
+
+    def add_arguments(self, parser: Any) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[10000],
+            help='Numbers of campaigns to benchmark',
+        )
+        parser.add_argument(
+            '--outside',
+            type=float,
+            default=0.5,
+            help='Fraction of campaigns outside their schedule right now',
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Also time the per-campaign pause/activate loop',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle the command execution."""
+        outside = options['outside']
+        outside_every = max(1, round(1 / outside)) if outside > 0 else None
+
+        for size in options['sizes']:
+            seconds, queries = self._run(size, outside_every, SchedulingService().enforce_dayparting)
+            line = f'{size} campaigns: set-based enforcement {seconds:.3f}s, {queries} queries'
+
+            if options['compare']:
+                seconds, queries = self._run(size, outside_every, self._per_campaign)
+                line += f'; per-campaign loop {seconds:.3f}s, {queries} queries'
+
+            self.stdout.write(self.style.SUCCESS(line))
+
+    def _run(self, size: int, outside_every: Any, enforce: Callable[[], Any]) -> Tuple[float, int]:
+        """Time one enforcement on ``size`` generated campaigns inside a rolled back transaction."""
+        with transaction.atomic():
+            self._generate(size, outside_every)
+
+            queries = [0]
+
+            def count(execute: Callable[..., Any], *args: Any) -> Any:
+                queries[0] += 1
+                return execute(*args)
+
+            with connection.execute_wrapper(count):
+                start = time.perf_counter()
+                results = enforce()
+                seconds = time.perf_counter() - start
+
+            self.stdout.write(f'  results: {results}')
+            transaction.set_rollback(True)
+
+        return seconds, queries[0]
+
+    @staticmethod
+    def _per_campaign() -> Dict[str, int]:
+        """Enforce dayparting one campaign at a time, as before set-based enforcement."""
+        results = {'activated': 0, 'paused': 0}
+        now = timezone.now()
+
+        for campaign in Campaign.objects.filter(status=CampaignStatus.ACTIVE):
+            if not Schedule.covering(now).filter(campaign=campaign).exists():
+                campaign.pause(PauseReason.OUTSIDE_SCHEDULE)
+                results['paused'] += 1
+
+        scheduled = Schedule.covering(now).select_related('campaign')
+        for schedule in scheduled:
+            campaign = schedule.campaign
+            if campaign.is_paused() and campaign.pause_reason in [
+                PauseReason.OUTSIDE_SCHEDULE,
+                PauseReason.NO_SCHEDULE
+            ]:
+                if campaign.activate():
+                    results['activated'] += 1
+
+        return results
+
+    def _generate(self, size: int, outside_every: Any) -> None:
+        """
+        Create active campaigns scheduled today and paused ones scheduled tomorrow.
+
+        Every ``outside_every``-th campaign is in the wrong state for its
+        schedule, so enforcement has to flip it.
+        """
+        today = timezone.now().weekday()
+        brand_count = (size + self.CAMPAIGNS_PER_BRAND - 1) // self.CAMPAIGNS_PER_BRAND
+        brands = Brand.objects.bulk_create([
+            Brand(
+                name=f'Benchmark Brand {index}',
+                daily_budget=Decimal('100.00'),
+                monthly_budget=Decimal('3000.00')
+            )
+            for index in range(brand_count)
+        ])
+
+        campaigns = []
+        schedules = []
+        for index in range(size):
+            flip = outside_every is not None and index % outside_every == 0
+            scheduled_today = (index // 2) % 2 == 0
+            active = scheduled_today != flip
+            campaign = Campaign(
+                brand=brands[index // self.CAMPAIGNS_PER_BRAND],
+                name=f'Benchmark Campaign {index}',
+                status=CampaignStatus.ACTIVE if active else CampaignStatus.PAUSED,
+                pause_reason=None if active else PauseReason.OUTSIDE_SCHEDULE,
+                pause_flags=0 if active else PAUSE_FLAGS[PauseReason.OUTSIDE_SCHEDULE]
+            )
+            campaigns.append(campaign)
+            schedules.append(Schedule(
+                campaign=campaign,
+                day_of_week=today if scheduled_today else (today + 1) % 7,
+                start_time=dt_time(0, 0),
+                end_time=dt_time(23, 59, 59)
+            ))
+
+        Campaign.objects.bulk_create(campaigns, batch_size=5000)
+        Schedule.objects.bulk_create(schedules, batch_size=5000)
@@ -12,12 +12,26 @@ class Command(BaseCommand):
     
     help = 'Enforce dayparting rules for all campaigns'
     
+    def add_arguments(self, parser: Any) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            '--transitions',
+            action='store_true',
+            help='Only apply due schedule transitions instead of checking every campaign',
+        )
+    
     def handle(self, *args: Any, **options: Any) -> None:
         """Handle the command execution."""
         self.stdout.write('Enforcing dayparting rules...')
         
-        scheduling_service = SchedulingService()
-        results = scheduling_service.enforce_dayparting()
+        if options['transitions']:
+            from scheduling.transitions import apply_due_transitions
+            
+            results = apply_due_transitions()
+            self.stdout.write(f'{results["due"]} campaigns had a due schedule transition')
+        else:
+            scheduling_service = SchedulingService()
+            results = scheduling_service.enforce_dayparting()
         
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0002_campaign_schedule_bitmap'),
+        ('scheduling', '0001_initial'),
+    ]
+
+    operations = [
+        # Allow several windows per campaign and day (split dayparts)
+        migrations.AlterUniqueTogether(
+            name='schedule',
+            unique_together={('campaign', 'day_of_week', 'start_time', 'end_time')},
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def plan_existing_campaigns(apps, schema_editor):
+    """Make every campaign due so the first transitions run plans it."""
+    Campaign = apps.get_model('campaigns', 'Campaign')
+    ScheduleTransition = apps.get_model('scheduling', 'ScheduleTransition')
+
+    now = timezone.now()
+    batch = []
+    for campaign_id in Campaign.objects.values_list('pk', flat=True).iterator(chunk_size=2000):
+        batch.append(ScheduleTransition(campaign_id=campaign_id, transition_at=now, scheduled=False))
+        if len(batch) >= 2000:
+            ScheduleTransition.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ScheduleTransition.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0002_campaign_schedule_bitmap'),
+        ('scheduling', '0002_schedule_multiple_windows'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleTransition',
+            fields=[
+                ('campaign', models.OneToOneField(help_text='Campaign this transition is for', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='schedule_transition', serialize=False, to='campaigns.campaign')),
+                ('transition_at', models.DateTimeField(db_index=True, help_text="When the campaign's schedule state is next re-evaluated")),
+                ('scheduled', models.BooleanField(help_text='Whether the campaign is scheduled to run from transition_at')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Schedule Transition',
+                'verbose_name_plural': 'Schedule Transitions',
+                'db_table': 'schedule_transitions',
+                'ordering': ['transition_at'],
+            },
+        ),
+        migrations.RunPython(plan_existing_campaigns, migrations.RunPython.noop),
+    ]
@@ -4,11 +4,15 @@ Scheduling models for budget management system.
 
 from __future__ import annotations
 from django.db import models
+from django.db.models import Exists, F, OuterRef, Q
 from django.core.validators import MinValueValidator, MaxValueValidator
 from typing import Optional, List, Any
 import uuid
+from brands.models import Brand
 from campaigns.models import Campaign
-from datetime import time
+from datetime import datetime, time
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
 
 
 class DayOfWeek(models.IntegerChoices):
@@ -74,12 +78,23 @@ class Schedule(models.Model):
     def __str__(self) -> str:
         return f"{self.campaign.name} - {self.get_day_of_week_display()} {self.start_time}-{self.end_time}"
     
+    @property
+    def is_overnight(self) -> bool:
+        """Check whether the window wraps past midnight into the next day."""
+        return bool(self.start_time and self.end_time and self.start_time > self.end_time)
+    
     def clean(self) -> None:
-        """Validate that end_time is after start_time."""
+        """
+        Validate the time range.
+        
+        An end time before the start time is an overnight window that runs
+        from the start time on ``day_of_week`` until the end time on the
+        following day; an empty window is rejected.
+        """
         from django.core.exceptions import ValidationError
         
-        if self.start_time and self.end_time and self.start_time >= self.end_time:
-            raise ValidationError("End time must be after start time")
+        if self.start_time and self.end_time and self.start_time == self.end_time:
+            raise ValidationError("End time must differ from start time")
     
     def save(self, *args: Any, **kwargs: Any) -> None:
         """Override save to validate time range."""
@@ -87,7 +102,9 @@ class Schedule(models.Model):
         super().save(*args, **kwargs)
     
     def is_time_in_range(self, check_time: time) -> bool:
-        """Check if a given time falls within this schedule's range."""
+        """Check if a given time falls within this schedule's range (either side of midnight for overnight windows)."""
+        if self.is_overnight:
+            return bool(check_time >= self.start_time or check_time <= self.end_time)
         return bool(self.start_time <= check_time <= self.end_time)
     
     @classmethod
@@ -100,24 +117,166 @@ class Schedule(models.Model):
     
     @classmethod
     def get_schedule_for_campaign_and_day(cls, campaign: Campaign, day_of_week: int) -> Optional['Schedule']:
-        """Get schedule for a campaign on a specific day."""
-        try:
-            return cls.objects.get(campaign=campaign, day_of_week=day_of_week, is_active=True)
-        except cls.DoesNotExist:
-            return None
+        """Get the earliest schedule for a campaign on a specific day."""
+        return cls.objects.filter(
+            campaign=campaign,
+            day_of_week=day_of_week,
+            is_active=True
+        ).order_by('start_time').first()
     
     @classmethod
-    def is_campaign_scheduled_now(cls, campaign: Campaign) -> bool:
-        """Check if a campaign should be active right now based on its schedules."""
+    def get_schedules_for_campaign_and_day(cls, campaign: Campaign, day_of_week: int) -> List['Schedule']:
+        """Get all active schedules (windows) for a campaign on a specific day."""
+        return list(cls.objects.filter(
+            campaign=campaign,
+            day_of_week=day_of_week,
+            is_active=True
+        ).order_by('start_time', 'end_time'))
+    
+    @classmethod
+    def covering(cls, moment: Optional[datetime] = None) -> models.QuerySet:
+        """
+        Get the active schedules whose window covers a moment.
+
+        Combine with ``Exists(...filter(campaign=OuterRef('pk')))`` to filter
+        campaigns by schedule in a single query. Overnight windows cover the
+        moment from their start on their own day or until their end on the
+        following day.
+
+        The moment is truncated to the minute, matching the compiled bitmap:
+        a window ending at 18:00 covers 18:00:00 through 18:00:59.
+
+        Args:
+            moment: The moment to check (defaults to now)
+        """
         from django.utils import timezone
+
+        moment = moment or timezone.now()
+        day = moment.weekday()
+        check_time = moment.time().replace(second=0, microsecond=0)
+
+        same_day = Q(day_of_week=day, start_time__lte=check_time) & (
+            Q(end_time__gte=check_time) | Q(start_time__gt=F('end_time'))
+        )
+        from_previous_day = Q(
+            day_of_week=(day - 1) % 7,
+            start_time__gt=F('end_time'),
+            end_time__gte=check_time
+        )
+
+        return cls.objects.filter(same_day | from_previous_day, is_active=True)
+
+    @classmethod
+    def scheduled_condition(cls, moment: Optional[datetime] = None) -> Q:
+        """
+        Get a filter for Campaign querysets matching scheduled campaigns.
+
+        Schedules are in the local time of the campaign's brand, so the
+        moment is converted to each brand timezone in use and matched with
+        one ``EXISTS`` subquery per timezone.
+
+        Args:
+            moment: The moment to check (defaults to now)
+        """
+        from django.utils import timezone
+        from zoneinfo import ZoneInfo
+        from brands.models import Brand
+
+        moment = moment or timezone.now()
+        condition = Q(pk__in=[])
+        for tz in Brand.objects.order_by().values_list('timezone', flat=True).distinct():
+            covering = cls.covering(moment.astimezone(ZoneInfo(tz))).filter(campaign=OuterRef('pk'))
+            condition |= Q(brand__timezone=tz) & Q(Exists(covering))
+
+        return condition
+
+    @classmethod
+    def is_campaign_scheduled_now(cls, campaign: Campaign) -> bool:
+        """Check if a campaign should be active right now (in its brand's local time) based on its compiled schedule."""
+        from campaigns import budget_cache
+        from .bitmap import campaign_bitmap
         
-        now = timezone.now()
-        current_day = now.weekday()  # 0=Monday, 6=Sunday
-        current_time = now.time()
-        
-        schedule = cls.get_schedule_for_campaign_and_day(campaign, current_day)
-        
-        if not schedule:
-            return False
-        
-        return schedule.is_time_in_range(current_time)
+        # The cached brand budget carries the timezone, so the brand is not fetched
+        return campaign_bitmap(campaign).covers(budget_cache.brand_budget_for(campaign).localtime())
+
+
+class ScheduleTransition(models.Model):
+    """
+    The next moment a campaign's dayparting state changes.
+
+    One row per campaign with a schedule boundary ahead, indexed by time so
+    the transition scheduler only touches campaigns whose boundary is due.
+    """
+
+    campaign: models.OneToOneField = models.OneToOneField(
+        Campaign,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='schedule_transition',
+        help_text="Campaign this transition is for"
+    )
+
+    transition_at: models.DateTimeField = models.DateTimeField(
+        db_index=True,
+        help_text="When the campaign's schedule state is next re-evaluated"
+    )
+
+    scheduled: models.BooleanField = models.BooleanField(
+        help_text="Whether the campaign is scheduled to run from transition_at"
+    )
+
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'schedule_transitions'
+        ordering = ['transition_at']
+        verbose_name = 'Schedule Transition'
+        verbose_name_plural = 'Schedule Transitions'
+
+    def __str__(self) -> str:
+        state = 'on' if self.scheduled else 'off'
+        return f"{self.campaign_id} {state} at {self.transition_at}"
+
+
+@receiver(post_save, sender=Schedule)
+@receiver(post_delete, sender=Schedule)
+def rebuild_schedule_bitmap(sender: Any, instance: Schedule, origin: Any = None, **kwargs: Any) -> None:
+    from .bitmap import rebuild_campaign_bitmaps
+    from .transitions import replan_campaigns
+
+    # Deletes cascading from the campaign need no rebuild
+    if origin is not None and not isinstance(origin, Schedule) and getattr(origin, 'model', None) is not Schedule:
+        return
+
+    bitmaps = rebuild_campaign_bitmaps([instance.campaign_id])
+    if Schedule.campaign.is_cached(instance):
+        instance.campaign.schedule_bitmap = bitmaps[instance.campaign_id]
+
+    replan_campaigns([instance.campaign_id], rebuild=False)
+
+
+@receiver(post_save, sender=Campaign)
+def plan_new_campaign(sender: Any, instance: Campaign, created: bool = False, raw: bool = False, **kwargs: Any) -> None:
+    from .transitions import plan_campaigns
+
+    # New campaigns are checked against their (possibly empty) schedule on
+    # the next transitions run
+    if created and not raw:
+        plan_campaigns([instance.pk], due_now=True)
+
+
+@receiver(post_init, sender=Brand)
+def remember_brand_timezone(sender: Any, instance: Brand, **kwargs: Any) -> None:
+    instance._initial_timezone = instance.__dict__.get('timezone')
+
+
+@receiver(post_save, sender=Brand)
+def replan_brand_campaigns(sender: Any, instance: Brand, created: bool = False, raw: bool = False, **kwargs: Any) -> None:
+    from .transitions import replan_campaigns
+
+    # Schedules are in the brand's local time, so moving it shifts every boundary
+    if created or raw or instance.timezone == instance._initial_timezone:
+        return
+
+    instance._initial_timezone = instance.timezone
+    replan_campaigns(list(instance.campaigns.values_list('pk', flat=True)), rebuild=False)
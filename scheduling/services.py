@@ -3,10 +3,14 @@ Scheduling services for budget management system.
 """
 
 import logging
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, List, Optional, Set
+from django.db import transaction
 from django.utils import timezone
-from campaigns.models import Campaign, CampaignStatus, PauseReason
+from campaigns import budget_cache
+from campaigns.models import Campaign, CampaignStatus, Shard
 from .models import Schedule
+from .bitmap import campaign_bitmap
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +29,11 @@ class SchedulingService:
     
     def is_campaign_scheduled_now(self, campaign: Campaign) -> bool:
         """
-        Check if a campaign should be active right now based on its schedules.
+        Check if a campaign should be active right now based on its schedules,
+        which are in the local time of the campaign's brand.
+        
+        This is a bit lookup in the campaign's compiled weekly schedule and
+        does not query the database.
         
         Args:
             campaign: The campaign to check
@@ -33,72 +41,38 @@ class SchedulingService:
         Returns:
             True if the campaign should be active, False otherwise
         """
-        now = timezone.now()
-        current_day = now.weekday()  # 0=Monday, 6=Sunday
-        current_time = now.time()
-        
-        schedule = Schedule.get_schedule_for_campaign_and_day(campaign, current_day)
-        
-        if not schedule:
-            return False
-        
-        return schedule.is_time_in_range(current_time)
+        return campaign_bitmap(campaign).covers(budget_cache.brand_budget_for(campaign).localtime())
     
     def get_campaigns_that_should_be_active(self) -> List[Campaign]:
         """
         Get all campaigns that should be active right now based on their schedules.
         
+        A campaign with several windows covering now is returned once.
+        
         Returns:
             List of campaigns that should be active
         """
-        now = timezone.now()
-        current_day = now.weekday()
-        current_time = now.time()
-        
-        # Get all active schedules for today
-        schedules = Schedule.objects.filter(
-            day_of_week=current_day,
-            is_active=True,
-            start_time__lte=current_time,
-            end_time__gte=current_time
-        ).select_related('campaign')
-        
-        return [schedule.campaign for schedule in schedules]
+        return list(Campaign.objects.filter(Schedule.scheduled_condition()))
     
     def get_campaigns_that_should_be_paused(self) -> List[Campaign]:
         """
         Get all campaigns that should be paused right now based on their schedules.
         
         Returns:
-            List of campaigns that should be paused
+            List of active campaigns without a schedule window covering now
         """
-        now = timezone.now()
-        current_day = now.weekday()
-        current_time = now.time()
-        
-        # Get all campaigns that are currently active
-        active_campaigns = Campaign.objects.filter(status=CampaignStatus.ACTIVE)
-        
-        campaigns_to_pause = []
-        
-        for campaign in active_campaigns:
-            schedule = Schedule.get_schedule_for_campaign_and_day(campaign, current_day)
-            
-            if not schedule:
-                # No schedule for today, should be paused
-                campaigns_to_pause.append(campaign)
-            elif not schedule.is_time_in_range(current_time):
-                # Outside scheduled time, should be paused
-                campaigns_to_pause.append(campaign)
-        
-        return campaigns_to_pause
+        return list(Campaign.objects.filter(~Schedule.scheduled_condition(), status=CampaignStatus.ACTIVE))
     
-    def enforce_dayparting(self) -> dict:
+    def enforce_dayparting(self, shard: Optional[Shard] = None) -> dict:
         """
         Enforce dayparting rules for all campaigns.
         
-        This method checks all campaigns and ensures they are in the correct
-        state based on their dayparting schedules.
+        Both sets of campaigns are computed by the database with ``EXISTS``
+        subqueries over the schedules covering now and flipped with two
+        bulk UPDATEs, so the cost does not grow with one query per campaign.
+        
+        Args:
+            shard: Only enforce the campaigns of this ``(index, count)`` shard
         
         Returns:
             Dictionary with results of the enforcement
@@ -112,35 +86,13 @@ class SchedulingService:
         }
         
         try:
-            # Pause campaigns that should be paused
-            campaigns_to_pause = self.get_campaigns_that_should_be_paused()
-            
-            for campaign in campaigns_to_pause:
-                try:
-                    if campaign.is_active():
-                        campaign.pause(PauseReason.OUTSIDE_SCHEDULE)
-                        results['paused'] += 1
-                        logger.info(f"Paused campaign {campaign.id} due to dayparting")
-                except Exception as e:
-                    logger.error(f"Error pausing campaign {campaign.id}: {e}")
-                    results['errors'] += 1
-            
-            # Activate campaigns that should be active
-            campaigns_that_should_be_active = self.get_campaigns_that_should_be_active()
-            
-            for campaign in campaigns_that_should_be_active:
-                try:
-                    if campaign.is_paused() and campaign.pause_reason in [
-                        PauseReason.OUTSIDE_SCHEDULE,
-                        PauseReason.NO_SCHEDULE
-                    ]:
-                        if campaign.can_be_activated():
-                            campaign.activate()
-                            results['activated'] += 1
-                            logger.info(f"Activated campaign {campaign.id} due to dayparting")
-                except Exception as e:
-                    logger.error(f"Error activating campaign {campaign.id}: {e}")
-                    results['errors'] += 1
+            now = timezone.now()
+            with transaction.atomic():
+                # Pause campaigns that should be paused
+                results['paused'] = Campaign.pause_outside_schedule(now, shard=shard)
+                
+                # Activate campaigns that should be active
+                results['activated'] = Campaign.activate_within_schedule(now, shard=shard)
             
             logger.info(f"Dayparting enforcement completed: {results}")
             
@@ -198,12 +150,13 @@ class SchedulingService:
             'is_scheduled_now': self.is_campaign_scheduled_now(campaign)
         }
         
+        # A day can have several windows, listed in start time order
         for schedule in schedules:
             day_name = schedule.get_day_of_week_display()
-            summary['schedules_by_day'][day_name] = {
+            summary['schedules_by_day'].setdefault(day_name, []).append({
                 'start_time': schedule.start_time.strftime('%H:%M'),
                 'end_time': schedule.end_time.strftime('%H:%M'),
                 'is_active': schedule.is_active
-            }
+            })
         
         return summary 
\ No newline at end of file
@@ -4,6 +4,7 @@ Unit tests for scheduling app.
 
 from decimal import Decimal
 from datetime import time, date
+from unittest import mock
 from django.test import TestCase
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -75,17 +76,18 @@ class ScheduleModelTest(TestCase):
         schedule.full_clean()
 
     def test_schedule_validation_end_time_before_start_time(self) -> None:
-        """Test schedule validation when end_time is before start_time."""
+        """Test that an end_time before start_time is a valid overnight window."""
         schedule = Schedule(
             campaign=self.campaign,
             day_of_week=DayOfWeek.MONDAY,
             start_time=time(18, 0),  # 18:00
-            end_time=time(9, 0),     # 09:00 (before start)
+            end_time=time(9, 0),     # 09:00 the next day
             is_active=True
         )
         
-        with self.assertRaises(ValidationError):
-            schedule.full_clean()
+        # This should not raise an exception
+        schedule.full_clean()
+        self.assertTrue(schedule.is_overnight)
 
     def test_schedule_validation_end_time_equal_start_time(self) -> None:
         """Test schedule validation when end_time equals start_time."""
@@ -118,6 +120,12 @@ class ScheduleModelTest(TestCase):
         # Test times outside range
         self.assertFalse(schedule.is_time_in_range(time(8, 59)))  # Before start
         self.assertFalse(schedule.is_time_in_range(time(18, 1)))  # After end
+        
+        # Overnight windows cover both sides of midnight
+        schedule.start_time, schedule.end_time = time(22, 0), time(2, 0)
+        self.assertTrue(schedule.is_time_in_range(time(23, 0)))
+        self.assertTrue(schedule.is_time_in_range(time(1, 0)))
+        self.assertFalse(schedule.is_time_in_range(time(12, 0)))
 
     def test_get_active_schedules_for_campaign(self) -> None:
         """Test get_active_schedules_for_campaign class method."""
@@ -344,3 +352,544 @@ class SchedulingServiceTest(TestCase):
         self.assertIn('schedules_by_day', summary)
         self.assertIn('is_scheduled_now', summary)
         self.assertEqual(summary['total_schedules'], 2)
+
+
+class WeeklyScheduleBitmapTest(TestCase):
+    """Test cases for compiled weekly schedule bitmaps."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            status=CampaignStatus.ACTIVE
+        )
+        self.service = SchedulingService()
+
+    def test_window_boundaries(self) -> None:
+        """Test that windows cover their start and end minutes only."""
+        from datetime import datetime
+        from .bitmap import WeeklyScheduleBitmap
+
+        bitmap = WeeklyScheduleBitmap.from_windows([(DayOfWeek.TUESDAY, time(9, 0), time(18, 0))])
+
+        self.assertTrue(bitmap.covers(datetime(2024, 1, 2, 9, 0)))    # Tuesday start
+        self.assertTrue(bitmap.covers(datetime(2024, 1, 2, 18, 0)))   # Tuesday end
+        self.assertFalse(bitmap.covers(datetime(2024, 1, 2, 8, 59)))
+        self.assertFalse(bitmap.covers(datetime(2024, 1, 2, 18, 1)))
+        self.assertFalse(bitmap.covers(datetime(2024, 1, 1, 12, 0)))  # Monday
+        self.assertEqual(WeeklyScheduleBitmap(bitmap.to_bytes()).to_bytes(), bitmap.to_bytes())
+
+    def test_bitmap_rebuilt_on_schedule_save_and_delete(self) -> None:
+        """Test that saving and deleting schedules recompiles the stored bitmap."""
+        now = timezone.now()
+        schedule = Schedule.objects.create(
+            campaign=self.campaign,
+            day_of_week=now.weekday(),
+            start_time=time(0, 0),
+            end_time=time(23, 59, 59)
+        )
+        self.assertTrue(self.service.is_campaign_scheduled_now(schedule.campaign))
+
+        schedule.is_active = False
+        schedule.save()
+        self.campaign.refresh_from_db()
+        self.assertFalse(self.service.is_campaign_scheduled_now(self.campaign))
+
+        schedule.is_active = True
+        schedule.save()
+        schedule.delete()
+        self.campaign.refresh_from_db()
+        self.assertFalse(self.service.is_campaign_scheduled_now(self.campaign))
+
+    def test_scheduled_now_check_is_query_free(self) -> None:
+        """Test that checking a loaded campaign does not query the database."""
+        self.service.create_default_schedule(self.campaign)
+        campaign = Campaign.objects.select_related('brand').get(pk=self.campaign.pk)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.service.is_campaign_scheduled_now(campaign))
+            self.assertTrue(Schedule.is_campaign_scheduled_now(campaign))
+            self.assertTrue(campaign.can_be_activated())
+
+    def test_missing_bitmap_is_compiled_on_demand(self) -> None:
+        """Test that campaigns without a stored bitmap are compiled once."""
+        self.service.create_default_schedule(self.campaign)
+        Campaign.objects.filter(pk=self.campaign.pk).update(schedule_bitmap=None)
+        campaign = Campaign.objects.select_related('brand').get(pk=self.campaign.pk)
+
+        self.assertTrue(self.service.is_campaign_scheduled_now(campaign))
+        self.assertIsNotNone(Campaign.objects.get(pk=self.campaign.pk).schedule_bitmap)
+
+    def test_scheduled_now_check_does_not_fetch_brand(self) -> None:
+        """Test that the brand timezone comes from the cache rather than the brand row."""
+        self.service.create_default_schedule(self.campaign)
+        campaign = Campaign.objects.get(pk=self.campaign.pk)
+        self.assertTrue(Schedule.is_campaign_scheduled_now(campaign))
+
+        campaign = Campaign.objects.get(pk=self.campaign.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(Schedule.is_campaign_scheduled_now(campaign))
+
+
+class MultipleWindowsTest(TestCase):
+    """Test cases for several dayparting windows on the same day."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            status=CampaignStatus.ACTIVE
+        )
+        self.service = SchedulingService()
+
+    def _create_split_day(self, campaign: Campaign, day_of_week: int) -> None:
+        """Create morning and evening windows on one day."""
+        Schedule.objects.create(campaign=campaign, day_of_week=day_of_week, start_time=time(7, 0), end_time=time(9, 0))
+        Schedule.objects.create(campaign=campaign, day_of_week=day_of_week, start_time=time(17, 0), end_time=time(21, 0))
+
+    def test_split_day_is_scheduled_in_either_window(self) -> None:
+        """Test that both windows of a day are honoured."""
+        from datetime import datetime
+        from .bitmap import campaign_bitmap
+
+        self._create_split_day(self.campaign, DayOfWeek.TUESDAY)
+        self.campaign.refresh_from_db()
+        bitmap = campaign_bitmap(self.campaign)
+
+        for moment, expected in [
+            (datetime(2024, 1, 2, 8, 0), True),
+            (datetime(2024, 1, 2, 18, 0), True),
+            (datetime(2024, 1, 2, 12, 0), False),
+            (datetime(2024, 1, 1, 8, 0), False),
+        ]:
+            self.assertEqual(bitmap.covers(moment), expected, moment)
+            self.assertEqual(Schedule.covering(moment).filter(campaign=self.campaign).exists(), expected, moment)
+
+    def test_end_boundary_matches_across_evaluators(self) -> None:
+        """Test that the bitmap and the set-based filter agree within the end minute."""
+        from datetime import datetime, timezone as dt_timezone
+        from .bitmap import campaign_bitmap
+
+        Schedule.objects.create(
+            campaign=self.campaign, day_of_week=DayOfWeek.TUESDAY, start_time=time(9, 0), end_time=time(18, 0)
+        )
+        self.campaign.refresh_from_db()
+        bitmap = campaign_bitmap(self.campaign)
+
+        # The end minute is covered through its last second
+        for moment, expected in [
+            (datetime(2024, 1, 2, 18, 0, 30, tzinfo=dt_timezone.utc), True),
+            (datetime(2024, 1, 2, 18, 0, 59, 999999, tzinfo=dt_timezone.utc), True),
+            (datetime(2024, 1, 2, 18, 1, tzinfo=dt_timezone.utc), False),
+            (datetime(2024, 1, 2, 8, 59, 30, tzinfo=dt_timezone.utc), False),
+        ]:
+            scheduled = Campaign.objects.filter(Schedule.scheduled_condition(moment), pk=self.campaign.pk).exists()
+            self.assertEqual(bitmap.covers(moment), expected, moment)
+            self.assertEqual(scheduled, expected, moment)
+
+    def test_day_lookups_with_several_windows(self) -> None:
+        """Test that day lookups and summaries handle several windows."""
+        self._create_split_day(self.campaign, DayOfWeek.MONDAY)
+
+        first = Schedule.get_schedule_for_campaign_and_day(self.campaign, DayOfWeek.MONDAY)
+        assert first is not None
+        self.assertEqual(first.start_time, time(7, 0))
+        self.assertEqual(len(Schedule.get_schedules_for_campaign_and_day(self.campaign, DayOfWeek.MONDAY)), 2)
+
+        summary = self.service.get_campaign_schedule_summary(self.campaign)
+        self.assertEqual(
+            [window['start_time'] for window in summary['schedules_by_day']['Monday']],
+            ['07:00', '17:00']
+        )
+
+    def test_active_campaigns_returned_once(self) -> None:
+        """Test that overlapping windows covering now do not duplicate a campaign."""
+        day = timezone.now().weekday()
+        Schedule.objects.create(campaign=self.campaign, day_of_week=day, start_time=time(0, 0), end_time=time(23, 59, 59))
+        Schedule.objects.create(campaign=self.campaign, day_of_week=day, start_time=time(0, 0), end_time=time(23, 59, 58))
+
+        self.assertEqual(self.service.get_campaigns_that_should_be_active(), [self.campaign])
+
+
+class ScheduleTransitionTest(TestCase):
+    """Test cases for event-driven dayparting transitions."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        from django.core.cache import cache
+
+        cache.clear()
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            status=CampaignStatus.ACTIVE
+        )
+
+    def test_next_change(self) -> None:
+        """Test finding the next schedule boundary, including across the week end."""
+        from .bitmap import MINUTES_PER_DAY, WeeklyScheduleBitmap
+
+        bitmap = WeeklyScheduleBitmap.from_windows([(DayOfWeek.TUESDAY, time(9, 0), time(18, 0))])
+        tuesday = DayOfWeek.TUESDAY * MINUTES_PER_DAY
+
+        self.assertEqual(bitmap.next_change(tuesday + 8 * 60), 60)
+        self.assertEqual(bitmap.next_change(tuesday + 12 * 60), 6 * 60 + 1)  # 18:01
+        self.assertEqual(bitmap.next_change(tuesday + 19 * 60), 7 * MINUTES_PER_DAY - 10 * 60)
+        self.assertIsNone(WeeklyScheduleBitmap().next_change(0))
+        self.assertIsNone(WeeklyScheduleBitmap.from_windows(
+            [(day, time(0, 0), time(23, 59)) for day in range(7)]
+        ).next_change(0))
+
+    def test_new_campaign_is_due(self) -> None:
+        """Test that new campaigns are due for a first check."""
+        from .models import ScheduleTransition
+
+        transition = ScheduleTransition.objects.get(campaign=self.campaign)
+        self.assertLessEqual(transition.transition_at, timezone.now())
+        self.assertFalse(transition.scheduled)
+
+    def test_due_transition_pauses_and_plans_next_boundary(self) -> None:
+        """Test that a due campaign is paused and its next boundary planned."""
+        from datetime import datetime, timedelta
+        from .models import ScheduleTransition
+        from .transitions import apply_due_transitions
+
+        now = timezone.now()
+        tomorrow = (now + timedelta(days=1)).date()
+        Schedule.objects.create(
+            campaign=self.campaign,
+            day_of_week=tomorrow.weekday(),
+            start_time=time(9, 0),
+            end_time=time(18, 0)
+        )
+
+        results = apply_due_transitions()
+        self.campaign.refresh_from_db()
+
+        self.assertEqual(results['due'], 1)
+        self.assertEqual(results['paused'], 1)
+        self.assertEqual(self.campaign.pause_reason, PauseReason.OUTSIDE_SCHEDULE)
+
+        transition = ScheduleTransition.objects.get(campaign=self.campaign)
+        self.assertEqual(transition.transition_at, datetime.combine(tomorrow, time(9, 0), tzinfo=now.tzinfo))
+        self.assertTrue(transition.scheduled)
+
+        # Nothing is due until the boundary
+        self.assertEqual(apply_due_transitions()['due'], 0)
+
+    def test_due_transition_activates_scheduled_campaign(self) -> None:
+        """Test that a campaign paused outside its schedule is activated."""
+        from datetime import datetime, timedelta
+        from .models import ScheduleTransition
+        from .transitions import apply_due_transitions
+
+        self.campaign.pause(PauseReason.OUTSIDE_SCHEDULE)
+        now = timezone.now()
+        Schedule.objects.create(
+            campaign=self.campaign,
+            day_of_week=now.weekday(),
+            start_time=time(0, 0),
+            end_time=time(23, 59, 59)
+        )
+
+        results = apply_due_transitions()
+        self.campaign.refresh_from_db()
+
+        self.assertEqual(results['activated'], 1)
+        self.assertTrue(self.campaign.is_active())
+        transition = ScheduleTransition.objects.get(campaign=self.campaign)
+        self.assertEqual(
+            transition.transition_at,
+            datetime.combine(now.date() + timedelta(days=1), time(0, 0), tzinfo=now.tzinfo)
+        )
+        self.assertFalse(transition.scheduled)
+
+    def test_schedule_edit_replans_and_wakes(self) -> None:
+        """Test that schedule edits make the campaign due and wake the task."""
+        from datetime import timedelta
+        from .models import ScheduleTransition
+        from .transitions import apply_due_transitions
+
+        ScheduleTransition.objects.filter(campaign=self.campaign).update(
+            transition_at=timezone.now() + timedelta(days=1)
+        )
+
+        with mock.patch('scheduling.transitions.wake') as wake, self.captureOnCommitCallbacks(execute=True):
+            Schedule.objects.create(
+                campaign=self.campaign,
+                day_of_week=(timezone.now().weekday() + 2) % 7,
+                start_time=time(9, 0),
+                end_time=time(18, 0)
+            )
+
+        wake.assert_called_once()
+        self.assertEqual(apply_due_transitions()['due'], 1)
+
+    def test_full_batch_wakes_for_the_rest(self) -> None:
+        """Test that a batch cut short by the limit wakes the task again at once."""
+        from .transitions import apply_due_transitions
+
+        Campaign.objects.create(brand=self.brand, name="Second Campaign", status=CampaignStatus.ACTIVE)
+        now = timezone.now()
+
+        with mock.patch('scheduling.transitions.wake') as wake:
+            self.assertEqual(apply_due_transitions(now, limit=1)['due'], 1)
+            wake.assert_called_once_with(now)
+            wake.reset_mock()
+            self.assertEqual(apply_due_transitions(now, limit=2)['due'], 1)
+            wake.assert_not_called()
+
+    def test_wake_is_deduplicated(self) -> None:
+        """Test that only the earliest pending wake-up is scheduled."""
+        from datetime import timedelta
+        from .transitions import claim_wake, release_wake
+
+        now = timezone.now()
+        self.assertTrue(claim_wake(now + timedelta(minutes=10)))
+        self.assertFalse(claim_wake(now + timedelta(minutes=20)))
+        self.assertTrue(claim_wake(now + timedelta(minutes=5)))
+
+        release_wake(now + timedelta(minutes=5))
+        self.assertTrue(claim_wake(now + timedelta(minutes=20)))
+
+    def test_wake_is_queued_on_commit(self) -> None:
+        """Test that the task is queued after the transaction commits and a broker error frees the claim."""
+        from datetime import timedelta
+        from .transitions import claim_wake, wake
+
+        at = timezone.now() + timedelta(minutes=10)
+        with mock.patch('tasks.budget_tasks.apply_dayparting_transitions_task.apply_async') as apply_async:
+            apply_async.side_effect = ConnectionError("broker down")
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertTrue(wake(at))
+                apply_async.assert_not_called()
+
+        apply_async.assert_called_once_with(eta=at, retry=False)
+        self.assertTrue(claim_wake(at))
+
+
+class SetBasedDaypartingTest(TestCase):
+    """Test cases for set-based dayparting enforcement."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.service = SchedulingService()
+        self.today = timezone.now().weekday()
+
+    def _campaign(self, name: str, scheduled: bool, **fields: object) -> Campaign:
+        """Create a campaign scheduled all of today or all of tomorrow."""
+        campaign = Campaign.objects.create(brand=self.brand, name=name, **fields)
+        Schedule.objects.create(
+            campaign=campaign,
+            day_of_week=self.today if scheduled else (self.today + 1) % 7,
+            start_time=time(0, 0),
+            end_time=time(23, 59, 59)
+        )
+        return campaign
+
+    def test_enforce_dayparting_flips_both_sets(self) -> None:
+        """Test that campaigns are paused and activated by schedule and budget."""
+        outside = self._campaign("Outside", scheduled=False, status=CampaignStatus.ACTIVE)
+        inside = self._campaign(
+            "Inside", scheduled=True,
+            status=CampaignStatus.PAUSED, pause_reason=PauseReason.OUTSIDE_SCHEDULE
+        )
+        over_budget = self._campaign(
+            "Over Budget", scheduled=True, daily_spend=Decimal('150.00'),
+            status=CampaignStatus.PAUSED, pause_reason=PauseReason.OUTSIDE_SCHEDULE
+        )
+        manual = self._campaign(
+            "Manual", scheduled=True,
+            status=CampaignStatus.PAUSED, pause_reason=PauseReason.MANUAL
+        )
+
+        results = self.service.enforce_dayparting()
+
+        self.assertEqual(results, {'activated': 1, 'paused': 1, 'errors': 0})
+        for campaign in (outside, inside, over_budget, manual):
+            campaign.refresh_from_db()
+        self.assertEqual(outside.pause_reason, PauseReason.OUTSIDE_SCHEDULE)
+        self.assertTrue(inside.is_active())
+        self.assertIsNone(inside.pause_reason)
+        self.assertTrue(over_budget.is_paused())
+        self.assertEqual(manual.pause_reason, PauseReason.MANUAL)
+
+    def test_query_count_does_not_grow_with_campaigns(self) -> None:
+        """Test that enforcement issues the same queries for any number of campaigns."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def count_queries() -> int:
+            with CaptureQueriesContext(connection) as context:
+                self.service.enforce_dayparting()
+            return len(context.captured_queries)
+
+        self._campaign("Campaign 0", scheduled=False, status=CampaignStatus.ACTIVE)
+        few = count_queries()
+
+        for index in range(1, 10):
+            self._campaign(f"Campaign {index}", scheduled=False, status=CampaignStatus.ACTIVE)
+        self.assertEqual(count_queries(), few)
+
+
+class OvernightScheduleTest(TestCase):
+    """Test cases for windows that wrap past midnight."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            status=CampaignStatus.ACTIVE
+        )
+
+    def test_covering_includes_both_days(self) -> None:
+        """Test that an overnight window covers its evening and the next morning."""
+        from datetime import datetime
+
+        schedule = Schedule.objects.create(
+            campaign=self.campaign,
+            day_of_week=DayOfWeek.SUNDAY,
+            start_time=time(22, 0),
+            end_time=time(2, 0)
+        )
+
+        def covered(moment: datetime) -> bool:
+            return Schedule.covering(moment).filter(pk=schedule.pk).exists()
+
+        self.assertTrue(covered(datetime(2024, 1, 7, 23, 30)))   # Sunday evening
+        self.assertTrue(covered(datetime(2024, 1, 8, 1, 30)))    # Monday morning
+        self.assertTrue(covered(datetime(2024, 1, 8, 2, 0)))
+        self.assertFalse(covered(datetime(2024, 1, 8, 2, 1)))
+        self.assertFalse(covered(datetime(2024, 1, 7, 21, 59)))
+        self.assertFalse(covered(datetime(2024, 1, 7, 1, 30)))   # Sunday morning
+
+    def test_compiled_paths_wrap_past_midnight(self) -> None:
+        """Test that the bitmap and the set-based filter agree on overnight windows."""
+        from datetime import datetime
+        from .bitmap import campaign_bitmap
+
+        Schedule.objects.create(
+            campaign=self.campaign,
+            day_of_week=DayOfWeek.SUNDAY,
+            start_time=time(22, 0),
+            end_time=time(2, 0)
+        )
+        self.campaign.refresh_from_db()
+        bitmap = campaign_bitmap(self.campaign)
+
+        for moment, expected in [
+            (datetime(2024, 1, 7, 22, 0), True),
+            (datetime(2024, 1, 7, 23, 59), True),
+            (datetime(2024, 1, 8, 0, 0), True),    # Wraps to Monday
+            (datetime(2024, 1, 8, 2, 0), True),
+            (datetime(2024, 1, 8, 2, 1), False),
+            (datetime(2024, 1, 7, 21, 59), False),
+        ]:
+            self.assertEqual(bitmap.covers(moment), expected, moment)
+            self.assertEqual(Schedule.covering(moment).filter(campaign=self.campaign).exists(), expected, moment)
+
+    def test_no_transition_at_midnight(self) -> None:
+        """Test that a campaign running across midnight has no boundary there."""
+        from datetime import datetime
+        from .bitmap import WeeklyScheduleBitmap
+        from .transitions import next_transition
+
+        bitmap = WeeklyScheduleBitmap.from_windows([(DayOfWeek.MONDAY, time(22, 0), time(2, 0))])
+
+        self.assertEqual(next_transition(bitmap, datetime(2024, 1, 1, 23, 0)), datetime(2024, 1, 2, 2, 1))
+
+
+class BrandTimezoneDaypartingTest(TestCase):
+    """Test cases for dayparting in the brand's local time."""
+
+    def setUp(self) -> None:
+        """Set up a Tuesday 04:00-06:00 window for a UTC and a Tokyo brand."""
+        self.campaigns = {}
+        for tz in ('UTC', 'Asia/Tokyo'):
+            brand = Brand.objects.create(
+                name=f"Brand {tz}",
+                daily_budget=Decimal('100.00'),
+                monthly_budget=Decimal('1000.00'),
+                timezone=tz
+            )
+            campaign = Campaign.objects.create(brand=brand, name=f"Campaign {tz}", status=CampaignStatus.ACTIVE)
+            Schedule.objects.create(
+                campaign=campaign,
+                day_of_week=DayOfWeek.TUESDAY,
+                start_time=time(4, 0),
+                end_time=time(6, 0)
+            )
+            self.campaigns[tz] = campaign
+
+        # Monday 20:00 UTC is Tuesday 05:00 in Tokyo
+        from datetime import datetime, timezone as dt_timezone
+        self.moment = datetime(2024, 1, 1, 20, 0, tzinfo=dt_timezone.utc)
+
+    def test_set_based_filter_uses_local_time(self) -> None:
+        """Test that schedule filters evaluate each brand in its own timezone."""
+        scheduled = Campaign.objects.filter(Schedule.scheduled_condition(self.moment))
+
+        self.assertEqual(list(scheduled), [self.campaigns['Asia/Tokyo']])
+
+    def test_compiled_paths_use_local_time(self) -> None:
+        """Test that the bitmap check uses local time."""
+        from .bitmap import campaign_bitmap
+
+        for tz, expected in (('UTC', False), ('Asia/Tokyo', True)):
+            campaign = Campaign.objects.select_related('brand').get(pk=self.campaigns[tz].pk)
+            self.assertEqual(campaign_bitmap(campaign).covers(campaign.brand.localtime(self.moment)), expected)
+
+    def test_transitions_are_planned_in_local_time(self) -> None:
+        """Test that the next boundary is the local window end, stored as an instant."""
+        from datetime import datetime, timezone as dt_timezone
+        from .models import ScheduleTransition
+        from .transitions import plan_campaigns
+
+        plan_campaigns([self.campaigns['Asia/Tokyo'].pk], self.moment)
+
+        transition = ScheduleTransition.objects.get(campaign=self.campaigns['Asia/Tokyo'])
+        # 06:01 in Tokyo is 21:01 UTC
+        self.assertEqual(transition.transition_at, datetime(2024, 1, 1, 21, 1, tzinfo=dt_timezone.utc))
+        self.assertFalse(transition.scheduled)
+
+    def test_timezone_change_replans_campaigns(self) -> None:
+        """Test that moving a brand to another timezone re-plans its campaigns."""
+        from datetime import timedelta
+        from .models import ScheduleTransition
+
+        campaign = self.campaigns['UTC']
+        ScheduleTransition.objects.filter(campaign=campaign).update(transition_at=timezone.now() + timedelta(days=1))
+
+        brand = campaign.brand
+        brand.timezone = 'America/New_York'
+        brand.save()
+
+        self.assertLessEqual(ScheduleTransition.objects.get(campaign=campaign).transition_at, timezone.now())
@@ -0,0 +1,251 @@
+"""
+Event-driven dayparting transitions.
+
+Instead of scanning every campaign each minute, each campaign's next
+schedule boundary is computed from its compiled weekly bitmap and stored in
+``ScheduleTransition``. The transition task wakes up when the earliest
+boundary is due, flips only the campaigns whose boundary has passed and
+plans their next one, then schedules itself for the following boundary.
+Schedule edits mark the affected campaigns due immediately and wake the
+task, so the new schedule takes effect right away.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from campaigns.models import SCHEDULE_PAUSE_REASONS, Campaign, PauseReason
+from .bitmap import WeeklyScheduleBitmap, campaign_bitmap, minute_of_week, rebuild_campaign_bitmaps
+from .models import ScheduleTransition
+
+logger = logging.getLogger(__name__)
+
+# Cache key holding the timestamp of the pending transition task wake-up
+WAKE_CACHE_KEY = 'scheduling:transitions:wake_at'
+
+# How long a pending wake-up is trusted after its due time
+WAKE_GRACE_SECONDS = 120
+
+
+def next_transition(bitmap: WeeklyScheduleBitmap, moment: datetime) -> Optional[datetime]:
+    """
+    Get the next moment a schedule's state changes.
+
+    Args:
+        bitmap: The campaign's compiled schedule
+        moment: The moment to start from, in the brand's local time
+
+    Returns:
+        The start of the first minute with the opposite state, or None if
+        the schedule never changes
+    """
+    offset = bitmap.next_change(minute_of_week(moment))
+    if offset is None:
+        return None
+
+    return moment.replace(second=0, microsecond=0) + timedelta(minutes=offset)
+
+
+def plan_campaigns(campaign_ids: List[Any], moment: Optional[datetime] = None, due_now: bool = False) -> int:
+    """
+    Store the next transition of several campaigns.
+
+    Args:
+        campaign_ids: Campaigns to plan
+        moment: The moment to plan from (defaults to now)
+        due_now: Make the campaigns due at ``moment`` so their current state
+            is enforced on the next run, instead of planning the next boundary
+
+    Returns:
+        Number of campaigns with a transition planned
+    """
+    moment = moment or timezone.now()
+    bitmaps = {}
+    timezones = {}
+    for campaign_id, data, tz in Campaign.objects.filter(pk__in=campaign_ids).values_list(
+        'pk', 'schedule_bitmap', 'brand__timezone'
+    ):
+        bitmaps[campaign_id] = data
+        timezones[campaign_id] = ZoneInfo(tz)
+    missing = [campaign_id for campaign_id, data in bitmaps.items() if data is None]
+    if missing:
+        bitmaps.update(rebuild_campaign_bitmaps(missing))
+
+    transitions = []
+    for campaign_id, data in bitmaps.items():
+        bitmap = WeeklyScheduleBitmap(data)
+        # Schedules are in the brand's local time
+        local = moment.astimezone(timezones[campaign_id])
+        if due_now:
+            transitions.append(ScheduleTransition(
+                campaign_id=campaign_id,
+                transition_at=moment,
+                scheduled=bitmap.covers(local)
+            ))
+            continue
+
+        transition_at = next_transition(bitmap, local)
+        if transition_at is not None:
+            transitions.append(ScheduleTransition(
+                campaign_id=campaign_id,
+                transition_at=transition_at,
+                scheduled=bitmap.is_set(minute_of_week(transition_at))
+            ))
+
+    with transaction.atomic():
+        ScheduleTransition.objects.filter(campaign_id__in=campaign_ids).delete()
+        ScheduleTransition.objects.bulk_create(transitions)
+
+    return len(transitions)
+
+
+def replan_campaigns(campaign_ids: List[Any], rebuild: bool = True) -> None:
+    """
+    Re-plan campaigns after their schedules changed.
+
+    The campaigns are made due immediately and the transition task is woken
+    once the surrounding transaction commits.
+
+    Args:
+        campaign_ids: Campaigns whose schedules changed
+        rebuild: Recompile the campaigns' bitmaps first (bulk schedule
+            updates bypass the schedule signals that normally do this)
+    """
+    if rebuild:
+        rebuild_campaign_bitmaps(campaign_ids)
+
+    now = timezone.now()
+    plan_campaigns(campaign_ids, now, due_now=True)
+    transaction.on_commit(lambda: wake(now))
+
+
+def next_due() -> Optional[datetime]:
+    """Get the earliest planned transition."""
+    return ScheduleTransition.objects.order_by('transition_at').values_list('transition_at', flat=True).first()
+
+
+def apply_due_transitions(moment: Optional[datetime] = None, limit: int = 1000) -> Dict[str, int]:
+    """
+    Flip the campaigns whose transition is due and plan their next one.
+
+    When ``limit`` campaigns were due, more may be waiting, so the
+    transition task is woken again right away for the rest.
+
+    Args:
+        moment: The moment to apply transitions at (defaults to now)
+        limit: Maximum number of campaigns handled in one call
+
+    Returns:
+        Dictionary with the number of due, activated and paused campaigns
+        and errors
+    """
+    moment = moment or timezone.now()
+    results = {
+        'due': 0,
+        'activated': 0,
+        'paused': 0,
+        'errors': 0
+    }
+
+    due_ids = list(
+        ScheduleTransition.objects.filter(transition_at__lte=moment)
+        .order_by('transition_at')
+        .values_list('campaign_id', flat=True)[:limit]
+    )
+    results['due'] = len(due_ids)
+    if not due_ids:
+        return results
+
+    for campaign in Campaign.objects.filter(pk__in=due_ids).select_related('brand'):
+        try:
+            scheduled = campaign_bitmap(campaign).covers(campaign.brand.localtime(moment))
+            if not scheduled and not campaign.has_pause_reason(*SCHEDULE_PAUSE_REASONS):
+                was_active = campaign.is_active()
+                campaign.pause(PauseReason.OUTSIDE_SCHEDULE)
+                if was_active:
+                    results['paused'] += 1
+                    logger.info(f"Paused campaign {campaign.id} at schedule transition")
+            elif scheduled and campaign.has_pause_reason(*SCHEDULE_PAUSE_REASONS):
+                if campaign.lift_pause(*SCHEDULE_PAUSE_REASONS):
+                    results['activated'] += 1
+                    logger.info(f"Activated campaign {campaign.id} at schedule transition")
+        except Exception as e:
+            logger.error(f"Error applying schedule transition for campaign {campaign.id}: {e}")
+            results['errors'] += 1
+
+    plan_campaigns(due_ids, moment)
+    if results['due'] == limit:
+        wake(moment)
+
+    return results
+
+
+def claim_wake(at: datetime) -> bool:
+    """
+    Record a wake-up of the transition task unless an earlier one is pending.
+
+    The record is written with ``cache.add`` so of concurrent callers only
+    one claims it. An earlier wake-up takes the record over. The record
+    expires shortly after ``at`` so a wake-up that was lost (e.g. a worker
+    died) does not block later ones.
+
+    Returns:
+        True if the caller should schedule the task for ``at``
+    """
+    stamp = at.timestamp()
+    timeout = max(0, (at - timezone.now()).total_seconds()) + WAKE_GRACE_SECONDS
+    while not cache.add(WAKE_CACHE_KEY, stamp, timeout=timeout):
+        pending = cache.get(WAKE_CACHE_KEY)
+        if pending is not None and pending <= stamp:
+            return False
+        if pending is not None:
+            cache.delete(WAKE_CACHE_KEY)
+
+    return True
+
+
+def release_wake(moment: datetime) -> None:
+    """Forget the pending wake-up once it has been reached."""
+    pending = cache.get(WAKE_CACHE_KEY)
+    if pending is not None and pending <= moment.timestamp():
+        cache.delete(WAKE_CACHE_KEY)
+
+
+def wake(at: Optional[datetime]) -> bool:
+    """
+    Schedule the transition task for a moment unless an earlier run is pending.
+
+    The task is queued once the surrounding transaction commits, so a save
+    never waits on the broker while holding its locks. The wait is capped
+    at ``DAYPARTING_TRANSITION_MAX_SLEEP`` seconds so a lost wake-up is
+    recovered from.
+
+    Args:
+        at: When the task should run (None only applies the cap)
+
+    Returns:
+        True if the wake-up was claimed and the task will be queued
+    """
+    latest = timezone.now() + timedelta(seconds=settings.DAYPARTING_TRANSITION_MAX_SLEEP)
+    at = min(at, latest) if at is not None else latest
+    if not claim_wake(at):
+        return False
+
+    transaction.on_commit(lambda: _enqueue_wake(at))
+    return True
+
+
+def _enqueue_wake(at: datetime) -> None:
+    """Queue the transition task, forgetting the wake-up if the broker is unavailable."""
+    from tasks.budget_tasks import apply_dayparting_transitions_task
+
+    try:
+        apply_dayparting_transitions_task.apply_async(eta=at, retry=False)
+    except Exception as e:
+        if cache.get(WAKE_CACHE_KEY) == at.timestamp():
+            cache.delete(WAKE_CACHE_KEY)
+        logger.error(f"Error scheduling dayparting transitions task: {e}")
@@ -127,8 +127,9 @@ def dayparting_status(request: HttpRequest) -> Any:
     active_schedules: List[Schedule] = []
     inactive_schedules: List[Schedule] = []
     
+    covering_ids = set(Schedule.covering(now).values_list('id', flat=True))
     for schedule in today_schedules:
-        if schedule.is_time_in_range(current_time):
+        if schedule.id in covering_ids:
             active_schedules.append(schedule)
         else:
             inactive_schedules.append(schedule)
@@ -0,0 +1,253 @@
+"""
+Redis write-behind accumulator for high-volume spend tracking.
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from campaigns import budget_cache
+from campaigns.models import Campaign
+
+logger = logging.getLogger(__name__)
+
+CENTS = Decimal('100')
+
+
+def to_cents(amount: Decimal) -> int:
+    """Convert a currency amount to integer cents."""
+    return int((Decimal(str(amount)) * CENTS).to_integral_value())
+
+
+def from_cents(cents: int) -> Decimal:
+    """Convert integer cents back to a currency amount."""
+    return (Decimal(cents) / CENTS).quantize(Decimal('0.01'))
+
+
+@dataclass
+class BudgetState:
+    """Budget limits of a campaign's brand and the campaign's persisted counters."""
+    daily_budget: Decimal
+    monthly_budget: Decimal
+    daily_spend: Decimal
+    monthly_spend: Decimal
+
+
+@dataclass
+class FlushBatch:
+    """Spend accumulated for a campaign that is being flushed to the database."""
+    campaign_id: str
+    token: str
+    amounts: Dict[date, Decimal]
+    counts: Dict[date, int]
+
+    def external_id(self, spend_date: date) -> str:
+        """Deterministic idempotency key so a retried flush cannot insert the row twice."""
+        return f"accumulator:{self.campaign_id}:{self.token}:{spend_date.isoformat()}"
+
+
+class SpendAccumulator:
+    """
+    Accumulate spends in per-campaign Redis hashes until they are flushed.
+
+    Each campaign has a *pending* hash that receives atomic ``HINCRBY``
+    increments (in cents, per spend date) plus a random batch token. A flush
+    renames the pending hash to an *in-flight* hash, writes it to the
+    database under external IDs derived from the token, and deletes it only
+    after the database transaction committed. If a flush crashes, the
+    in-flight hash is picked up again and the external IDs make the retried
+    insert a no-op, so spend is never counted twice.
+    """
+
+    KEY_PREFIX = 'spend_acc'
+
+    def __init__(self, client: Optional[Any] = None, budget_ttl: Optional[int] = None) -> None:
+        """
+        Initialize the accumulator.
+
+        Args:
+            client: Redis client (defaults to one built from ``REDIS_URL``)
+            budget_ttl: Seconds cached campaign counters stay valid
+        """
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(settings.REDIS_URL)
+
+        self.client = client
+        self.budget_ttl = budget_ttl if budget_ttl is not None else settings.SPEND_ACCUMULATOR_BUDGET_TTL
+
+    def _pending_key(self, campaign_id: Any) -> str:
+        return f"{self.KEY_PREFIX}:pending:{campaign_id}"
+
+    def _inflight_key(self, campaign_id: Any) -> str:
+        return f"{self.KEY_PREFIX}:inflight:{campaign_id}"
+
+    def _counters_key(self, campaign_id: Any) -> str:
+        return f"{self.KEY_PREFIX}:counters:{campaign_id}"
+
+    def _dirty_key(self) -> str:
+        return f"{self.KEY_PREFIX}:dirty"
+
+    def add(self, campaign_id: Any, amount: Decimal, spend_date: date) -> Decimal:
+        """
+        Atomically add a spend to a campaign's pending hash.
+
+        Args:
+            campaign_id: UUID of the campaign
+            amount: The amount spent
+            spend_date: The date of the spend
+
+        Returns:
+            Total spend not yet in the database for the campaign, including
+            this one and any batch being flushed
+        """
+        key = self._pending_key(campaign_id)
+        day = spend_date.isoformat()
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hsetnx(key, 'token', uuid.uuid4().hex)
+        pipe.hincrby(key, f"cents:{day}", to_cents(amount))
+        pipe.hincrby(key, f"count:{day}", 1)
+        pipe.hincrby(key, 'total', to_cents(amount))
+        pipe.sadd(self._dirty_key(), str(campaign_id))
+        pipe.hget(self._inflight_key(campaign_id), 'total')
+        results = pipe.execute()
+
+        return from_cents(int(results[3]) + int(results[5] or 0))
+
+    def pending_amount(self, campaign_id: Any) -> Decimal:
+        """Get the spend accumulated for a campaign that is not yet in the database."""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hget(self._pending_key(campaign_id), 'total')
+        pipe.hget(self._inflight_key(campaign_id), 'total')
+        return sum((from_cents(int(value)) for value in pipe.execute() if value), Decimal('0.00'))
+
+    def get_budget_state(self, campaign: Campaign) -> BudgetState:
+        """
+        Get the budget state for a campaign.
+
+        The limits come from the budget cache, which brand saves invalidate.
+        Only the campaign's persisted counters are cached here, loaded on a
+        miss and dropped when a flush writes new ones.
+
+        Args:
+            campaign: The campaign (its brand is never fetched)
+
+        Returns:
+            Brand budgets and the campaign's persisted counters
+        """
+        brand = budget_cache.brand_budget_for(campaign)
+        key = self._counters_key(campaign.id)
+        cached = self.client.hgetall(key)
+
+        if cached:
+            values = {field.decode() if isinstance(field, bytes) else field: int(value) for field, value in cached.items()}
+            daily_spend = from_cents(values['daily_spend'])
+            monthly_spend = from_cents(values['monthly_spend'])
+        else:
+            daily_spend = campaign.get_daily_spend()
+            monthly_spend = campaign.get_monthly_spend()
+            pipe = self.client.pipeline(transaction=True)
+            pipe.hset(key, mapping={
+                'daily_spend': to_cents(daily_spend),
+                'monthly_spend': to_cents(monthly_spend),
+            })
+            pipe.expire(key, self.budget_ttl)
+            pipe.execute()
+
+        return BudgetState(
+            daily_budget=Decimal(brand.daily_budget),
+            monthly_budget=Decimal(brand.monthly_budget),
+            daily_spend=daily_spend,
+            monthly_spend=monthly_spend
+        )
+
+    def invalidate_counters(self, campaign_id: Any) -> None:
+        """Drop the cached counters for a campaign."""
+        self.client.delete(self._counters_key(campaign_id))
+
+    def dirty_campaigns(self) -> List[str]:
+        """Get the IDs of campaigns that have spend waiting to be flushed."""
+        return sorted(
+            member.decode() if isinstance(member, bytes) else member
+            for member in self.client.smembers(self._dirty_key())
+        )
+
+    def begin_flush(self, campaign_id: Any) -> Optional[FlushBatch]:
+        """
+        Move a campaign's pending spend to its in-flight hash and read it.
+
+        An in-flight hash left behind by an interrupted flush is returned
+        first, unchanged, so the retry uses the same token.
+
+        Args:
+            campaign_id: UUID of the campaign
+
+        Returns:
+            The batch to write, or None if nothing is pending
+        """
+        import redis
+
+        inflight = self._inflight_key(campaign_id)
+        if not self.client.exists(inflight):
+            try:
+                self.client.renamenx(self._pending_key(campaign_id), inflight)
+            except redis.ResponseError:
+                # Nothing pending for this campaign
+                self._forget_if_idle(campaign_id)
+                return None
+
+        data = {
+            field.decode() if isinstance(field, bytes) else field:
+            value.decode() if isinstance(value, bytes) else value
+            for field, value in self.client.hgetall(inflight).items()
+        }
+        if not data:
+            return None
+
+        amounts: Dict[date, Decimal] = {}
+        counts: Dict[date, int] = {}
+        for field, value in data.items():
+            kind, _, day = field.partition(':')
+            if kind == 'cents':
+                amounts[date.fromisoformat(day)] = from_cents(int(value))
+            elif kind == 'count':
+                counts[date.fromisoformat(day)] = int(value)
+
+        return FlushBatch(campaign_id=str(campaign_id), token=data['token'], amounts=amounts, counts=counts)
+
+    def complete_flush(self, campaign_id: Any) -> None:
+        """
+        Forget a batch after its database transaction committed.
+
+        Args:
+            campaign_id: UUID of the campaign
+        """
+        self.client.delete(self._inflight_key(campaign_id))
+        self.invalidate_counters(campaign_id)
+        self._forget_if_idle(campaign_id)
+
+    def _forget_if_idle(self, campaign_id: Any) -> None:
+        """Remove a campaign from the dirty set unless new spend arrived meanwhile."""
+        import redis
+
+        pending = self._pending_key(campaign_id)
+        inflight = self._inflight_key(campaign_id)
+
+        with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    pipe.watch(pending, inflight)
+                    if pipe.exists(pending) or pipe.exists(inflight):
+                        pipe.reset()
+                        return
+                    pipe.multi()
+                    pipe.srem(self._dirty_key(), str(campaign_id))
+                    pipe.execute()
+                    return
+                except redis.WatchError:
+                    # A spend was added concurrently; re-check
+                    continue
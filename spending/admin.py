@@ -5,7 +5,8 @@ Django admin for spending app.
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
-from .models import Spend, SpendType
+from typing import Any
+from .models import Spend, SpendDailyRollup, SpendType
 
 
 @admin.register(Spend)
@@ -70,3 +71,20 @@ class SpendAdmin(admin.ModelAdmin):
         return format_html('<strong>${:.2f}</strong>', obj.amount)
     amount_display.short_description = 'Amount'
     amount_display.admin_order_field = 'amount'
+
+
+@admin.register(SpendDailyRollup)
+class SpendDailyRollupAdmin(admin.ModelAdmin):
+    """Read-only admin interface for SpendDailyRollup model."""
+    
+    list_display = ['campaign', 'spend_date', 'spend_type', 'amount', 'spend_count', 'updated_at']
+    
+    list_filter = ['spend_type', 'spend_date', 'campaign__brand']
+    
+    search_fields = ['campaign__name', 'campaign__brand__name']
+    
+    def has_add_permission(self, request: Any) -> bool:
+        return False
+    
+    def has_change_permission(self, request: Any, obj: Any = None) -> bool:
+        return False
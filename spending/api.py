@@ -1,11 +1,71 @@
-from rest_framework import serializers, viewsets
-from .models import Spend
+from decimal import Decimal
+from typing import Any, ClassVar, Dict
+from rest_framework import serializers, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
+from .models import Spend, SpendType
+from .services import SpendingService
 
 class SpendSerializer(serializers.ModelSerializer):
     class Meta:
         model = Spend
         fields = '__all__'
+        # Duplicates are skipped by the insert itself rather than a pre-check query
+        extra_kwargs: ClassVar[Dict[str, Any]] = {'external_id': {'validators': []}}
+
+class SpendBulkItemSerializer(serializers.Serializer):
+    """Lightweight spend item for bulk ingestion (campaigns are checked in one query)."""
+    campaign = serializers.UUIDField(source='campaign_id')
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    spend_date = serializers.DateField(required=False)
+    spend_type = serializers.ChoiceField(choices=SpendType.choices, required=False)
+    description = serializers.CharField(max_length=255, required=False, allow_null=True, allow_blank=True)
+    external_id = serializers.CharField(max_length=255, required=False, allow_null=True, allow_blank=True)
 
 class SpendViewSet(viewsets.ModelViewSet):
     queryset = Spend.objects.all()
-    serializer_class = SpendSerializer 
\ No newline at end of file
+    serializer_class = SpendSerializer
+
+    def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        if not request.data.get('external_id'):
+            return super().create(request, *args, **kwargs)
+
+        # Keyed spends go through the service so redeliveries are skipped
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            spend = SpendingService().track_spend(
+                campaign=data['campaign'],
+                amount=data['amount'],
+                spend_date=data['spend_date'],
+                description=data.get('description'),
+                spend_type=data.get('spend_type', SpendType.DAILY),
+                external_id=data['external_id']
+            )
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            self.get_serializer(spend).data,
+            status=status.HTTP_200_OK if spend.duplicate else status.HTTP_201_CREATED
+        )
+
+    # Untyped without the DRF stubs; unused-ignore keeps it quiet when they are installed
+    @action(detail=False, methods=['post'], serializer_class=SpendBulkItemSerializer)  # type: ignore[misc, unused-ignore]
+    def bulk(self, request: Request) -> Response:
+        serializer = SpendBulkItemSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            spends = SpendingService().track_spends_bulk(serializer.validated_data)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'created': len(spends),
+            'duplicates': len(serializer.validated_data) - len(spends),
+            'campaigns': len({spend.campaign_id for spend in spends}),
+        }, status=status.HTTP_201_CREATED)
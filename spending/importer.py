@@ -0,0 +1,309 @@
+"""
+Streaming bulk import of spend records.
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+from django.db import connection, transaction
+from django.utils import timezone
+from campaigns.models import Campaign
+from .models import Spend, SpendDailyRollup, SpendKey, SpendType
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = 'spend_import_staging'
+
+STAGING_COLUMNS = ['id', 'campaign_id', 'amount', 'spend_date', 'spend_type', 'description', 'external_id']
+
+
+@dataclass
+class ImportProgress:
+    """Progress of an import, persisted to the checkpoint file after every chunk."""
+    offset: int = 0
+    rows: int = 0
+    inserted: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    campaign_ids: Set[str] = field(default_factory=set)
+
+    @classmethod
+    def load(cls, path: str) -> 'ImportProgress':
+        """Load progress from a checkpoint file, or start fresh if there is none."""
+        if not os.path.exists(path):
+            return cls()
+
+        with open(path) as fh:
+            data = json.load(fh)
+        data['campaign_ids'] = set(data.get('campaign_ids', []))
+        return cls(**data)
+
+    def save(self, path: str) -> None:
+        """Atomically write progress to a checkpoint file."""
+        data = {
+            'offset': self.offset,
+            'rows': self.rows,
+            'inserted': self.inserted,
+            'skipped': self.skipped,
+            'invalid': self.invalid,
+            'campaign_ids': sorted(self.campaign_ids),
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as fh:
+            json.dump(data, fh)
+        os.replace(tmp_path, path)
+
+
+class SpendImporter:
+    """
+    Import spend records from NDJSON or CSV files in constant memory.
+
+    The file is read in chunks of ``chunk_size`` rows. On PostgreSQL each
+    chunk is loaded with ``COPY`` into a temporary staging table, its keys
+    are claimed in ``spend_keys`` with ``INSERT ... ON CONFLICT DO NOTHING``
+    and the rows whose claim won are merged into ``spends``; other
+    databases fall back to ``bulk_create``. Each chunk commits in its own
+    transaction and the byte offset after it is written to a checkpoint
+    file, so an interrupted import resumes where it stopped. Rows without
+    an ``external_id`` get one derived from the source name and their byte
+    offset, which makes re-importing a chunk a no-op. Rows that are
+    duplicates or reference unknown campaigns are skipped.
+
+    Daily rollups are incremented with each chunk. Campaign counters are
+    not touched while loading; the daily and monthly spend of every
+    affected campaign is recomputed once at the end.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        file_format: Optional[str] = None,
+        chunk_size: int = 10000,
+        checkpoint_path: Optional[str] = None,
+        source: Optional[str] = None
+    ) -> None:
+        """
+        Initialize the importer.
+
+        Args:
+            path: Path of the NDJSON or CSV file
+            file_format: ``ndjson`` or ``csv`` (defaults to the file extension)
+            chunk_size: Rows loaded per transaction
+            checkpoint_path: Progress file (defaults to ``<path>.progress``)
+            source: Name used in derived external IDs (defaults to the file name)
+        """
+        if file_format is None:
+            file_format = 'csv' if path.lower().endswith('.csv') else 'ndjson'
+        if file_format not in ('ndjson', 'csv'):
+            raise ValueError(f"Unsupported import format: {file_format}")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        self.path = path
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+        self.checkpoint_path = checkpoint_path or f"{path}.progress"
+        self.source = source or os.path.basename(path)
+
+    def run(self, progress_callback: Optional[Any] = None) -> Dict[str, Any]:
+        """
+        Import the file, resuming from the checkpoint if one exists.
+
+        Args:
+            progress_callback: Optional callable receiving ``(progress, rows_per_second)``
+                after every chunk
+
+        Returns:
+            Dictionary with import results
+        """
+        from .services import SpendingService
+
+        progress = ImportProgress.load(self.checkpoint_path)
+        resumed_from = progress.rows
+        started = time.monotonic()
+
+        if resumed_from:
+            logger.info(f"Resuming spend import of {self.path} after {resumed_from} rows")
+
+        for chunk, offset in self._read_chunks(progress.offset):
+            spends, invalid = self._build_spends(chunk)
+            inserted, campaign_ids = self._load(spends)
+
+            progress.offset = offset
+            progress.rows += len(chunk)
+            progress.inserted += inserted
+            progress.skipped += len(spends) - inserted
+            progress.invalid += invalid
+            progress.campaign_ids.update(campaign_ids)
+            progress.save(self.checkpoint_path)
+
+            if progress_callback is not None:
+                progress_callback(progress, self._rate(progress.rows - resumed_from, started))
+
+        recomputed = SpendingService().recompute_campaign_totals(sorted(progress.campaign_ids))
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        results = {
+            'rows': progress.rows,
+            'inserted': progress.inserted,
+            'skipped': progress.skipped,
+            'invalid': progress.invalid,
+            'campaigns': recomputed,
+            'resumed_from': resumed_from,
+            'seconds': round(time.monotonic() - started, 3),
+            'rows_per_second': self._rate(progress.rows - resumed_from, started)
+        }
+
+        logger.info(f"Spend import of {self.path} completed: {results}")
+
+        return results
+
+    @staticmethod
+    def _rate(rows: int, started: float) -> float:
+        elapsed = time.monotonic() - started
+        return round(rows / elapsed, 1) if elapsed > 0 else float(rows)
+
+    def _read_chunks(self, offset: int) -> Iterator[Tuple[List[Tuple[int, Dict[str, Any]]], int]]:
+        """Yield chunks of ``(row_offset, row)`` pairs with the byte offset after each chunk."""
+        with open(self.path, 'rb') as fh:
+            rows = self._read_csv(fh, offset) if self.file_format == 'csv' else self._read_ndjson(fh, offset)
+
+            chunk: List[Tuple[int, Dict[str, Any]]] = []
+            for row_offset, row in rows:
+                chunk.append((row_offset, row))
+                if len(chunk) >= self.chunk_size:
+                    yield chunk, fh.tell()
+                    chunk = []
+            if chunk:
+                yield chunk, fh.tell()
+
+    @staticmethod
+    def _read_ndjson(fh: BinaryIO, offset: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        fh.seek(offset)
+        while True:
+            row_offset = fh.tell()
+            line = fh.readline()
+            if not line:
+                return
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = {}
+            yield row_offset, row if isinstance(row, dict) else {}
+
+    @staticmethod
+    def _read_csv(fh: BinaryIO, offset: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        header_line = fh.readline().decode('utf-8-sig')
+        fieldnames = next(csv.reader([header_line]), [])
+        fh.seek(max(offset, fh.tell()))
+
+        # csv pulls lines lazily, so the file position tracks each record
+        position = {'offset': fh.tell()}
+
+        def lines() -> Iterator[str]:
+            for raw in iter(fh.readline, b''):
+                yield raw.decode('utf-8')
+
+        reader = csv.DictReader(lines(), fieldnames=fieldnames)
+        for row in reader:
+            yield position['offset'], row
+            position['offset'] = fh.tell()
+
+    def _build_spends(self, chunk: List[Tuple[int, Dict[str, Any]]]) -> Tuple[List[Spend], int]:
+        """Validate rows into unsaved spends, returning them with the invalid row count."""
+        today = timezone.now().date()
+        spends: List[Spend] = []
+        invalid = 0
+
+        for row_offset, row in chunk:
+            try:
+                amount = Decimal(str(row['amount']))
+                if amount <= Decimal('0.00'):
+                    raise ValueError("Spend amount must be positive")
+                spend_type = row.get('spend_type') or SpendType.DAILY
+                if spend_type not in SpendType.values:
+                    raise ValueError(f"Invalid spend type: {spend_type}")
+                spends.append(Spend(
+                    campaign_id=uuid.UUID(str(row.get('campaign_id') or row['campaign'])),
+                    amount=amount.quantize(Decimal('0.01')),
+                    spend_date=date.fromisoformat(row['spend_date']) if row.get('spend_date') else today,
+                    spend_type=spend_type,
+                    description=row.get('description') or None,
+                    external_id=row.get('external_id') or f"import:{self.source}:{row_offset}"
+                ))
+            except (KeyError, TypeError, ValueError, InvalidOperation) as e:
+                logger.warning(f"Skipping invalid spend row at offset {row_offset} of {self.path}: {e}")
+                invalid += 1
+
+        return spends, invalid
+
+    def _load(self, spends: List[Spend]) -> Tuple[int, Set[str]]:
+        """Load a chunk of spends, returning the inserted count and affected campaigns."""
+        if not spends:
+            return 0, set()
+
+        if connection.vendor == 'postgresql':
+            return self._load_with_copy(spends)
+
+        with transaction.atomic():
+            existing = set(
+                Campaign.objects.filter(id__in={spend.campaign_id for spend in spends}).values_list('id', flat=True)
+            )
+            known = [spend for spend in spends if spend.campaign_id in existing]
+            inserted = Spend.insert_ignoring_duplicates(known, batch_size=1000)
+
+        return len(inserted), {str(spend.campaign_id) for spend in inserted}
+
+    def _load_with_copy(self, spends: List[Spend]) -> Tuple[int, Set[str]]:
+        """Load a chunk through COPY into the staging table and merge it into spends."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for spend in spends:
+            writer.writerow([
+                uuid.uuid4(), spend.campaign_id, spend.amount, spend.spend_date.isoformat(),
+                spend.spend_type, spend.description if spend.description is not None else '', spend.external_id
+            ])
+        buffer.seek(0)
+
+        columns = ', '.join(STAGING_COLUMNS)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} ("
+                f"id uuid, campaign_id uuid, amount numeric(10, 2), spend_date date, "
+                f"spend_type varchar(10), description varchar(255), external_id varchar(255)"
+                f") ON COMMIT DELETE ROWS"
+            )
+            cursor.copy_expert(f"COPY {STAGING_TABLE} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.execute(
+                f"INSERT INTO {SpendKey._meta.db_table} (external_id, campaign_id, spend_id, spend_date) "
+                f"SELECT s.external_id, s.campaign_id, s.id, s.spend_date "
+                f"FROM {STAGING_TABLE} s JOIN {Campaign._meta.db_table} c ON c.id = s.campaign_id "
+                f"WHERE s.external_id IS NOT NULL ON CONFLICT DO NOTHING"
+            )
+            cursor.execute(
+                f"INSERT INTO {Spend._meta.db_table} ({columns}, created_at) "
+                f"SELECT s.id, s.campaign_id, s.amount, s.spend_date, s.spend_type, "
+                f"NULLIF(s.description, ''), s.external_id, now() "
+                f"FROM {STAGING_TABLE} s JOIN {Campaign._meta.db_table} c ON c.id = s.campaign_id "
+                f"WHERE s.external_id IS NULL OR EXISTS ("
+                f"SELECT 1 FROM {SpendKey._meta.db_table} k WHERE k.external_id = s.external_id AND k.spend_id = s.id"
+                f") RETURNING campaign_id, spend_date, spend_type, amount"
+            )
+            inserted = [
+                Spend(campaign_id=campaign_id, spend_date=spend_date, spend_type=spend_type, amount=amount)
+                for campaign_id, spend_date, spend_type, amount in cursor.fetchall()
+            ]
+            SpendDailyRollup.record(inserted)
+
+        return len(inserted), {str(spend.campaign_id) for spend in inserted}
@@ -0,0 +1,101 @@
+"""
+Django management command to benchmark budget enforcement.
+"""
+
+import time
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from brands.models import Brand
+from campaigns.models import Campaign, CampaignStatus
+from spending.services import SpendingService
+from typing import Any, Dict
+
+
+class Command(BaseCommand):
+    """Management command to time budget enforcement at several campaign counts."""
+
+    help = 'Benchmark budget enforcement on generated campaigns (all changes are rolled back)'
+
+    # Campaigns generated per brand
+    CAMPAIGNS_PER_BRAND = 1000
+
+    def add_arguments(self, parser: Any) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='Numbers of active campaigns to benchmark',
+        )
+        parser.add_argument(
+            '--over-budget',
+            type=float,
+            default=0.1,
+            help='Fraction of campaigns over their daily budget',
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Also time the per-campaign check_budget_limits loop',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle the command execution."""
+        for size in options['sizes']:
+            timings = self._run(size, options['over_budget'], options['compare'])
+            line = f'{size} campaigns: set-based enforcement {timings["set_based"]:.3f}s'
+            if 'per_campaign' in timings:
+                line += f', per-campaign loop {timings["per_campaign"]:.3f}s'
+            self.stdout.write(self.style.SUCCESS(line))
+
+    def _run(self, size: int, over_budget: float, compare: bool) -> Dict[str, float]:
+        """Time enforcement on ``size`` generated campaigns inside a rolled back transaction."""
+        timings: Dict[str, float] = {}
+        service = SpendingService()
+        over_every = max(1, round(1 / over_budget)) if over_budget > 0 else size + 1
+
+        with transaction.atomic():
+            self._generate(size, over_every)
+
+            start = time.perf_counter()
+            results = service.enforce_budget_limits()
+            timings['set_based'] = time.perf_counter() - start
+            self.stdout.write(f'  set-based results: {results}')
+            transaction.set_rollback(True)
+
+        if compare:
+            with transaction.atomic():
+                self._generate(size, over_every)
+
+                start = time.perf_counter()
+                for campaign in Campaign.objects.filter(status=CampaignStatus.ACTIVE):
+                    service.check_budget_limits(campaign)
+                timings['per_campaign'] = time.perf_counter() - start
+                transaction.set_rollback(True)
+
+        return timings
+
+    def _generate(self, size: int, over_every: int) -> None:
+        """Create brands and active campaigns, every ``over_every``-th one over budget."""
+        brand_count = (size + self.CAMPAIGNS_PER_BRAND - 1) // self.CAMPAIGNS_PER_BRAND
+        brands = Brand.objects.bulk_create([
+            Brand(
+                name=f'Benchmark Brand {index}',
+                daily_budget=Decimal('100.00'),
+                monthly_budget=Decimal('3000.00')
+            )
+            for index in range(brand_count)
+        ])
+
+        Campaign.objects.bulk_create([
+            Campaign(
+                brand=brands[index // self.CAMPAIGNS_PER_BRAND],
+                name=f'Benchmark Campaign {index}',
+                status=CampaignStatus.ACTIVE,
+                daily_spend=Decimal('150.00') if index % over_every == 0 else Decimal('10.00'),
+                monthly_spend=Decimal('150.00') if index % over_every == 0 else Decimal('10.00')
+            )
+            for index in range(size)
+        ], batch_size=5000)
@@ -0,0 +1,76 @@
+"""
+Django management command to bulk import spends from NDJSON or CSV files.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from spending.importer import ImportProgress, SpendImporter
+from typing import Any
+
+
+class Command(BaseCommand):
+    """Management command to bulk import spends."""
+
+    help = 'Stream spends from an NDJSON or CSV file into the database (resumable)'
+
+    def add_arguments(self, parser: Any) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            'path',
+            help='NDJSON or CSV file with campaign_id, amount and optional spend_date, '
+                 'spend_type, description and external_id',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['ndjson', 'csv'],
+            help='Input format (defaults to the file extension)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Rows loaded per transaction',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Progress file used to resume an interrupted import (defaults to <path>.progress)',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle the command execution."""
+        try:
+            importer = SpendImporter(
+                options['path'],
+                file_format=options['format'],
+                chunk_size=options['chunk_size'],
+                checkpoint_path=options['checkpoint']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f'Importing spends from {options["path"]}...')
+
+        def report(progress: ImportProgress, rate: float) -> None:
+            self.stdout.write(f'{progress.rows} rows processed ({rate} rows/sec)')
+
+        try:
+            results = importer.run(progress_callback=report if options['verbosity'] > 1 else None)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        if results['resumed_from']:
+            self.stdout.write(f'Resumed after {results["resumed_from"]} rows')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Import completed: {results["inserted"]} spends inserted, '
+                f'{results["skipped"]} skipped, {results["campaigns"]} campaigns recomputed '
+                f'in {results["seconds"]}s ({results["rows_per_second"]} rows/sec)'
+            )
+        )
+
+        if results['invalid'] > 0:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'{results["invalid"]} invalid rows were skipped'
+                )
+            )
@@ -0,0 +1,65 @@
+"""
+Django management command to maintain the monthly spends partitions.
+"""
+
+from django.core.management.base import BaseCommand
+from spending import partitions
+from typing import Any
+
+
+class Command(BaseCommand):
+    """Management command to create and detach spends partitions."""
+    
+    help = 'Pre-create future monthly spends partitions and detach old ones (PostgreSQL only)'
+    
+    def add_arguments(self, parser: Any) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            help='Future months to create partitions for',
+        )
+        parser.add_argument(
+            '--retention-months',
+            type=int,
+            help='Months kept attached, including the current one',
+        )
+        parser.add_argument(
+            '--archive-schema',
+            help='Move detached partitions into this schema',
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop detached partitions instead of keeping them',
+        )
+        parser.add_argument(
+            '--no-detach',
+            action='store_true',
+            help='Only create partitions',
+        )
+    
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle the command execution."""
+        if not partitions.is_partitioned():
+            self.stdout.write(
+                self.style.WARNING('The spends table is not partitioned on this database; nothing to do')
+            )
+            return
+        
+        created = partitions.ensure_partitions(months_ahead=options['months_ahead'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Partitions in place: {", ".join(created)}')
+        )
+        
+        if options['no_detach']:
+            return
+        
+        detached = partitions.detach_old_partitions(
+            retention_months=options['retention_months'],
+            archive_schema=options['archive_schema'],
+            drop=options['drop']
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'{len(detached)} partitions detached: {", ".join(detached) or "none"}')
+        )
@@ -0,0 +1,42 @@
+"""
+Django management command to rebuild the daily spend rollup.
+"""
+
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from spending.models import SpendDailyRollup
+from typing import Any
+
+
+class Command(BaseCommand):
+    """Management command to rebuild the daily spend rollup from raw spends."""
+    
+    help = 'Recompute daily spend rollups from the spends table'
+    
+    def add_arguments(self, parser: Any) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            '--campaign',
+            action='append',
+            dest='campaigns',
+            help='Only rebuild this campaign (can be repeated)',
+        )
+        parser.add_argument(
+            '--since',
+            help='Only rebuild days on or after this date (YYYY-MM-DD)',
+        )
+    
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle the command execution."""
+        try:
+            since = date.fromisoformat(options['since']) if options['since'] else None
+        except ValueError:
+            raise CommandError(f'Invalid date: {options["since"]}')
+        
+        self.stdout.write('Rebuilding daily spend rollups...')
+        
+        written = SpendDailyRollup.rebuild(campaign_ids=options['campaigns'], since=since)
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'Rollup rebuild completed: {written} rollup rows written')
+        )
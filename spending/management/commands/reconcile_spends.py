@@ -0,0 +1,62 @@
+"""
+Django management command to reconcile campaign spend counters.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from spending.reconciliation import SOURCES, CounterReconciler
+from typing import Any
+
+
+class Command(BaseCommand):
+    """Management command to detect and repair spend counter drift."""
+    
+    help = 'Compare campaign spend counters with the spends table and repair drift'
+    
+    def add_arguments(self, parser: Any) -> None:
+        """Add command arguments."""
+        parser.add_argument(
+            '--source',
+            choices=SOURCES,
+            default='spends',
+            help='Ledger to compute the true totals from',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Campaigns checked per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without repairing it',
+        )
+    
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Handle the command execution."""
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        
+        self.stdout.write(f'Reconciling spend counters against {options["source"]}...')
+        
+        reconciler = CounterReconciler(
+            chunk_size=options['chunk_size'],
+            source=options['source'],
+            repair=not options['dry_run']
+        )
+        results = reconciler.run()
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Reconciliation completed: {results["checked"]} campaigns checked, '
+                f'{results["drifted"]} drifted, {results["repaired"]} repaired '
+                f'(daily drift {results["daily_drift"]:.2f}, monthly drift {results["monthly_drift"]:.2f}, '
+                f'max {results["max_drift"]:.2f}); '
+                f'{results["brands_drifted"]} brand totals drifted'
+            )
+        )
+        
+        if results['errors'] > 0:
+            self.stdout.write(
+                self.style.WARNING(f'Reconciliation stopped after {results["errors"]} error(s)')
+            )
@@ -30,15 +30,39 @@ class Command(BaseCommand):
             action='store_true',
             help='Reset both daily and monthly spends',
         )
+        parser.add_argument(
+            '--due',
+            action='store_true',
+            help='Only reset brand timezones whose day or month rolled over since their last reset',
+        )
     
     def handle(self, *args: Any, **options: Any) -> None:
         """Handle the command execution."""
         spending_service = SpendingService()
         
-        if not any([options['daily'], options['monthly'], options['both']]):
+        if not any([options['daily'], options['monthly'], options['both'], options['due']]):
             raise CommandError(
-                'Please specify --daily, --monthly, or --both'
+                'Please specify --daily, --monthly, --both or --due'
+            )
+        
+        if options['due']:
+            self.stdout.write('Resetting spends of timezones whose period rolled over...')
+            due_results = spending_service.reset_due_periods()
+            
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Rollover completed: {due_results["buckets"]} timezone periods reset, '
+                    f'{due_results["daily_reset"]} daily and {due_results["monthly_reset"]} monthly '
+                    f'counters reset, {due_results["reactivated"]} campaigns reactivated'
+                )
             )
+            
+            if due_results['errors'] > 0:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f'{due_results["errors"]} errors occurred during rollover'
+                    )
+                )
         
         if options['both'] or options['daily']:
             self.stdout.write('Resetting daily spends...')
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spending', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spend',
+            name='external_id',
+            field=models.CharField(blank=True, help_text='Client-supplied idempotency key; redelivered spends with the same key are ignored', max_length=255, null=True, unique=True),
+        ),
+    ]
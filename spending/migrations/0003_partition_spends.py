@@ -0,0 +1,99 @@
+# Generated by Django 4.2.7 on 2026-10-18 11:20
+
+from datetime import date
+from django.db import migrations
+
+# Inlined so later changes to spending.partitions cannot alter this migration
+SPENDS_TABLE = 'spends'
+
+DEFAULT_PARTITION = 'spends_default'
+
+# Monthly partitions created up front beyond the current month
+MONTHS_AHEAD = 3
+
+INDEXES = [
+    ('spends_campaig_2d41e9_idx', 'campaign_id, spend_date'),
+    ('spends_spend_d_e784c7_idx', 'spend_date'),
+    ('spends_spend_t_fd78e9_idx', 'spend_type'),
+]
+
+
+def partition_spends(apps, schema_editor):
+    """Rebuild spends as a table range-partitioned by month on spend_date."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"SELECT min(spend_date) FROM {SPENDS_TABLE}")
+        first = cursor.fetchone()[0] or date.today()
+
+        cursor.execute(f"ALTER TABLE {SPENDS_TABLE} RENAME TO {SPENDS_TABLE}_unpartitioned")
+        cursor.execute(
+            f"CREATE TABLE {SPENDS_TABLE} (LIKE {SPENDS_TABLE}_unpartitioned INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE (spend_date)"
+        )
+
+        # Unique constraints on a partitioned table must include the partition
+        # key; external IDs stay unique across dates through spend_keys
+        cursor.execute(f"ALTER TABLE {SPENDS_TABLE} ADD PRIMARY KEY (id, spend_date)")
+        cursor.execute(
+            f"ALTER TABLE {SPENDS_TABLE} ADD CONSTRAINT spends_external_id_spend_date_uniq "
+            f"UNIQUE (external_id, spend_date)"
+        )
+
+        cursor.execute(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {SPENDS_TABLE} DEFAULT")
+        # Every month holding rows gets its own partition, so the default
+        # partition starts empty
+        month = first.replace(day=1)
+        today = date.today()
+        index = today.year * 12 + today.month - 1 + MONTHS_AHEAD
+        last = date(index // 12, index % 12 + 1, 1)
+        while month <= last:
+            end = date(month.year + 1, 1, 1) if month.month == 12 else date(month.year, month.month + 1, 1)
+            cursor.execute(
+                f"CREATE TABLE {SPENDS_TABLE}_{month.year:04d}_{month.month:02d} PARTITION OF {SPENDS_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            month = end
+
+        cursor.execute(f"INSERT INTO {SPENDS_TABLE} SELECT * FROM {SPENDS_TABLE}_unpartitioned")
+        cursor.execute(f"DROP TABLE {SPENDS_TABLE}_unpartitioned")
+
+        cursor.execute(
+            f"ALTER TABLE {SPENDS_TABLE} ADD CONSTRAINT spends_campaign_id_fk_campaigns_id "
+            f"FOREIGN KEY (campaign_id) REFERENCES campaigns (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+        for name, columns in INDEXES:
+            cursor.execute(f"CREATE INDEX {name} ON {SPENDS_TABLE} ({columns})")
+
+
+def unpartition_spends(apps, schema_editor):
+    """Rebuild spends as a plain table."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {SPENDS_TABLE} RENAME TO {SPENDS_TABLE}_partitioned")
+        cursor.execute(f"CREATE TABLE {SPENDS_TABLE} (LIKE {SPENDS_TABLE}_partitioned INCLUDING DEFAULTS)")
+        cursor.execute(f"INSERT INTO {SPENDS_TABLE} SELECT * FROM {SPENDS_TABLE}_partitioned")
+        cursor.execute(f"DROP TABLE {SPENDS_TABLE}_partitioned CASCADE")
+
+        cursor.execute(f"ALTER TABLE {SPENDS_TABLE} ADD PRIMARY KEY (id)")
+        cursor.execute(f"ALTER TABLE {SPENDS_TABLE} ADD CONSTRAINT spends_external_id_key UNIQUE (external_id)")
+        cursor.execute(
+            f"ALTER TABLE {SPENDS_TABLE} ADD CONSTRAINT spends_campaign_id_fk_campaigns_id "
+            f"FOREIGN KEY (campaign_id) REFERENCES campaigns (id) DEFERRABLE INITIALLY DEFERRED"
+        )
+        for name, columns in INDEXES:
+            cursor.execute(f"CREATE INDEX {name} ON {SPENDS_TABLE} ({columns})")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spending', '0002_spend_external_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_spends, unpartition_spends),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:05
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def backfill_rollups(apps, schema_editor):
+    """Build the daily rollup from existing spends."""
+    Spend = apps.get_model('spending', 'Spend')
+    SpendDailyRollup = apps.get_model('spending', 'SpendDailyRollup')
+
+    totals = Spend.objects.order_by().values('campaign_id', 'spend_date', 'spend_type').annotate(
+        total=models.Sum('amount'),
+        count=models.Count('id')
+    )
+
+    batch = []
+    for row in totals.iterator(chunk_size=2000):
+        batch.append(SpendDailyRollup(
+            campaign_id=row['campaign_id'],
+            spend_date=row['spend_date'],
+            spend_type=row['spend_type'],
+            amount=row['total'],
+            spend_count=row['count']
+        ))
+        if len(batch) >= 2000:
+            SpendDailyRollup.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        SpendDailyRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0001_initial'),
+        ('spending', '0003_partition_spends'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpendDailyRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('spend_date', models.DateField(help_text='Date of the summarized spends')),
+                ('spend_type', models.CharField(choices=[('DAILY', 'Daily'), ('MONTHLY', 'Monthly')], default='DAILY', help_text='Type of the summarized spends', max_length=10)),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Sum of spend amounts', max_digits=14)),
+                ('spend_count', models.IntegerField(default=0, help_text='Number of spends')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('campaign', models.ForeignKey(help_text='Campaign the totals belong to', on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='campaigns.campaign')),
+            ],
+            options={
+                'verbose_name': 'Spend Daily Rollup',
+                'verbose_name_plural': 'Spend Daily Rollups',
+                'db_table': 'spend_daily_rollups',
+                'ordering': ['-spend_date'],
+                'indexes': [models.Index(fields=['spend_date'], name='spend_daily_spend_d_5c9759_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='spenddailyrollup',
+            constraint=models.UniqueConstraint(fields=('campaign', 'spend_date', 'spend_type'), name='spend_daily_rollup_unique'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:25
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('spending', '0004_spenddailyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpendResetWatermark',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('timezone', models.CharField(help_text='Brand timezone of the bucket', max_length=64)),
+                ('period', models.CharField(choices=[('daily', 'Daily'), ('monthly', 'Monthly')], help_text='Budget period', max_length=10)),
+                ('period_start', models.DateField(help_text='Local start of the last period the bucket was reset for')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Spend Reset Watermark',
+                'verbose_name_plural': 'Spend Reset Watermarks',
+                'db_table': 'spend_reset_watermarks',
+                'ordering': ['timezone', 'period'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='spendresetwatermark',
+            constraint=models.UniqueConstraint(fields=('timezone', 'period'), name='spend_reset_watermark_unique'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.7 on 2026-10-18 16:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_spend_keys(apps, schema_editor):
+    """Claim the external ID of every existing spend, keeping the earliest one."""
+    Spend = apps.get_model('spending', 'Spend')
+    SpendKey = apps.get_model('spending', 'SpendKey')
+
+    keyed = Spend.objects.exclude(external_id__isnull=True).order_by('created_at').values_list(
+        'external_id', 'campaign_id', 'id', 'spend_date'
+    )
+    batch = []
+    for external_id, campaign_id, spend_id, spend_date in keyed.iterator(chunk_size=2000):
+        batch.append(SpendKey(
+            external_id=external_id, campaign_id=campaign_id, spend_id=spend_id, spend_date=spend_date
+        ))
+        if len(batch) >= 2000:
+            SpendKey.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        SpendKey.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('campaigns', '0005_campaign_pause_flags'),
+        ('spending', '0005_spendresetwatermark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpendKey',
+            fields=[
+                ('external_id', models.CharField(help_text='Client-supplied idempotency key', max_length=255, primary_key=True, serialize=False)),
+                ('spend_id', models.UUIDField(help_text='Spend that claimed the key')),
+                ('spend_date', models.DateField(help_text='Date of the spend, so it can be fetched from its partition')),
+                ('campaign', models.ForeignKey(help_text='Campaign of the spend', on_delete=django.db.models.deletion.CASCADE, related_name='spend_keys', to='campaigns.campaign')),
+            ],
+            options={
+                'verbose_name': 'Spend Key',
+                'verbose_name_plural': 'Spend Keys',
+                'db_table': 'spend_keys',
+            },
+        ),
+        migrations.RunPython(backfill_spend_keys, migrations.RunPython.noop),
+    ]
@@ -6,12 +6,16 @@ from __future__ import annotations
 from django.db import models
 from django.core.validators import MinValueValidator
 from decimal import Decimal
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Dict, Iterable, Set, Tuple, cast
 import uuid
+from zoneinfo import ZoneInfo
+from brands.models import Brand, current_spend
 from campaigns.models import Campaign
+from .partitions import month_bounds
 from datetime import date
-from django.db import transaction
-from django.db.models.signals import post_save
+from django.db import connection, transaction
+from django.utils import timezone
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 
@@ -68,7 +72,20 @@ class Spend(models.Model):
         help_text="Description of the spend"
     )
     
+    external_id: models.CharField = models.CharField(
+        max_length=255,
+        unique=True,
+        blank=True,
+        null=True,
+        help_text="Client-supplied idempotency key; redelivered spends with the same key are ignored"
+    )
+    # The column is only unique on unpartitioned tables: a partitioned table
+    # can only enforce it per spend_date, so keys are claimed in SpendKey
+    
     created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+
+    # Set on the returned record when ingestion skipped a redelivered spend
+    duplicate: bool = False
     
     class Meta:
         db_table = 'spends'
@@ -85,29 +102,91 @@ class Spend(models.Model):
         return f"{self.campaign.name} - {self.amount} on {self.spend_date}"
     
     def save(self, *args: Any, **kwargs: Any) -> None:
-        """Override save to update campaign totals."""
+        """Override save to update campaign totals and the daily rollup."""
         with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = Spend.objects.filter(pk=self.pk).only(
+                    'campaign_id', 'spend_date', 'spend_type', 'amount'
+                ).first()
+
             super().save(*args, **kwargs)
 
+            if previous is not None:
+                SpendDailyRollup.record([previous], sign=-1)
+            SpendDailyRollup.record([self])
+
+    @classmethod
+    def insert_ignoring_duplicates(cls, spends: List['Spend'], batch_size: Optional[int] = None) -> List['Spend']:
+        """
+        Insert spend records, skipping those whose external_id already exists.
+
+        Rows carrying an external_id claim their key in ``spend_keys`` with
+        INSERT ... ON CONFLICT DO NOTHING, so duplicates cost no pre-check
+        query. The claims are confirmed with one lookup per chunk and only
+        spends whose claim won are inserted, which keeps keys unique across
+        spend dates (and partitions). Primary keys given by the caller are
+        kept; a claim naming a spend that is already stored is a replay of
+        it, not a win.
+
+        Args:
+            spends: Unsaved spend records
+            batch_size: Rows per INSERT statement
+
+        Returns:
+            The spend records that were actually inserted
+        """
+        with transaction.atomic():
+            keyed = [spend for spend in spends if spend.external_id]
+            SpendKey.objects.bulk_create(
+                [
+                    SpendKey(
+                        external_id=spend.external_id,
+                        campaign_id=spend.campaign_id,
+                        spend_id=spend.pk,
+                        spend_date=spend.spend_date
+                    )
+                    for spend in keyed
+                ],
+                batch_size=batch_size,
+                ignore_conflicts=True
+            )
+
+            claimed: Set[Any] = set()
+            for start in range(0, len(keyed), 900):
+                chunk = keyed[start:start + 900]
+                won = set(
+                    SpendKey.objects.filter(
+                        external_id__in=[spend.external_id for spend in chunk]
+                    ).values_list('spend_id', flat=True)
+                ) & {spend.pk for spend in chunk}
+                # A client retrying with its own spend ID names a stored spend
+                claimed.update(won - set(cls.objects.filter(pk__in=won).values_list('pk', flat=True)))
+
+            created = [spend for spend in spends if not spend.external_id or spend.pk in claimed]
+            cls.objects.bulk_create(created, batch_size=batch_size)
+            SpendDailyRollup.record(created)
+
+        return created
+
     @classmethod
     def get_daily_spend_for_campaign(cls, campaign: Campaign, date: date) -> Decimal:
         """Get total daily spend for a campaign on a specific date."""
-        total = cls.objects.filter(
+        total = SpendDailyRollup.objects.filter(
             campaign=campaign,
             spend_date=date,
             spend_type=SpendType.DAILY
-        ).aggregate(
-            total=models.Sum('amount')
-        )['total']
+        ).values_list('amount', flat=True).first()
         return total or Decimal('0.00')
 
     @classmethod
     def get_monthly_spend_for_campaign(cls, campaign: Campaign, year: int, month: int) -> Decimal:
         """Get total monthly spend for a campaign in a specific month."""
-        total = cls.objects.filter(
+        start, end = month_bounds(year, month)
+        total = SpendDailyRollup.objects.filter(
             campaign=campaign,
-            spend_date__year=year,
-            spend_date__month=month,
+            spend_date__gte=start,
+            spend_date__lt=end,
             spend_type=SpendType.MONTHLY
         ).aggregate(
             total=models.Sum('amount')
@@ -116,15 +195,300 @@ class Spend(models.Model):
 
     @classmethod
     def get_daily_spend_for_brand(cls, brand_id: uuid.UUID) -> Decimal:
-        from campaigns.models import Campaign
-        campaigns = Campaign.objects.filter(brand_id=brand_id)
-        return sum((Decimal(c.daily_spend) for c in campaigns), Decimal('0.00'))
+        return cls._brand_total(brand_id, 'daily')
 
     @classmethod
     def get_monthly_spend_for_brand(cls, brand_id: uuid.UUID) -> Decimal:
-        from campaigns.models import Campaign
-        campaigns = Campaign.objects.filter(brand_id=brand_id)
-        return sum((Decimal(c.monthly_spend) for c in campaigns), Decimal('0.00'))
+        return cls._brand_total(brand_id, 'monthly')
+
+    @staticmethod
+    def _brand_total(brand_id: uuid.UUID, period: str) -> Decimal:
+        """Read a brand's total for the current period from its denormalized counters."""
+        row = Brand.objects.filter(pk=brand_id).values_list(
+            'timezone', f'{period}_spend', f'{period}_period'
+        ).first()
+        if row is None:
+            return Decimal('0.00')
+        tz, spend, stamp = row
+        return current_spend(period, spend, stamp, timezone.now().astimezone(ZoneInfo(tz)).date())
+
+
+class SpendKey(models.Model):
+    """
+    The spend that claimed an external ID.
+
+    Kept in its own unpartitioned table so an external ID stays unique
+    across spend dates: a retry delivered after midnight, with a later
+    spend_date, is still recognised as a duplicate. Keys are released when
+    their spend is deleted.
+    """
+
+    external_id: models.CharField = models.CharField(
+        max_length=255,
+        primary_key=True,
+        help_text="Client-supplied idempotency key"
+    )
+
+    campaign: models.ForeignKey = models.ForeignKey(
+        Campaign,
+        on_delete=models.CASCADE,
+        related_name='spend_keys',
+        help_text="Campaign of the spend"
+    )
+
+    spend_id: models.UUIDField = models.UUIDField(
+        help_text="Spend that claimed the key"
+    )
+
+    spend_date: models.DateField = models.DateField(
+        help_text="Date of the spend, so it can be fetched from its partition"
+    )
+
+    class Meta:
+        db_table = 'spend_keys'
+        verbose_name = 'Spend Key'
+        verbose_name_plural = 'Spend Keys'
+
+    def __str__(self) -> str:
+        return f"{self.external_id} -> {self.spend_id}"
+
+    def get_spend(self) -> Spend:
+        """Get the spend that claimed the key."""
+        return Spend.objects.get(pk=self.spend_id, spend_date=self.spend_date)
+
+
+class SpendDailyRollup(models.Model):
+    """
+    Per-day spend totals for a campaign and spend type.
+
+    Rows are incremented by every ingestion path in the same transaction
+    as the spend rows they summarize, so analytics read one row per
+    campaign and day instead of aggregating raw spends. Use the
+    ``rebuild_spend_rollups`` command to recompute them from scratch.
+    """
+
+    id: models.UUIDField = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+
+    campaign: models.ForeignKey = models.ForeignKey(
+        Campaign,
+        on_delete=models.CASCADE,
+        related_name='daily_rollups',
+        help_text="Campaign the totals belong to"
+    )
+
+    spend_date: models.DateField = models.DateField(
+        help_text="Date of the summarized spends"
+    )
+
+    spend_type: models.CharField = models.CharField(
+        max_length=10,
+        choices=SpendType.choices,
+        default=SpendType.DAILY,
+        help_text="Type of the summarized spends"
+    )
+
+    amount: models.DecimalField = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Sum of spend amounts"
+    )
+
+    spend_count: models.IntegerField = models.IntegerField(
+        default=0,
+        help_text="Number of spends"
+    )
+
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'spend_daily_rollups'
+        ordering = ['-spend_date']
+        verbose_name = 'Spend Daily Rollup'
+        verbose_name_plural = 'Spend Daily Rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['campaign', 'spend_date', 'spend_type'],
+                name='spend_daily_rollup_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['spend_date']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.campaign_id} - {self.amount} ({self.spend_count} spends) on {self.spend_date}"
+
+    @classmethod
+    def record(cls, spends: Iterable[Spend], sign: int = 1) -> int:
+        """
+        Add spends to (or, with ``sign=-1``, remove them from) the rollup.
+
+        Args:
+            spends: Spend records that were inserted or deleted
+            sign: 1 to add the spends, -1 to subtract them
+
+        Returns:
+            Number of rollup rows touched
+        """
+        deltas: Dict[Tuple[Any, date, str], Tuple[Decimal, int]] = {}
+        for spend in spends:
+            key = (spend.campaign_id, spend.spend_date, spend.spend_type)
+            amount, count = deltas.get(key, (Decimal('0.00'), 0))
+            deltas[key] = (amount + sign * Decimal(spend.amount), count + sign)
+
+        return cls.increment(deltas)
+
+    @classmethod
+    def increment(cls, deltas: Dict[Tuple[Any, date, str], Tuple[Decimal, int]], chunk_size: int = 500) -> int:
+        """
+        Upsert rollup rows, adding to existing totals.
+
+        Uses one ``INSERT ... ON CONFLICT DO UPDATE`` per chunk (supported by
+        PostgreSQL and SQLite >= 3.24), so concurrent writers never lose
+        increments. Keys are applied in sorted order to avoid deadlocks.
+
+        Args:
+            deltas: ``(campaign_id, spend_date, spend_type)`` to ``(amount, count)`` increments
+            chunk_size: Rows per statement
+
+        Returns:
+            Number of rollup rows touched
+        """
+        if not deltas:
+            return 0
+
+        table = connection.ops.quote_name(cls._meta.db_table)
+        fields = [
+            cast(models.Field, cls._meta.get_field(name))
+            for name in ('id', 'campaign', 'spend_date', 'spend_type', 'amount', 'spend_count', 'updated_at')
+        ]
+        columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        now = timezone.now()
+
+        keys = sorted(deltas, key=lambda key: (str(key[0]), key[1], key[2]))
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            params: List[Any] = []
+            for campaign_id, spend_date, spend_type in chunk:
+                amount, count = deltas[(campaign_id, spend_date, spend_type)]
+                values = [uuid.uuid4(), campaign_id, spend_date, spend_type, amount, count, now]
+                params.extend(
+                    field.get_db_prep_save(value, connection) for field, value in zip(fields, values)
+                )
+
+            placeholders = ', '.join([f"({', '.join(['%s'] * len(fields))})"] * len(chunk))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table} ({columns}) VALUES {placeholders} "
+                    f"ON CONFLICT (campaign_id, spend_date, spend_type) DO UPDATE SET "
+                    f"amount = {table}.amount + EXCLUDED.amount, "
+                    f"spend_count = {table}.spend_count + EXCLUDED.spend_count, "
+                    f"updated_at = EXCLUDED.updated_at",
+                    params
+                )
+
+        return len(keys)
+
+    @classmethod
+    def rebuild(cls, campaign_ids: Optional[List[Any]] = None, since: Optional[date] = None) -> int:
+        """
+        Recompute rollup rows from the spends table.
+
+        Args:
+            campaign_ids: Only rebuild these campaigns (defaults to all)
+            since: Only rebuild days on or after this date
+
+        Returns:
+            Number of rollup rows written
+        """
+        rollups = cls.objects.all()
+        spends = Spend.objects.all()
+        if campaign_ids is not None:
+            rollups = rollups.filter(campaign_id__in=campaign_ids)
+            spends = spends.filter(campaign_id__in=campaign_ids)
+        if since is not None:
+            rollups = rollups.filter(spend_date__gte=since)
+            spends = spends.filter(spend_date__gte=since)
+
+        totals = spends.order_by().values('campaign_id', 'spend_date', 'spend_type').annotate(
+            total=models.Sum('amount'),
+            count=models.Count('id')
+        )
+
+        written = 0
+        with transaction.atomic():
+            rollups.delete()
+            batch: List[SpendDailyRollup] = []
+            for row in totals.iterator(chunk_size=2000):
+                batch.append(cls(
+                    campaign_id=row['campaign_id'],
+                    spend_date=row['spend_date'],
+                    spend_type=row['spend_type'],
+                    amount=row['total'],
+                    spend_count=row['count']
+                ))
+                if len(batch) >= 2000:
+                    written += len(cls.objects.bulk_create(batch))
+                    batch = []
+            if batch:
+                written += len(cls.objects.bulk_create(batch))
+
+        return written
+
+
+class SpendResetWatermark(models.Model):
+    """
+    The last budget period reset for the brands in one timezone.
+
+    Resets run per timezone bucket when its local day or month rolls over;
+    the watermark records the period start the bucket was last reset for,
+    so a bucket is reset exactly once per period however often the reset
+    task runs.
+    """
+
+    id: models.UUIDField = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+
+    timezone: models.CharField = models.CharField(
+        max_length=64,
+        help_text="Brand timezone of the bucket"
+    )
+
+    period: models.CharField = models.CharField(
+        max_length=10,
+        choices=[('daily', 'Daily'), ('monthly', 'Monthly')],
+        help_text="Budget period"
+    )
+
+    period_start: models.DateField = models.DateField(
+        help_text="Local start of the last period the bucket was reset for"
+    )
+
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'spend_reset_watermarks'
+        ordering = ['timezone', 'period']
+        verbose_name = 'Spend Reset Watermark'
+        verbose_name_plural = 'Spend Reset Watermarks'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['timezone', 'period'],
+                name='spend_reset_watermark_unique'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.timezone} {self.period} reset for {self.period_start}"
+
 
 # --- Sinal para atualizar os totais do Campaign ---
 @receiver(post_save, sender=Spend)
@@ -132,3 +496,21 @@ def update_campaign_totals(sender: Any, instance: Spend, created: bool, **kwargs
     if created:
         campaign = instance.campaign
         campaign.add_spend(instance.amount)
+
+
+
+@receiver(post_delete, sender=Spend)
+def remove_from_daily_rollup(sender: Any, instance: Spend, origin: Any = None, **kwargs: Any) -> None:
+    # Deletes cascading from a campaign remove its rollups as well
+    if origin is not None and not isinstance(origin, Spend) and getattr(origin, 'model', None) is not Spend:
+        return
+    SpendDailyRollup.record([instance], sign=-1)
+
+
+@receiver(post_delete, sender=Spend)
+def release_spend_key(sender: Any, instance: Spend, origin: Any = None, **kwargs: Any) -> None:
+    # Keys of a deleted campaign go with it through the foreign key
+    if origin is not None and not isinstance(origin, Spend) and getattr(origin, 'model', None) is not Spend:
+        return
+    if instance.external_id:
+        SpendKey.objects.filter(external_id=instance.external_id, spend_id=instance.pk).delete()
@@ -0,0 +1,267 @@
+"""
+Predictive budget pacing.
+
+Budget enforcement polls every few minutes, so a campaign spending fast
+overshoots its budget by whatever it spends between two polls. The pacing
+engine keeps an exponentially weighted spend velocity per campaign (and per
+brand, for brands enforcing their total), updated on every tracked spend,
+projects when the remaining budget runs out and schedules
+``pace_campaign_task`` with an ETA just ahead of that moment. The task
+re-projects with the latest velocity and either pauses the campaign or
+moves its ETA.
+
+Velocities are estimates kept in Django's cache: a lost update or an
+evicted entry only delays a pause until the next spend or the regular
+enforcement poll.
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from brands.models import BUDGET_PERIODS, Brand, current_spend
+from campaigns import budget_cache
+from campaigns.models import Campaign, PauseReason
+
+logger = logging.getLogger(__name__)
+
+VELOCITY_KEY = 'pacing:velocity:{}:{}'
+
+# Pending pause check of a campaign (or of a brand enforcing its total)
+PAUSE_KEY = 'pacing:pause:{}:{}'
+
+PAUSE_REASONS = {
+    'daily': PauseReason.DAILY_BUDGET_EXCEEDED,
+    'monthly': PauseReason.MONTHLY_BUDGET_EXCEEDED,
+}
+
+
+@dataclass(frozen=True)
+class Velocity:
+    """
+    An exponentially decaying spend rate.
+
+    Each spend adds ``amount / window`` to the rate, and the rate decays by
+    ``e`` every ``window`` seconds, so a steady spend converges to its true
+    rate and a campaign that stops spending slows down smoothly.
+    """
+    rate: float
+    at: float
+
+    def at_time(self, timestamp: float, window: float) -> float:
+        """Get the rate (amount per second) at a timestamp."""
+        if timestamp <= self.at:
+            return self.rate
+        return self.rate * math.exp(-(timestamp - self.at) / window)
+
+    def add(self, amount: Decimal, timestamp: float, window: float) -> 'Velocity':
+        """Get the velocity after a spend."""
+        return Velocity(self.at_time(timestamp, window) + float(amount) / window, max(self.at, timestamp))
+
+
+class PacingEngine:
+    """
+    Track spend velocities and pause campaigns just before they exhaust a budget.
+
+    Campaigns of brands enforcing their total are paced on the brand's
+    velocity and totals, and all of the brand's campaigns are paused.
+    """
+
+    def __init__(
+        self,
+        window: Optional[float] = None,
+        lookahead: Optional[float] = None,
+        lead: Optional[float] = None
+    ) -> None:
+        """
+        Initialize the engine.
+
+        Args:
+            window: Velocity time constant in seconds (defaults to
+                ``PACING_VELOCITY_WINDOW``)
+            lookahead: Only schedule a pause for exhaustion projected within
+                this many seconds (defaults to ``PACING_LOOKAHEAD``)
+            lead: Pause this many seconds before the projected exhaustion
+                (defaults to ``PACING_LEAD``)
+        """
+        self.window = float(window if window is not None else settings.PACING_VELOCITY_WINDOW)
+        self.lookahead = float(lookahead if lookahead is not None else settings.PACING_LOOKAHEAD)
+        self.lead = float(lead if lead is not None else settings.PACING_LEAD)
+
+    def record_spend(self, campaign: Campaign, amount: Decimal, moment: Optional[datetime] = None) -> None:
+        """
+        Add a spend to the velocities of a campaign and its brand.
+
+        Args:
+            campaign: The campaign that spent
+            amount: The amount spent
+            moment: When the spend happened (defaults to now)
+        """
+        timestamp = (moment or timezone.now()).timestamp()
+        keys = [VELOCITY_KEY.format('campaign', campaign.pk), VELOCITY_KEY.format('brand', campaign.brand_id)]
+        current = cache.get_many(keys)
+        cache.set_many(
+            {key: current.get(key, Velocity(0.0, timestamp)).add(amount, timestamp, self.window) for key in keys},
+            timeout=max(int(self.window * 10), 60)
+        )
+
+    def velocity(self, campaign: Campaign, moment: Optional[datetime] = None, brand: bool = False) -> float:
+        """
+        Get the spend velocity (amount per second) of a campaign or of its brand.
+
+        Args:
+            campaign: The campaign
+            moment: The moment to evaluate the decayed rate at (defaults to now)
+            brand: Get the velocity of the campaign's brand instead
+        """
+        key = VELOCITY_KEY.format('brand', campaign.brand_id) if brand else VELOCITY_KEY.format('campaign', campaign.pk)
+        velocity: Optional[Velocity] = cache.get(key)
+        if velocity is None:
+            return 0.0
+        return velocity.at_time((moment or timezone.now()).timestamp(), self.window)
+
+    def project_exhaustion(
+        self,
+        campaign: Campaign,
+        moment: Optional[datetime] = None
+    ) -> Optional[Tuple[datetime, str]]:
+        """
+        Project when a campaign (or its brand's total) runs out of budget.
+
+        Args:
+            campaign: The campaign, with up to date counters
+            moment: The moment to project from (defaults to now)
+
+        Returns:
+            The projected exhaustion time and the budget period that runs
+            out first, ``moment`` itself if a budget is already reached, or
+            None if the campaign is not spending
+        """
+        moment = moment or timezone.now()
+        budget = budget_cache.brand_budget_for(campaign)
+        today = budget.local_date(moment)
+        brand_total = budget.enforces_brand_total()
+
+        if brand_total:
+            values = Brand.objects.values_list(
+                'daily_spend', 'daily_period', 'monthly_spend', 'monthly_period'
+            ).get(pk=campaign.brand_id)
+        else:
+            values = (campaign.daily_spend, campaign.daily_period, campaign.monthly_spend, campaign.monthly_period)
+        spends = {'daily': values[:2], 'monthly': values[2:]}
+        rate = self.velocity(campaign, moment, brand=brand_total)
+
+        projection: Optional[Tuple[datetime, str]] = None
+        for period in BUDGET_PERIODS:
+            remaining = getattr(budget, f'{period}_budget') - current_spend(period, *spends[period], today)
+            if remaining <= Decimal('0.00'):
+                return moment, period
+            if rate <= 0:
+                continue
+            exhausted_at = moment + timedelta(seconds=float(remaining) / rate)
+            if projection is None or exhausted_at < projection[0]:
+                projection = (exhausted_at, period)
+
+        return projection
+
+    def _pause_key(self, campaign: Campaign) -> str:
+        """Get the key of the pending pause check of a campaign or its brand."""
+        if budget_cache.brand_budget_for(campaign).enforces_brand_total():
+            return PAUSE_KEY.format('brand', campaign.brand_id)
+        return PAUSE_KEY.format('campaign', campaign.pk)
+
+    def schedule_pause(self, campaign: Campaign, moment: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Schedule a pause check ahead of a campaign's projected exhaustion.
+
+        Nothing is scheduled if exhaustion is further than the lookahead
+        (the regular enforcement poll and later spends cover it) or an
+        earlier check is already pending. The task is queued once the
+        surrounding transaction commits.
+
+        Args:
+            campaign: The campaign, with up to date counters
+            moment: The moment to project from (defaults to now)
+
+        Returns:
+            When the pause check runs, or None if none was scheduled
+        """
+        if not campaign.is_active():
+            return None
+
+        moment = moment or timezone.now()
+        projection = self.project_exhaustion(campaign, moment)
+        if projection is None or projection[0] > moment + timedelta(seconds=self.lookahead):
+            return None
+
+        pause_at = max(moment, projection[0] - timedelta(seconds=self.lead))
+        key = self._pause_key(campaign)
+        pending = cache.get(key)
+        if pending is not None and pending <= pause_at.timestamp():
+            return None
+
+        cache.set(key, pause_at.timestamp(), timeout=int(self.lookahead + self.lead) + 60)
+        campaign_id = str(campaign.pk)
+        transaction.on_commit(lambda: self._enqueue(key, campaign_id, pause_at))
+        return pause_at
+
+    @staticmethod
+    def _enqueue(key: str, campaign_id: str, pause_at: datetime) -> None:
+        """Queue the pause check, forgetting it if the broker is unavailable."""
+        from tasks.budget_tasks import pace_campaign_task
+
+        try:
+            pace_campaign_task.apply_async(args=[campaign_id], eta=pause_at, retry=False)
+        except Exception as e:
+            cache.delete(key)
+            logger.error(f"Error scheduling pacing pause for campaign {campaign_id}: {e}")
+
+    def apply_pause(self, campaign_id: Any, moment: Optional[datetime] = None) -> List[Any]:
+        """
+        Pause a campaign (or its brand) if it is about to exhaust a budget.
+
+        Runs when a scheduled pause check is due. The projection is redone
+        with the latest counters and velocity: if exhaustion is still within
+        the lead time the campaign, or every active campaign of a brand
+        enforcing its total, is paused for that budget; otherwise a new
+        check is scheduled.
+
+        Args:
+            campaign_id: The campaign to check
+            moment: The moment to check at (defaults to now)
+
+        Returns:
+            IDs of the campaigns that were paused
+        """
+        moment = moment or timezone.now()
+        campaign = Campaign.objects.select_related('brand').filter(pk=campaign_id).first()
+        if campaign is None:
+            return []
+
+        cache.delete(self._pause_key(campaign))
+        if not campaign.is_active():
+            return []
+
+        projection = self.project_exhaustion(campaign, moment)
+        if projection is None or projection[0] > moment + timedelta(seconds=self.lead):
+            self.schedule_pause(campaign, moment)
+            return []
+
+        exhausted_at, period = projection
+        if campaign.brand.enforces_brand_total():
+            paused = Campaign.pause_brand_campaigns(campaign.brand_id, PAUSE_REASONS[period])
+        else:
+            campaign.pause(PAUSE_REASONS[period])
+            paused = [campaign.pk]
+
+        logger.info(
+            f"Paced {len(paused)} campaigns of brand {campaign.brand_id}: {period} budget "
+            f"projected to run out at {exhausted_at.isoformat()}"
+        )
+        return paused
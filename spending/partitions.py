@@ -0,0 +1,219 @@
+"""
+Monthly range partitioning of the spends table on PostgreSQL.
+
+On other databases the spends table is a plain table and every function
+here is a no-op, so callers do not need to check the backend.
+"""
+
+import logging
+import re
+from datetime import date
+from typing import Any, List, Optional, Tuple
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+SPENDS_TABLE = 'spends'
+
+DEFAULT_PARTITION = f'{SPENDS_TABLE}_default'
+
+PARTITION_NAME = re.compile(rf'^{SPENDS_TABLE}_(\d{{4}})_(\d{{2}})$')
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    """
+    Get the half-open date range covering a month.
+
+    Filtering with ``spend_date__gte`` / ``spend_date__lt`` on these bounds
+    (rather than ``__year`` / ``__month`` lookups) lets PostgreSQL prune the
+    monthly partitions.
+
+    Returns:
+        First day of the month and first day of the next month
+    """
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def add_months(month_start: date, months: int) -> date:
+    """Shift the first day of a month by a number of months."""
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month_start: date) -> str:
+    """Get the partition table name for a month."""
+    return f"{SPENDS_TABLE}_{month_start.year:04d}_{month_start.month:02d}"
+
+
+def is_supported(conn: Any = None) -> bool:
+    """Check whether the database supports declarative partitioning."""
+    return (conn or connection).vendor == 'postgresql'
+
+
+def is_partitioned(conn: Any = None) -> bool:
+    """Check whether the spends table is a partitioned table."""
+    conn = conn or connection
+    if not is_supported(conn):
+        return False
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [SPENDS_TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(conn: Any = None) -> List[Tuple[str, date]]:
+    """
+    List the monthly partitions attached to the spends table.
+
+    Returns:
+        ``(table_name, month_start)`` pairs sorted by month
+    """
+    conn = conn or connection
+    if not is_partitioned(conn):
+        return []
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [SPENDS_TABLE]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partition(month_start: date, conn: Any = None) -> Optional[str]:
+    """
+    Create the partition for a month if it does not exist.
+
+    Rows of the month that landed in the default partition (spends dated
+    beyond the partitions created so far) are moved into the new partition
+    before it is attached; PostgreSQL refuses to attach a partition while
+    the default one holds rows in its range.
+
+    Args:
+        month_start: First day of the month
+
+    Returns:
+        The partition name, or None if partitioning is not in use
+    """
+    conn = conn or connection
+    if not is_partitioned(conn):
+        return None
+
+    start, end = month_bounds(month_start.year, month_start.month)
+    name = partition_name(start)
+    with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s), to_regclass(%s)", [name, DEFAULT_PARTITION])
+        existing, default = cursor.fetchone()
+        if existing is not None:
+            return name
+
+        cursor.execute(f"CREATE TABLE {name} (LIKE {SPENDS_TABLE} INCLUDING DEFAULTS)")
+        if default is not None:
+            cursor.execute(
+                f"WITH moved AS ("
+                f"DELETE FROM {DEFAULT_PARTITION} WHERE spend_date >= %s AND spend_date < %s RETURNING *"
+                f") INSERT INTO {name} SELECT * FROM moved",
+                [start, end]
+            )
+        cursor.execute(
+            f"ALTER TABLE {SPENDS_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    return name
+
+
+def ensure_partitions(months_ahead: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+    """
+    Pre-create partitions for the current month and the months ahead.
+
+    Args:
+        months_ahead: Future months to create (defaults to ``SPEND_PARTITION_MONTHS_AHEAD``)
+        today: Reference date (defaults to today)
+
+    Returns:
+        Names of the partitions that now exist for those months
+    """
+    if not is_partitioned():
+        return []
+
+    if months_ahead is None:
+        months_ahead = settings.SPEND_PARTITION_MONTHS_AHEAD
+    current = (today or date.today()).replace(day=1)
+
+    names = []
+    with transaction.atomic():
+        for offset in range(months_ahead + 1):
+            name = create_partition(add_months(current, offset))
+            if name:
+                names.append(name)
+
+    logger.info(f"Ensured spend partitions: {', '.join(names)}")
+
+    return names
+
+
+def detach_old_partitions(
+    retention_months: Optional[int] = None,
+    archive_schema: Optional[str] = None,
+    drop: bool = False,
+    today: Optional[date] = None
+) -> List[str]:
+    """
+    Detach partitions older than the retention window.
+
+    Detached partitions stay in place as plain tables unless they are moved
+    to ``archive_schema`` or dropped.
+
+    Args:
+        retention_months: Months kept attached, including the current one
+            (defaults to ``SPEND_PARTITION_RETENTION_MONTHS``)
+        archive_schema: Schema detached partitions are moved into
+        drop: Drop detached partitions instead of keeping them
+        today: Reference date (defaults to today)
+
+    Returns:
+        Names of the partitions that were detached
+    """
+    if not is_partitioned():
+        return []
+
+    if retention_months is None:
+        retention_months = settings.SPEND_PARTITION_RETENTION_MONTHS
+    cutoff = add_months((today or date.today()).replace(day=1), -(retention_months - 1))
+
+    detached = []
+    for name, month_start in list_partitions():
+        if month_start >= cutoff:
+            continue
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {SPENDS_TABLE} DETACH PARTITION {name}")
+            if drop:
+                cursor.execute(f"DROP TABLE {name}")
+            elif archive_schema:
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}")
+                cursor.execute(f"ALTER TABLE {name} SET SCHEMA {archive_schema}")
+
+        detached.append(name)
+        logger.info(f"Detached spend partition {name}")
+
+    return detached
@@ -0,0 +1,219 @@
+"""
+Reconciliation of campaign spend counters against the spend ledger.
+
+``Campaign.daily_spend`` and ``monthly_spend`` are denormalized totals that
+every ingestion path increments. Manual admin resets, failed signals or
+writes that bypass the counters make them drift from the ``spends`` table;
+this module recomputes the true totals and repairs the counters that
+disagree, then checks the brand totals against the repaired campaign
+counters.
+"""
+
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from brands.models import Brand
+from campaigns import budget_cache
+from campaigns.models import BUDGET_PERIODS, Campaign, current_spend, period_start
+from .models import Spend, SpendDailyRollup
+
+logger = logging.getLogger(__name__)
+
+# Ledgers the true totals can be computed from
+SOURCES = ('spends', 'rollups')
+
+
+class CounterReconciler:
+    """
+    Compare every campaign's spend counters with its spends and repair drift.
+
+    Campaigns are processed in primary key order in chunks of
+    ``chunk_size``. Each chunk runs in its own short transaction: the
+    chunk's campaign rows are locked, the true totals of the current local
+    day and month are computed with one ``GROUP BY`` over the spends (or
+    the daily rollups) of the chunk, and the counters that disagree are
+    rewritten with ``bulk_update``. Spends tracked concurrently wait for the
+    chunk's row locks, so their increments apply on top of the repaired
+    values. True totals follow ``recompute_campaign_totals``: the sum of
+    the spends dated today and this month in the brand's timezone.
+    """
+
+    def __init__(self, chunk_size: int = 500, source: str = 'spends', repair: bool = True) -> None:
+        """
+        Initialize the reconciler.
+
+        Args:
+            chunk_size: Campaigns checked per transaction
+            source: ``'spends'`` to sum raw spends or ``'rollups'`` to sum
+                the daily rollups (cheaper, but only as correct as the rollups)
+            repair: Rewrite drifted counters; when False only report them
+        """
+        if source not in SOURCES:
+            raise ValueError(f"Invalid reconciliation source: {source}")
+
+        self.chunk_size = chunk_size
+        self.source = source
+        self.repair = repair
+
+    def run(self, moment: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Reconcile the counters of every campaign.
+
+        Args:
+            moment: The moment whose local day and month are checked
+                (defaults to now)
+
+        Returns:
+            Dictionary with the number of campaigns checked, drifted and
+            repaired, the total absolute daily and monthly drift and the
+            largest single drift (as floats), the number of brands whose
+            totals drifted, and errors
+        """
+        moment = moment or timezone.now()
+        results: Dict[str, Any] = {
+            'checked': 0,
+            'drifted': 0,
+            'repaired': 0,
+            'daily_drift': Decimal('0.00'),
+            'monthly_drift': Decimal('0.00'),
+            'max_drift': Decimal('0.00'),
+            'brands_drifted': 0,
+            'errors': 0
+        }
+
+        last_id = None
+        while True:
+            try:
+                with transaction.atomic():
+                    last_id = self._reconcile_chunk(last_id, moment, results)
+            except Exception as e:
+                logger.error(f"Error reconciling spend counters after campaign {last_id}: {e}")
+                results['errors'] += 1
+                break
+
+            if last_id is None:
+                break
+
+        try:
+            brand_drifts = Brand.reconcile_totals(moment=moment, repair=self.repair)
+        except Exception as e:
+            logger.error(f"Error reconciling brand spend totals: {e}")
+            results['errors'] += 1
+        else:
+            results['brands_drifted'] = len(brand_drifts)
+            for brand_id, (daily, monthly) in brand_drifts.items():
+                logger.warning(f"Spend totals of brand {brand_id} drifted by {daily} (daily) and {monthly} (monthly)")
+
+        for key in ('daily_drift', 'monthly_drift', 'max_drift'):
+            results[key] = float(results[key])
+
+        logger.info(f"Spend counter reconciliation completed: {results}")
+
+        return results
+
+    def _reconcile_chunk(self, last_id: Any, moment: datetime, results: Dict[str, Any]) -> Any:
+        """
+        Reconcile the chunk of campaigns after ``last_id``.
+
+        Returns:
+            The last campaign ID of the chunk, or None when there are no
+            campaigns left
+        """
+        campaigns = Campaign.objects.order_by('pk')
+        if last_id is not None:
+            campaigns = campaigns.filter(pk__gt=last_id)
+
+        rows = list(
+            campaigns.select_for_update(of=('self',)).values_list(
+                'pk', 'brand__timezone', 'daily_spend', 'daily_period', 'monthly_spend', 'monthly_period'
+            )[:self.chunk_size]
+        )
+        if not rows:
+            return None
+
+        today = {row[0]: moment.astimezone(ZoneInfo(row[1])).date() for row in rows}
+        totals = self._true_totals(today)
+        now = timezone.now()
+
+        repairs: List[Campaign] = []
+        for campaign_id, _, daily_spend, daily_period, monthly_spend, monthly_period in rows:
+            stored = {
+                'daily': (daily_spend, daily_period),
+                'monthly': (monthly_spend, monthly_period),
+            }
+            drifts = {}
+            for period in BUDGET_PERIODS:
+                spend, stamp = stored[period]
+                # Counters from an earlier period read as zero
+                current = current_spend(period, spend, stamp, today[campaign_id])
+                drifts[period] = totals.get((campaign_id, period), Decimal('0.00')) - current
+
+            results['checked'] += 1
+            if not any(drifts.values()):
+                continue
+
+            results['drifted'] += 1
+            for period, drift in drifts.items():
+                results[f'{period}_drift'] += abs(drift)
+                results['max_drift'] = max(results['max_drift'], abs(drift))
+            logger.warning(
+                f"Spend counters of campaign {campaign_id} drifted by "
+                f"{drifts['daily']} (daily) and {drifts['monthly']} (monthly)"
+            )
+
+            repairs.append(Campaign(
+                pk=campaign_id,
+                daily_spend=totals.get((campaign_id, 'daily'), Decimal('0.00')),
+                daily_period=period_start('daily', today[campaign_id]),
+                monthly_spend=totals.get((campaign_id, 'monthly'), Decimal('0.00')),
+                monthly_period=period_start('monthly', today[campaign_id]),
+                updated_at=now
+            ))
+
+        if self.repair and repairs:
+            Campaign.objects.bulk_update(
+                repairs,
+                ['daily_spend', 'daily_period', 'monthly_spend', 'monthly_period', 'updated_at'],
+                batch_size=500
+            )
+            budget_cache.invalidate_campaigns([campaign.pk for campaign in repairs])
+            results['repaired'] += len(repairs)
+
+        return rows[-1][0]
+
+    def _true_totals(self, today: Dict[Any, date]) -> Dict[Tuple[Any, str], Decimal]:
+        """
+        Sum the spends of the current local day and month of several campaigns.
+
+        Args:
+            today: Mapping of campaign ID to its local date
+
+        Returns:
+            Mapping of ``(campaign_id, period)`` to the true total
+        """
+        ledger = Spend if self.source == 'spends' else SpendDailyRollup
+        first = min(period_start('monthly', local_date) for local_date in today.values())
+        last = max(today.values())
+
+        daily_totals = ledger._default_manager.filter(
+            campaign_id__in=list(today),
+            spend_date__gte=first,
+            spend_date__lte=last
+        ).order_by().values_list('campaign_id', 'spend_date').annotate(total=Sum('amount'))
+
+        totals: Dict[Tuple[Any, str], Decimal] = {}
+        for campaign_id, spend_date, total in daily_totals:
+            local_date = today[campaign_id]
+            if spend_date > local_date:
+                continue
+            for period in BUDGET_PERIODS:
+                if spend_date >= period_start(period, local_date):
+                    key = (campaign_id, period)
+                    totals[key] = totals.get(key, Decimal('0.00')) + total
+
+        return totals
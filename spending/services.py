@@ -3,13 +3,20 @@ Spending services for budget management system.
 """
 
 import logging
+import uuid
 from typing import List, Optional, Dict, Any
 from decimal import Decimal
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
-from datetime import date
-from campaigns.models import Campaign, CampaignStatus, PauseReason
-from .models import Spend, SpendType
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+from brands.models import Brand
+from campaigns import budget_cache
+from campaigns.models import Campaign, CampaignStatus, PauseReason, Shard, current_spend
+from .models import Spend, SpendKey, SpendResetWatermark, SpendType
+from .accumulator import SpendAccumulator
+from .pacing import PacingEngine
 
 logger = logging.getLogger(__name__)
 
@@ -21,17 +28,39 @@ class SpendingService:
     This service handles the logic for tracking spend, checking budget limits,
     and enforcing budget constraints on campaigns.
     """
-    
-    def __init__(self) -> None:
-        """Initialize the spending service."""
-        pass
+
+    # Rows per INSERT statement when bulk-creating spend records
+    BULK_BATCH_SIZE = 1000
+
+    def __init__(
+        self,
+        accumulator: Optional[SpendAccumulator] = None,
+        pacing: Optional[PacingEngine] = None
+    ) -> None:
+        """
+        Initialize the spending service.
+
+        Args:
+            accumulator: Redis accumulator for write-behind spend tracking
+                (defaults to one when ``SPEND_ACCUMULATOR_ENABLED`` is set)
+            pacing: Pacing engine that pauses campaigns ahead of budget
+                exhaustion (defaults to one when ``PACING_ENABLED`` is set)
+        """
+        if accumulator is None and settings.SPEND_ACCUMULATOR_ENABLED:
+            accumulator = SpendAccumulator()
+        self.accumulator = accumulator
+        if pacing is None and settings.PACING_ENABLED:
+            pacing = PacingEngine()
+        self.pacing = pacing
     
     def track_spend(
         self, 
         campaign: Campaign, 
         amount: Decimal, 
         spend_date: Optional[date] = None,
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        spend_type: str = SpendType.DAILY,
+        external_id: Optional[str] = None
     ) -> Spend:
         """
         Track a new spend for a campaign.
@@ -39,11 +68,16 @@ class SpendingService:
         Args:
             campaign: The campaign to track spend for
             amount: The amount spent
-            spend_date: The date of the spend (defaults to today)
+            spend_date: The date of the spend (defaults to today in the
+                brand's timezone)
             description: Optional description of the spend
+            spend_type: Type of spend (defaults to daily)
+            external_id: Optional idempotency key; a spend whose key was
+                already tracked is skipped and its counters are not touched
             
         Returns:
-            The created spend record
+            The created spend record, or the previously tracked one (with
+            ``duplicate`` set) if ``external_id`` was seen before
             
         Raises:
             ValueError: If amount is not positive
@@ -52,30 +86,332 @@ class SpendingService:
             raise ValueError("Spend amount must be positive")
         
         if spend_date is None:
-            spend_date = timezone.now().date()
+            spend_date = campaign.local_date()
         
         with transaction.atomic():
-            # Create the spend record using the model instance to trigger custom save
             spend = Spend(
                 campaign=campaign,
                 amount=amount,
                 spend_date=spend_date,
-                spend_type=SpendType.DAILY,
-                description=description
+                spend_type=spend_type,
+                description=description,
+                external_id=external_id or None
             )
-            spend.save()
+
+            if spend.external_id is None:
+                # Use the model instance to trigger custom save
+                spend.save()
+            elif Spend.insert_ignoring_duplicates([spend]):
+                # bulk inserts skip post_save, so apply the counters here
+                campaign.add_spend(amount)
+            else:
+                logger.info(f"Skipped duplicate spend {external_id} for campaign {campaign.id}")
+                existing = SpendKey.objects.get(external_id=spend.external_id).get_spend()
+                existing.duplicate = True
+                return existing
             
             # Check budget limits after adding spend
             self.check_budget_limits(campaign)
             
-            logger.info(f"Tracked spend of {amount} for campaign {campaign.id}")
+            if self.pacing is not None:
+                self._pace(self.pacing, campaign, [spend])
             
+            logger.info(f"Tracked spend of {amount} for campaign {campaign.id}")
+
             return spend
-    
+
+    def track_spends_bulk(self, entries: List[Dict[str, Any]]) -> List[Spend]:
+        """
+        Track many spends at once using set-based writes.
+
+        The spend rows are inserted with ``bulk_create`` (ignoring duplicate
+        external IDs), each touched
+        campaign's daily/monthly counters are incremented by aggregated
+        UPDATE statements, and budget limits are checked once per campaign.
+
+        Args:
+            entries: Spend dictionaries with ``campaign_id`` and ``amount`` keys
+                and optional ``id``, ``spend_date`` (defaults to today in the
+                brand's timezone), ``spend_type``, ``description`` and
+                ``external_id``
+
+        Returns:
+            The created spend records; spends whose ``external_id`` was already
+            tracked are skipped and not counted
+
+        Raises:
+            ValueError: If an amount is not positive or a campaign does not exist
+        """
+        if not entries:
+            return []
+
+        undated = {uuid.UUID(str(entry['campaign_id'])) for entry in entries if not entry.get('spend_date')}
+        local_dates = self._local_dates(undated) if undated else {}
+        fallback = timezone.now().date()
+        spends: List[Spend] = []
+
+        for entry in entries:
+            amount = Decimal(str(entry['amount']))
+            if amount <= Decimal('0.00'):
+                raise ValueError("Spend amount must be positive")
+
+            campaign_id = uuid.UUID(str(entry['campaign_id']))
+            spends.append(Spend(
+                id=entry.get('id') or uuid.uuid4(),
+                campaign_id=campaign_id,
+                amount=amount,
+                spend_date=entry.get('spend_date') or local_dates.get(campaign_id, fallback),
+                spend_type=entry.get('spend_type') or SpendType.DAILY,
+                description=entry.get('description'),
+                external_id=entry.get('external_id') or None
+            ))
+
+        with transaction.atomic():
+            # bulk inserts skip the post_save signal, so counters are only
+            # incremented once, by the aggregated update below
+            inserted = Spend.insert_ignoring_duplicates(spends, batch_size=self.BULK_BATCH_SIZE)
+
+            totals: Dict[uuid.UUID, Decimal] = {}
+            for spend in inserted:
+                totals[spend.campaign_id] = totals.get(spend.campaign_id, Decimal('0.00')) + spend.amount
+
+            updated = Campaign.add_spends_bulk(totals)
+            if updated != len(totals):
+                existing = set(Campaign.objects.filter(id__in=list(totals)).values_list('id', flat=True))
+                missing = sorted(str(campaign_id) for campaign_id in totals if campaign_id not in existing)
+                raise ValueError(f"Campaigns do not exist: {', '.join(missing)}")
+
+            by_campaign: Dict[uuid.UUID, List[Spend]] = {}
+            for spend in inserted:
+                by_campaign.setdefault(spend.campaign_id, []).append(spend)
+
+            campaigns = Campaign.objects.select_related('brand').filter(id__in=list(totals))
+            for campaign in campaigns:
+                self.check_budget_limits(campaign)
+                if self.pacing is not None:
+                    self._pace(self.pacing, campaign, by_campaign[campaign.pk])
+
+        logger.info(
+            f"Tracked {len(inserted)} spends in bulk for {len(totals)} campaigns "
+            f"({len(spends) - len(inserted)} duplicates skipped)"
+        )
+
+        return inserted
+
+    @staticmethod
+    def _pace(pacing: PacingEngine, campaign: Campaign, spends: List[Spend]) -> None:
+        """Feed a campaign's spends of today to the pacing engine and schedule its pause check."""
+        today = campaign.local_date()
+        amount = sum((spend.amount for spend in spends if spend.spend_date == today), Decimal('0.00'))
+        if amount > Decimal('0.00'):
+            pacing.record_spend(campaign, amount)
+            pacing.schedule_pause(campaign)
+
+    @staticmethod
+    def _local_dates(campaign_ids: Any, moment: Optional[datetime] = None) -> Dict[Any, date]:
+        """
+        Get today's date in the brand timezone of several campaigns.
+
+        Returns:
+            Mapping of campaign ID to local date (missing campaigns are omitted)
+        """
+        return Campaign.local_dates(campaign_ids, moment)
+
+    def accumulate_spend(
+        self,
+        campaign: Campaign,
+        amount: Decimal,
+        spend_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Track a spend in the Redis accumulator instead of the database.
+
+        The spend is added to the campaign's pending total and checked
+        against the brand's cached budgets and the campaign's counters
+        cached in Redis. If persisted plus pending
+        spend reaches a budget, the campaign is flushed right away and the
+        regular budget check pauses it.
+
+        Args:
+            campaign: The campaign to track spend for
+            amount: The amount spent
+            spend_date: The date of the spend (defaults to today)
+
+        Returns:
+            Dictionary with the pending amount, projected spend and campaign status
+
+        Raises:
+            ValueError: If amount is not positive
+            RuntimeError: If the accumulator is not configured
+        """
+        if self.accumulator is None:
+            raise RuntimeError("Spend accumulator is not configured")
+
+        if amount <= Decimal('0.00'):
+            raise ValueError("Spend amount must be positive")
+
+        if spend_date is None:
+            spend_date = campaign.local_date()
+
+        pending = self.accumulator.add(campaign.id, amount, spend_date)
+        state = self.accumulator.get_budget_state(campaign)
+
+        results: Dict[str, Any] = {
+            'campaign_id': str(campaign.id),
+            'pending_amount': float(pending),
+            'projected_daily_spend': float(state.daily_spend + pending),
+            'projected_monthly_spend': float(state.monthly_spend + pending),
+            'flushed': False,
+            'daily_exceeded': False,
+            'monthly_exceeded': False
+        }
+
+        if (state.daily_spend + pending >= state.daily_budget
+                or state.monthly_spend + pending >= state.monthly_budget):
+            # The flush runs the regular budget check, which pauses the campaign
+            self.flush_accumulated_spends([campaign.id])
+            campaign.refresh_from_db()
+            budget_check = self.check_budget_limits(campaign)
+            results['flushed'] = True
+            results['daily_exceeded'] = budget_check['daily_exceeded']
+            results['monthly_exceeded'] = budget_check['monthly_exceeded']
+
+        results['status'] = campaign.status
+
+        return results
+
+    def flush_accumulated_spends(self, campaign_ids: Optional[List[Any]] = None) -> Dict[str, int]:
+        """
+        Write spend accumulated in Redis to the spends table and counters.
+
+        Each campaign is flushed in its own transaction. Spend rows get
+        external IDs derived from the accumulator batch, so retrying a flush
+        that committed but was not acknowledged in Redis is a no-op.
+
+        Args:
+            campaign_ids: Campaigns to flush (defaults to all with pending spend)
+
+        Returns:
+            Dictionary with flush results
+        """
+        if self.accumulator is None:
+            raise RuntimeError("Spend accumulator is not configured")
+
+        results = {
+            'campaigns': 0,
+            'spends': 0,
+            'skipped': 0,
+            'errors': 0
+        }
+
+        if campaign_ids is None:
+            campaign_ids = list(self.accumulator.dirty_campaigns())
+
+        for campaign_id in campaign_ids:
+            batch = self.accumulator.begin_flush(campaign_id)
+            if batch is None:
+                continue
+
+            entries = [
+                {
+                    'external_id': batch.external_id(spend_date),
+                    'campaign_id': batch.campaign_id,
+                    'amount': amount,
+                    'spend_date': spend_date,
+                    'description': f"Accumulated {batch.counts.get(spend_date, 0)} spends"
+                }
+                for spend_date, amount in sorted(batch.amounts.items())
+                if amount > Decimal('0.00')
+            ]
+
+            try:
+                if entries and not self.track_spends_bulk(entries):
+                    # Committed by an earlier attempt that crashed before acknowledging
+                    results['skipped'] += 1
+                else:
+                    results['campaigns'] += 1
+                    results['spends'] += sum(batch.counts.values())
+            except ValueError as e:
+                # The campaign no longer exists; drop its accumulated spend
+                logger.warning(f"Discarding accumulated spend for campaign {campaign_id}: {e}")
+            except Exception as e:
+                logger.error(f"Error flushing accumulated spend for campaign {campaign_id}: {e}")
+                results['errors'] += 1
+                continue
+
+            self.accumulator.complete_flush(campaign_id)
+
+        logger.info(f"Accumulated spend flush completed: {results}")
+
+        return results
+
+    def recompute_campaign_totals(self, campaign_ids: List[Any], chunk_size: int = 500) -> int:
+        """
+        Recompute campaign spend counters from the spends table.
+
+        Daily spend is recomputed as the sum of today's spends and monthly
+        spend as the sum of this month's spends (in each brand's timezone)
+        and stamped with those periods, with one UPDATE per chunk of
+        campaigns and timezone. Used after bulk
+        loads that bypass the per-spend counters.
+
+        Args:
+            campaign_ids: Campaigns to recompute
+            chunk_size: Campaigns updated per statement
+
+        Returns:
+            Number of campaigns updated
+        """
+        from django.db.models import DecimalField, OuterRef, Subquery, Sum, Value
+        from django.db.models.functions import Coalesce
+
+        def spend_total(**filters: Any) -> Coalesce:
+            total = Spend.objects.filter(
+                campaign_id=OuterRef('pk'), **filters
+            ).order_by().values('campaign_id').annotate(total=Sum('amount')).values('total')
+            return Coalesce(
+                Subquery(total, output_field=DecimalField(max_digits=12, decimal_places=2)),
+                Value(Decimal('0.00')),
+                output_field=DecimalField(max_digits=12, decimal_places=2)
+            )
+
+        by_date: Dict[date, List[Any]] = {}
+        for campaign_id, today in self._local_dates(campaign_ids).items():
+            by_date.setdefault(today, []).append(campaign_id)
+
+        updated = 0
+        for today, ids in by_date.items():
+            ids.sort(key=str)
+            for start in range(0, len(ids), chunk_size):
+                updated += Campaign.objects.filter(pk__in=ids[start:start + chunk_size]).update(
+                    daily_spend=spend_total(spend_date=today),
+                    daily_period=today,
+                    monthly_spend=spend_total(spend_date__gte=today.replace(day=1), spend_date__lte=today),
+                    monthly_period=today.replace(day=1),
+                    updated_at=timezone.now()
+                )
+            budget_cache.invalidate_campaigns(ids)
+
+        # The UPDATEs bypass the brand totals, so recompute the brands touched
+        Brand.reconcile_totals(
+            set(Campaign.objects.filter(pk__in=list(campaign_ids)).values_list('brand_id', flat=True))
+        )
+
+        logger.info(f"Recomputed spend totals for {updated} campaigns")
+
+        return updated
+
     def check_budget_limits(self, campaign: Campaign) -> Dict[str, Any]:
         """
         Check if a campaign has exceeded its budget limits.
         
+        The campaign's own counters are compared with its brand budgets,
+        taken from the budget cache unless the brand is already loaded, so
+        the brand is never fetched. Brands enforcing their total
+        (``BudgetEnforcement.BRAND``) compare the brand's totals instead,
+        read from its row, and every active campaign of the brand is paused
+        once a total reaches its budget.
+        
         Args:
             campaign: The campaign to check
             
@@ -88,28 +424,76 @@ class SpendingService:
             'action_taken': None
         }
         
+        budget = budget_cache.brand_budget_for(campaign)
+        today = budget.local_date()
+        
+        if budget.enforces_brand_total():
+            return self._check_brand_budget_limits(campaign, budget, results)
+        
         # Check daily budget
-        if campaign.daily_spend >= campaign.brand.daily_budget:
+        if current_spend('daily', campaign.daily_spend, campaign.daily_period, today) >= budget.daily_budget:
             results['daily_exceeded'] = True
-            if campaign.is_active():
-                campaign.pause(PauseReason.DAILY_BUDGET_EXCEEDED)
+            was_active = campaign.is_active()
+            # Flagged even when paused for another reason, so lifting that one keeps it paused
+            campaign.pause(PauseReason.DAILY_BUDGET_EXCEEDED)
+            if was_active:
                 results['action_taken'] = 'paused_daily'
                 logger.info(f"Paused campaign {campaign.id} due to daily budget limit")
         
         # Check monthly budget
-        if campaign.monthly_spend >= campaign.brand.monthly_budget:
+        if current_spend('monthly', campaign.monthly_spend, campaign.monthly_period, today) >= budget.monthly_budget:
             results['monthly_exceeded'] = True
-            if campaign.is_active():
-                campaign.pause(PauseReason.MONTHLY_BUDGET_EXCEEDED)
+            was_active = campaign.is_active()
+            # Flagged even when paused for another reason, so lifting that one keeps it paused
+            campaign.pause(PauseReason.MONTHLY_BUDGET_EXCEEDED)
+            if was_active:
                 results['action_taken'] = 'paused_monthly'
                 logger.info(f"Paused campaign {campaign.id} due to monthly budget limit")
         
         return results
     
-    def enforce_budget_limits(self) -> Dict[str, int]:
+    def _check_brand_budget_limits(
+        self,
+        campaign: Campaign,
+        budget: budget_cache.BrandBudget,
+        results: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Check a brand's totals and pause all its campaigns once one reaches its budget."""
+        today = budget.local_date()
+        totals = Brand.objects.values_list(
+            'daily_spend', 'daily_period', 'monthly_spend', 'monthly_period'
+        ).get(pk=campaign.brand_id)
+        
+        checks = (
+            ('daily', current_spend('daily', totals[0], totals[1], today), budget.daily_budget,
+             PauseReason.DAILY_BUDGET_EXCEEDED),
+            ('monthly', current_spend('monthly', totals[2], totals[3], today), budget.monthly_budget,
+             PauseReason.MONTHLY_BUDGET_EXCEEDED),
+        )
+        for period, total, limit, reason in checks:
+            if total < limit:
+                continue
+            results[f'{period}_exceeded'] = True
+            paused = Campaign.pause_exceeding_brand_budget(period, reason, brand_ids=[campaign.brand_id])
+            if paused:
+                results['action_taken'] = f'paused_brand_{period}'
+                logger.info(f"Paused {len(paused)} campaigns of brand {campaign.brand_id} due to {period} brand budget limit")
+            campaign.refresh_from_db(fields=['status', 'pause_reason', 'pause_flags', 'paused_at', 'updated_at'])
+        
+        return results
+    
+    def enforce_budget_limits(self, shard: Optional[Shard] = None) -> Dict[str, int]:
         """
         Enforce budget limits for all active campaigns.
         
+        Campaigns are checked against their brand budgets with set-based
+        UPDATEs instead of one query per campaign. Campaigns of brands
+        enforcing their total are paused when the brand's total reached the
+        budget, and are counted with the campaigns paused for that period.
+        
+        Args:
+            shard: Only enforce the campaigns of this ``(index, count)`` shard
+        
         Returns:
             Dictionary with enforcement results
         """
@@ -123,22 +507,33 @@ class SpendingService:
         }
         
         try:
-            # Get all active campaigns
-            active_campaigns = Campaign.objects.filter(status=CampaignStatus.ACTIVE)
-            
-            for campaign in active_campaigns:
-                try:
-                    results['checked'] += 1
-                    budget_check = self.check_budget_limits(campaign)
-                    
-                    if budget_check['action_taken'] == 'paused_daily':
-                        results['paused_daily'] += 1
-                    elif budget_check['action_taken'] == 'paused_monthly':
-                        results['paused_monthly'] += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error checking budget for campaign {campaign.id}: {e}")
-                    results['errors'] += 1
+            with transaction.atomic():
+                results['checked'] = Campaign.objects.filter(
+                    Campaign.shard_condition(shard), status=CampaignStatus.ACTIVE
+                ).count()
+
+                # Daily limits are enforced first, so a campaign over both
+                # budgets is paused (and counted) for its daily budget
+                paused_daily = Campaign.pause_exceeding_budget(
+                    'daily', PauseReason.DAILY_BUDGET_EXCEEDED, shard=shard
+                )
+                paused_daily += Campaign.pause_exceeding_brand_budget(
+                    'daily', PauseReason.DAILY_BUDGET_EXCEEDED, shard=shard
+                )
+                paused_monthly = Campaign.pause_exceeding_budget(
+                    'monthly', PauseReason.MONTHLY_BUDGET_EXCEEDED, shard=shard
+                )
+                paused_monthly += Campaign.pause_exceeding_brand_budget(
+                    'monthly', PauseReason.MONTHLY_BUDGET_EXCEEDED, shard=shard
+                )
+
+            results['paused_daily'] = len(paused_daily)
+            results['paused_monthly'] = len(paused_monthly)
+
+            for campaign_id in paused_daily:
+                logger.info(f"Paused campaign {campaign_id} due to daily budget limit")
+            for campaign_id in paused_monthly:
+                logger.info(f"Paused campaign {campaign_id} due to monthly budget limit")
             
             logger.info(f"Budget enforcement completed: {results}")
             
@@ -148,66 +543,115 @@ class SpendingService:
         
         return results
     
-    def reset_daily_spends(self) -> Dict[str, int]:
+    def reset_due_periods(self, now: Optional[datetime] = None) -> Dict[str, int]:
         """
-        Reset daily spends for all campaigns and reactivate eligible ones.
+        Reset the spend counters of every timezone whose day or month rolled over.
         
+        Brands are bucketed by timezone. A bucket's daily counters are reset
+        once its local date passes the date in its ``SpendResetWatermark``
+        (and likewise for months), so running this frequently resets each
+        timezone shortly after its own midnight instead of every campaign at
+        once. A bucket seen for the first time only records the current
+        period. With ``SPEND_COUNTERS_EAGER_RESET`` disabled the counters are
+        left to roll over lazily and only the reactivation pass runs.
+        
+        Args:
+            now: The moment to check (defaults to now)
+            
         Returns:
-            Dictionary with reset results
+            Dictionary with the number of timezone/period buckets and
+            campaigns reset and campaigns reactivated
         """
-        logger.info("Starting daily spend reset")
-        
+        now = now or timezone.now()
         results = {
-            'reset': 0,
+            'buckets': 0,
+            'daily_reset': 0,
+            'monthly_reset': 0,
             'reactivated': 0,
             'errors': 0
         }
         
-        try:
-            with transaction.atomic():
-                # Reset daily spends for all campaigns
-                campaigns = Campaign.objects.all()
-                
-                for campaign in campaigns:
-                    try:
-                        campaign.reset_daily_spend()
-                        results['reset'] += 1
-                    except Exception as e:
-                        logger.error(f"Error resetting daily spend for campaign {campaign.id}: {e}")
-                        results['errors'] += 1
-                
-                # Reactivate campaigns that were paused due to daily budget
-                paused_campaigns = Campaign.objects.filter(
-                    status=CampaignStatus.PAUSED,
-                    pause_reason=PauseReason.DAILY_BUDGET_EXCEEDED
-                )
-                
-                for campaign in paused_campaigns:
-                    try:
-                        if campaign.can_be_activated():
-                            campaign.activate()
-                            results['reactivated'] += 1
-                            logger.info(f"Reactivated campaign {campaign.id} after daily reset")
-                    except Exception as e:
-                        logger.error(f"Error reactivating campaign {campaign.id}: {e}")
-                        results['errors'] += 1
-            
-            logger.info(f"Daily spend reset completed: {results}")
+        for tz in Brand.objects.order_by().values_list('timezone', flat=True).distinct():
+            local_today = now.astimezone(ZoneInfo(tz)).date()
+            periods = [
+                ('daily', local_today, PauseReason.DAILY_BUDGET_EXCEEDED),
+                ('monthly', local_today.replace(day=1), PauseReason.MONTHLY_BUDGET_EXCEEDED),
+            ]
             
-        except Exception as e:
-            logger.error(f"Error during daily spend reset: {e}")
-            results['errors'] += 1
+            for period, period_start, pause_reason in periods:
+                try:
+                    with transaction.atomic():
+                        watermark, created = SpendResetWatermark.objects.select_for_update().get_or_create(
+                            timezone=tz,
+                            period=period,
+                            defaults={'period_start': period_start}
+                        )
+                        if created or watermark.period_start >= period_start:
+                            continue
+                        
+                        if settings.SPEND_COUNTERS_EAGER_RESET:
+                            results[f'{period}_reset'] += Campaign.reset_spend_counters(period, timezones=[tz])
+                        watermark.period_start = period_start
+                        watermark.save(update_fields=['period_start', 'updated_at'])
+                    
+                    results['buckets'] += 1
+                    reactivated = Campaign.reactivate_paused(pause_reason, timezones=[tz])
+                    results['reactivated'] += len(reactivated)
+                    for campaign_id in reactivated:
+                        logger.info(f"Reactivated campaign {campaign_id} after {period} reset in {tz}")
+                    
+                    logger.info(f"{period.capitalize()} spend reset for {tz} ({period_start}) completed")
+                    
+                except Exception as e:
+                    logger.error(f"Error during {period} spend reset for {tz}: {e}")
+                    results['errors'] += 1
         
         return results
     
-    def reset_monthly_spends(self) -> Dict[str, int]:
+    def reset_daily_spends(self, shard: Optional[Shard] = None) -> Dict[str, int]:
+        """
+        Reset daily spends for all campaigns and reactivate eligible ones.
+        
+        Args:
+            shard: Only reset the campaigns of this ``(index, count)`` shard
+        
+        Returns:
+            Dictionary with reset results
+        """
+        return self._reset_spends('daily', PauseReason.DAILY_BUDGET_EXCEEDED, shard)
+    
+    def reset_monthly_spends(self, shard: Optional[Shard] = None) -> Dict[str, int]:
         """
         Reset monthly spends for all campaigns and reactivate eligible ones.
         
+        Args:
+            shard: Only reset the campaigns of this ``(index, count)`` shard
+        
+        Returns:
+            Dictionary with reset results
+        """
+        return self._reset_spends('monthly', PauseReason.MONTHLY_BUDGET_EXCEEDED, shard)
+    
+    def _reset_spends(self, period: str, pause_reason: str, shard: Optional[Shard] = None) -> Dict[str, int]:
+        """
+        Reset a spend counter with one UPDATE and reactivate campaigns in chunks.
+        
+        With ``SPEND_COUNTERS_EAGER_RESET`` disabled the counters are not
+        rewritten: counters stamped with the previous period already read
+        as zero, so only the reactivation pass runs. Campaigns paused for
+        the period's budget are reactivated if they are under both budgets
+        and inside a dayparting window, selected with one joined query and
+        updated in short chunked transactions.
+        
+        Args:
+            period: ``'daily'`` or ``'monthly'``
+            pause_reason: Pause reason of the campaigns to reactivate
+            shard: Only reset the campaigns of this ``(index, count)`` shard
+            
         Returns:
             Dictionary with reset results
         """
-        logger.info("Starting monthly spend reset")
+        logger.info(f"Starting {period} spend reset")
         
         results = {
             'reset': 0,
@@ -216,38 +660,18 @@ class SpendingService:
         }
         
         try:
-            with transaction.atomic():
-                # Reset monthly spends for all campaigns
-                campaigns = Campaign.objects.all()
-                
-                for campaign in campaigns:
-                    try:
-                        campaign.reset_monthly_spend()
-                        results['reset'] += 1
-                    except Exception as e:
-                        logger.error(f"Error resetting monthly spend for campaign {campaign.id}: {e}")
-                        results['errors'] += 1
-                
-                # Reactivate campaigns that were paused due to monthly budget
-                paused_campaigns = Campaign.objects.filter(
-                    status=CampaignStatus.PAUSED,
-                    pause_reason=PauseReason.MONTHLY_BUDGET_EXCEEDED
-                )
-                
-                for campaign in paused_campaigns:
-                    try:
-                        if campaign.can_be_activated():
-                            campaign.activate()
-                            results['reactivated'] += 1
-                            logger.info(f"Reactivated campaign {campaign.id} after monthly reset")
-                    except Exception as e:
-                        logger.error(f"Error reactivating campaign {campaign.id}: {e}")
-                        results['errors'] += 1
+            if settings.SPEND_COUNTERS_EAGER_RESET:
+                results['reset'] = Campaign.reset_spend_counters(period, shard=shard)
             
-            logger.info(f"Monthly spend reset completed: {results}")
+            reactivated = Campaign.reactivate_paused(pause_reason, shard=shard)
+            results['reactivated'] = len(reactivated)
+            for campaign_id in reactivated:
+                logger.info(f"Reactivated campaign {campaign_id} after {period} reset")
+            
+            logger.info(f"{period.capitalize()} spend reset completed: {results}")
             
         except Exception as e:
-            logger.error(f"Error during monthly spend reset: {e}")
+            logger.error(f"Error during {period} spend reset: {e}")
             results['errors'] += 1
         
         return results
@@ -262,7 +686,7 @@ class SpendingService:
         Returns:
             Dictionary with spending summary
         """
-        today = timezone.now().date()
+        today = campaign.local_date()
         current_month = today.month
         current_year = today.year
         
@@ -282,9 +706,14 @@ class SpendingService:
             'daily_percentage': float((daily_spend / campaign.brand.daily_budget) * 100),
             'monthly_percentage': float((monthly_spend / campaign.brand.monthly_budget) * 100),
             'status': campaign.status,
-            'pause_reason': campaign.pause_reason
+            'pause_reason': campaign.pause_reason,
+            'projected_exhaustion_at': None
         }
         
+        projection = (self.pacing or PacingEngine()).project_exhaustion(campaign)
+        if projection is not None:
+            summary['projected_exhaustion_at'] = projection[0].isoformat()
+        
         return summary
     
     def get_brand_spending_summary(self, brand_id: str) -> Dict[str, Any]:
@@ -304,10 +733,6 @@ class SpendingService:
         except Brand.DoesNotExist:
             raise ValueError(f"Brand with ID {brand_id} does not exist")
         
-        today = timezone.now().date()
-        current_month = today.month
-        current_year = today.year
-        
         daily_spend = Spend.get_daily_spend_for_brand(brand.id)
         monthly_spend = Spend.get_monthly_spend_for_brand(brand.id)
         
@@ -2,14 +2,18 @@
 Unit tests for spending app.
 """
 
+import importlib.util
+import uuid
 from decimal import Decimal
-from datetime import date, datetime
-from django.test import TestCase
+from typing import Any, List, Optional
+from datetime import date, datetime, timedelta
+from unittest import skipUnless
+from django.test import TestCase, override_settings
 from django.core.exceptions import ValidationError
-from .models import Spend, SpendType
+from .models import Spend, SpendDailyRollup, SpendType
 from .services import SpendingService
 from brands.models import Brand
-from campaigns.models import Campaign, CampaignStatus
+from campaigns.models import PAUSE_FLAGS, Campaign, CampaignStatus, PauseReason
 
 
 class SpendModelTest(TestCase):
@@ -308,3 +312,1142 @@ class SpendingServiceTest(TestCase):
         self.assertEqual(summary['daily_budget'], 100.0)
         self.assertEqual(summary['monthly_budget'], 1000.0)
         self.assertEqual(summary['status'], CampaignStatus.ACTIVE)
+
+
+class SpendingServiceEnforcementTest(TestCase):
+    """Test cases for set-based budget enforcement."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.service = SpendingService()
+
+    def make_campaigns(self, count: int, daily_spend: str = '0.00', monthly_spend: str = '0.00', **kwargs: Any) -> List[Campaign]:
+        start = Campaign.objects.count()
+        return Campaign.objects.bulk_create([
+            Campaign(
+                brand=self.brand,
+                name=f"Campaign {start + index}",
+                daily_spend=Decimal(daily_spend),
+                monthly_spend=Decimal(monthly_spend),
+                **kwargs
+            )
+            for index in range(count)
+        ])
+
+    def test_enforce_counts_and_precedence(self) -> None:
+        """Test that daily limits win over monthly limits and counters match."""
+        under = self.make_campaigns(2, '10.00', '10.00')
+        over_daily = self.make_campaigns(1, '100.00', '100.00')
+        over_both = self.make_campaigns(1, '150.00', '1500.00')
+        over_monthly = self.make_campaigns(2, '10.00', '1000.00')
+        self.make_campaigns(1, '500.00', '5000.00', status=CampaignStatus.PAUSED)
+
+        results = self.service.enforce_budget_limits()
+
+        self.assertEqual(results, {'checked': 6, 'paused_daily': 2, 'paused_monthly': 2, 'errors': 0})
+        for campaign in over_daily + over_both:
+            campaign.refresh_from_db()
+            self.assertEqual(campaign.pause_reason, PauseReason.DAILY_BUDGET_EXCEEDED)
+            self.assertIsNotNone(campaign.paused_at)
+        for campaign in over_monthly:
+            campaign.refresh_from_db()
+            self.assertEqual(campaign.pause_reason, PauseReason.MONTHLY_BUDGET_EXCEEDED)
+        for campaign in under:
+            campaign.refresh_from_db()
+            self.assertEqual(campaign.status, CampaignStatus.ACTIVE)
+
+    def test_enforce_query_count_independent_of_campaigns(self) -> None:
+        """Test that enforcement issues a fixed number of queries."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.make_campaigns(5, '200.00', '200.00')
+        with CaptureQueriesContext(connection) as small:
+            self.service.enforce_budget_limits()
+
+        self.make_campaigns(50, '200.00', '200.00')
+        with CaptureQueriesContext(connection) as large:
+            self.service.enforce_budget_limits()
+
+        self.assertEqual(len(small), len(large))
+
+
+class SpendingServiceResetTest(TestCase):
+    """Test cases for set-based spend resets and reactivation."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        from scheduling.models import Schedule
+        from datetime import time
+
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.service = SpendingService()
+        self.campaigns = []
+        for index in range(5):
+            campaign = Campaign.objects.create(
+                brand=self.brand,
+                name=f"Campaign {index}",
+                status=CampaignStatus.PAUSED,
+                pause_reason=PauseReason.DAILY_BUDGET_EXCEEDED,
+                daily_spend=Decimal('120.00'),
+                monthly_spend=Decimal('500.00')
+            )
+            self.campaigns.append(campaign)
+            if index != 4:
+                for day in range(7):
+                    Schedule.objects.create(
+                        campaign=campaign, day_of_week=day, start_time=time(0, 0), end_time=time(23, 59, 59)
+                    )
+
+    def test_daily_reset_reactivates_in_chunks(self) -> None:
+        """Test that the reset zeroes counters and reactivates only eligible campaigns."""
+        over_monthly = self.campaigns[3]
+        over_monthly.monthly_spend = Decimal('1000.00')
+        over_monthly.save()
+        Campaign.objects.filter(pk=self.campaigns[2].pk).update(
+            pause_reason=PauseReason.MONTHLY_BUDGET_EXCEEDED,
+            pause_flags=PAUSE_FLAGS[PauseReason.MONTHLY_BUDGET_EXCEEDED]
+        )
+
+        with self.assertLogs('spending.services', level='INFO') as logs:
+            results = self.service.reset_daily_spends()
+
+        self.assertEqual(results, {'reset': 5, 'reactivated': 2, 'errors': 0})
+        self.assertEqual(len([line for line in logs.output if 'Reactivated campaign' in line]), 2)
+
+        statuses = {c.pk: c.status for c in Campaign.objects.all()}
+        self.assertEqual(statuses[self.campaigns[0].pk], CampaignStatus.ACTIVE)
+        self.assertEqual(statuses[self.campaigns[1].pk], CampaignStatus.ACTIVE)
+        # Paused for another reason, over the monthly budget, or without a schedule
+        self.assertEqual(statuses[self.campaigns[2].pk], CampaignStatus.PAUSED)
+        self.assertEqual(statuses[self.campaigns[3].pk], CampaignStatus.PAUSED)
+        self.assertEqual(statuses[self.campaigns[4].pk], CampaignStatus.PAUSED)
+        self.assertFalse(Campaign.objects.exclude(daily_spend=Decimal('0.00')).exists())
+
+    def test_reactivate_paused_chunks(self) -> None:
+        """Test that small chunks still reactivate every eligible campaign once."""
+        Campaign.reset_spend_counters('daily')
+
+        reactivated = Campaign.reactivate_paused(PauseReason.DAILY_BUDGET_EXCEEDED, chunk_size=1)
+
+        self.assertEqual(len(reactivated), 4)
+        self.assertEqual(len(set(reactivated)), 4)
+
+    def test_monthly_reset(self) -> None:
+        """Test that the monthly reset zeroes monthly counters only."""
+        results = self.service.reset_monthly_spends()
+
+        self.assertEqual(results['reset'], 5)
+        self.assertEqual(results['reactivated'], 0)
+        self.assertFalse(Campaign.objects.exclude(monthly_spend=Decimal('0.00')).exists())
+        self.assertFalse(Campaign.objects.filter(daily_spend=Decimal('0.00')).exists())
+
+
+class SpendingServiceTimezoneResetTest(TestCase):
+    """Test cases for per-timezone bucketed spend resets."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        from scheduling.services import SchedulingService
+
+        self.service = SpendingService()
+        self.campaigns = {}
+        for tz in ('UTC', 'Asia/Tokyo'):
+            brand = Brand.objects.create(
+                name=f"Brand {tz}",
+                daily_budget=Decimal('100.00'),
+                monthly_budget=Decimal('1000.00'),
+                timezone=tz
+            )
+            campaign = Campaign.objects.create(
+                brand=brand,
+                name=f"Campaign {tz}",
+                status=CampaignStatus.PAUSED,
+                pause_reason=PauseReason.DAILY_BUDGET_EXCEEDED,
+                daily_spend=Decimal('120.00'),
+                monthly_spend=Decimal('500.00')
+            )
+            SchedulingService().create_default_schedule(campaign)
+            self.campaigns[tz] = campaign
+
+    def _daily_spend(self, tz: str) -> Decimal:
+        daily_spend: Decimal = Campaign.objects.get(pk=self.campaigns[tz].pk).daily_spend
+        return daily_spend
+
+    def test_each_timezone_resets_at_its_own_midnight(self) -> None:
+        """Test that only buckets whose local day rolled over are reset, once."""
+        from datetime import timezone as dt_timezone
+
+        # 12:00 UTC is 21:00 in Tokyo: the first run only records watermarks
+        first = self.service.reset_due_periods(datetime(2024, 1, 10, 12, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(first['buckets'], 0)
+        self.assertEqual(self._daily_spend('Asia/Tokyo'), Decimal('120.00'))
+
+        # 16:00 UTC is 01:00 the next day in Tokyo
+        tokyo_midnight = datetime(2024, 1, 10, 16, 0, tzinfo=dt_timezone.utc)
+        results = self.service.reset_due_periods(tokyo_midnight)
+        self.assertEqual(results['buckets'], 1)
+        self.assertEqual(results['daily_reset'], 1)
+        self.assertEqual(results['monthly_reset'], 0)
+        self.assertEqual(self._daily_spend('Asia/Tokyo'), Decimal('0.00'))
+        self.assertEqual(self._daily_spend('UTC'), Decimal('120.00'))
+        self.assertEqual(results['reactivated'], 1)
+        self.assertTrue(Campaign.objects.get(pk=self.campaigns['Asia/Tokyo'].pk).is_active())
+
+        # Running again in the same local day does nothing
+        self.assertEqual(self.service.reset_due_periods(tokyo_midnight)['buckets'], 0)
+
+        # UTC rolls over eight hours later
+        results = self.service.reset_due_periods(datetime(2024, 1, 11, 0, 5, tzinfo=dt_timezone.utc))
+        self.assertEqual(results['daily_reset'], 1)
+        self.assertEqual(self._daily_spend('UTC'), Decimal('0.00'))
+
+    def test_default_spend_date_is_brand_local(self) -> None:
+        """Test that spends default to the brand's local date."""
+        campaign = self.campaigns['Asia/Tokyo']
+
+        spend = self.service.track_spend(campaign, Decimal('1.00'))
+        bulk = self.service.track_spends_bulk([{'campaign_id': campaign.pk, 'amount': '1.00'}])
+
+        self.assertEqual(spend.spend_date, campaign.brand.local_date())
+        self.assertEqual(bulk[0].spend_date, campaign.brand.local_date())
+
+    def test_spending_summary_uses_brand_local_date(self) -> None:
+        """Test that the summary counts spends of the brand's local day."""
+        from datetime import timezone as dt_timezone
+        from unittest import mock
+
+        campaign = self.campaigns['Asia/Tokyo']
+        # 16:00 UTC on the 10th is already the 11th in Tokyo
+        with mock.patch('django.utils.timezone.now', return_value=datetime(2024, 1, 10, 16, 0, tzinfo=dt_timezone.utc)):
+            self.service.track_spend(campaign, Decimal('3.00'))
+            summary = self.service.get_spending_summary(campaign)
+
+        self.assertEqual(summary['daily_spend'], 3.0)
+
+
+class BrandBudgetEnforcementTest(TestCase):
+    """Test cases for enforcing budgets on a brand's total spend."""
+
+    def setUp(self) -> None:
+        """Set up a brand enforcing its total with two campaigns."""
+        from brands.models import BudgetEnforcement
+
+        self.brand = Brand.objects.create(
+            name="Brand Total",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00'),
+            budget_enforcement=BudgetEnforcement.BRAND
+        )
+        self.first = Campaign.objects.create(brand=self.brand, name="First")
+        self.second = Campaign.objects.create(brand=self.brand, name="Second")
+        self.service = SpendingService()
+
+    def test_brand_total_pauses_every_campaign(self) -> None:
+        """Test that crossing the brand budget pauses all of the brand's campaigns."""
+        self.service.track_spend(self.first, Decimal('60.00'))
+        self.second.refresh_from_db()
+        self.assertTrue(self.second.is_active())
+
+        self.service.track_spend(self.second, Decimal('40.00'))
+
+        for campaign in Campaign.objects.all():
+            self.assertTrue(campaign.is_paused())
+            self.assertEqual(campaign.pause_reason, PauseReason.DAILY_BUDGET_EXCEEDED)
+        self.assertTrue(self.second.is_paused())
+        self.assertFalse(self.second.can_be_activated())
+
+    def test_check_reports_brand_action(self) -> None:
+        """Test the budget check result of a brand over its budget."""
+        Campaign.add_spends_bulk({self.first.pk: Decimal('70.00'), self.second.pk: Decimal('30.00')})
+
+        results = self.service.check_budget_limits(self.first)
+
+        self.assertTrue(results['daily_exceeded'])
+        self.assertFalse(results['monthly_exceeded'])
+        self.assertEqual(results['action_taken'], 'paused_brand_daily')
+
+    def test_stats_api_checks_brand_total(self) -> None:
+        """Test that the stats endpoint reports activation against the brand total too."""
+        import json
+        from django.test import RequestFactory
+        from campaigns.views import campaign_stats_api
+        from scheduling.services import SchedulingService
+
+        SchedulingService().create_default_schedule(self.second)
+        Campaign.add_spends_bulk({self.first.pk: Decimal('70.00'), self.second.pk: Decimal('30.00')})
+
+        response = campaign_stats_api(RequestFactory().get('/'), str(self.second.pk))
+
+        self.assertFalse(json.loads(response.content)['can_be_activated'])
+        self.assertFalse(self.second.can_be_activated())
+
+    def test_campaign_mode_ignores_total(self) -> None:
+        """Test that per-campaign brands compare each campaign's own spend."""
+        from brands.models import BudgetEnforcement
+
+        Brand.objects.filter(pk=self.brand.pk).update(budget_enforcement=BudgetEnforcement.CAMPAIGN)
+        Campaign.add_spends_bulk({self.first.pk: Decimal('70.00'), self.second.pk: Decimal('30.00')})
+
+        results = SpendingService().enforce_budget_limits()
+
+        self.assertEqual(results, {'checked': 2, 'paused_daily': 0, 'paused_monthly': 0, 'errors': 0})
+
+    def test_enforcement_and_reactivation(self) -> None:
+        """Test set-based enforcement and that reactivation waits for the brand total."""
+        from datetime import time
+        from scheduling.models import Schedule
+
+        for campaign in (self.first, self.second):
+            for day in range(7):
+                Schedule.objects.create(
+                    campaign=campaign, day_of_week=day, start_time=time(0, 0), end_time=time(23, 59, 59)
+                )
+        Campaign.add_spends_bulk({self.first.pk: Decimal('70.00'), self.second.pk: Decimal('30.00')})
+
+        results = self.service.enforce_budget_limits()
+        self.assertEqual(results, {'checked': 2, 'paused_daily': 2, 'paused_monthly': 0, 'errors': 0})
+
+        self.assertEqual(Campaign.reactivate_paused(PauseReason.DAILY_BUDGET_EXCEEDED), [])
+
+        Campaign.reset_spend_counters('daily')
+        self.assertEqual(self.brand.get_total_daily_spend(), Decimal('0.00'))
+        self.assertEqual(len(Campaign.reactivate_paused(PauseReason.DAILY_BUDGET_EXCEEDED)), 2)
+
+
+@override_settings(SPEND_COUNTERS_EAGER_RESET=False)
+class LazySpendCounterTest(TestCase):
+    """Test cases for period-stamped spend counters that roll over lazily."""
+
+    def setUp(self) -> None:
+        """Set up a campaign whose daily counter belongs to yesterday."""
+        from scheduling.services import SchedulingService
+
+        self.service = SpendingService()
+        self.brand = Brand.objects.create(
+            name="Lazy Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00'),
+            timezone='Asia/Tokyo'
+        )
+        self.today = self.brand.local_date()
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Lazy Campaign",
+            status=CampaignStatus.PAUSED,
+            pause_reason=PauseReason.DAILY_BUDGET_EXCEEDED,
+            daily_spend=Decimal('120.00'),
+            daily_period=self.today - timedelta(days=1),
+            monthly_spend=Decimal('500.00'),
+            monthly_period=self.today.replace(day=1)
+        )
+        SchedulingService().create_default_schedule(self.campaign)
+
+    def test_stale_counter_reads_as_zero(self) -> None:
+        """Test that a counter from an earlier day reads as zero."""
+        self.assertEqual(self.campaign.get_daily_spend(), Decimal('0.00'))
+        self.assertEqual(self.campaign.get_monthly_spend(), Decimal('500.00'))
+        self.assertEqual(self.campaign.get_remaining_daily_budget(), Decimal('100.00'))
+        self.assertTrue(self.campaign.can_be_activated())
+
+    def test_next_spend_rolls_counter_over(self) -> None:
+        """Test that the next spend restarts a stale counter and stamps the period."""
+        self.campaign.activate()
+        self.service.track_spend(self.campaign, Decimal('10.00'))
+
+        campaign = Campaign.objects.get(pk=self.campaign.pk)
+        self.assertEqual(campaign.daily_spend, Decimal('10.00'))
+        self.assertEqual(campaign.daily_period, self.today)
+        self.assertEqual(campaign.monthly_spend, Decimal('510.00'))
+        self.assertTrue(campaign.is_active())
+
+    def test_bulk_spends_roll_counters_over(self) -> None:
+        """Test that bulk tracking rolls stale counters over per campaign."""
+        current = Campaign.objects.create(
+            brand=self.brand,
+            name="Current Campaign",
+            daily_spend=Decimal('20.00'),
+            daily_period=self.today
+        )
+
+        self.service.track_spends_bulk([
+            {'campaign_id': self.campaign.pk, 'amount': '5.00'},
+            {'campaign_id': current.pk, 'amount': '5.00'},
+        ])
+
+        stale = Campaign.objects.get(pk=self.campaign.pk)
+        self.assertEqual(stale.daily_spend, Decimal('5.00'))
+        self.assertEqual(stale.daily_period, self.today)
+        current.refresh_from_db()
+        self.assertEqual(current.daily_spend, Decimal('25.00'))
+        self.assertEqual(current.monthly_period, self.today.replace(day=1))
+
+    def test_reset_only_reactivates(self) -> None:
+        """Test that the daily reset leaves counters alone and reactivates budget pauses."""
+        untouched = Campaign.objects.create(
+            brand=self.brand,
+            name="Current Campaign",
+            daily_spend=Decimal('20.00'),
+            daily_period=self.today
+        )
+
+        results = self.service.reset_daily_spends()
+
+        self.assertEqual(results, {'reset': 0, 'reactivated': 1, 'errors': 0})
+        self.assertTrue(Campaign.objects.get(pk=self.campaign.pk).is_active())
+        self.assertEqual(Campaign.objects.get(pk=self.campaign.pk).daily_spend, Decimal('120.00'))
+        self.assertEqual(Campaign.objects.get(pk=untouched.pk).daily_spend, Decimal('20.00'))
+
+    def test_enforcement_ignores_stale_counters(self) -> None:
+        """Test that a stale counter over budget does not pause a campaign."""
+        Campaign.objects.filter(pk=self.campaign.pk).update(status=CampaignStatus.ACTIVE, pause_reason=None)
+        over_today = Campaign.objects.create(
+            brand=self.brand,
+            name="Over Budget Campaign",
+            daily_spend=Decimal('150.00'),
+            daily_period=self.today
+        )
+
+        results = self.service.enforce_budget_limits()
+
+        self.assertEqual(results['paused_daily'], 1)
+        self.assertTrue(Campaign.objects.get(pk=self.campaign.pk).is_active())
+        self.assertTrue(Campaign.objects.get(pk=over_today.pk).is_paused())
+
+
+class SpendingServiceBulkTest(TestCase):
+    """Test cases for SpendingService.track_spends_bulk."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            status=CampaignStatus.ACTIVE
+        )
+        self.campaign2 = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign 2",
+            status=CampaignStatus.ACTIVE
+        )
+        self.service = SpendingService()
+
+    def test_track_spends_bulk_updates_counters(self) -> None:
+        """Test that bulk tracking creates spends and aggregates counters per campaign."""
+        spends = self.service.track_spends_bulk([
+            {'campaign_id': self.campaign.id, 'amount': Decimal('10.00')},
+            {'campaign_id': str(self.campaign.id), 'amount': '5.50', 'description': "Exchange A"},
+            {'campaign_id': self.campaign2.id, 'amount': Decimal('20.00'), 'spend_date': date(2024, 1, 15)},
+        ])
+
+        self.assertEqual(len(spends), 3)
+        self.assertEqual(Spend.objects.filter(campaign=self.campaign).count(), 2)
+        self.assertEqual(Spend.objects.get(campaign=self.campaign2).spend_date, date(2024, 1, 15))
+
+        self.campaign.refresh_from_db()
+        self.campaign2.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('15.50'))
+        self.assertEqual(self.campaign.monthly_spend, Decimal('15.50'))
+        self.assertEqual(self.campaign2.daily_spend, Decimal('20.00'))
+
+    def test_track_spends_bulk_checks_budgets_once(self) -> None:
+        """Test that a campaign crossing its budget in a batch is paused."""
+        self.service.track_spends_bulk([
+            {'campaign_id': self.campaign.id, 'amount': Decimal('60.00')},
+            {'campaign_id': self.campaign.id, 'amount': Decimal('60.00')},
+            {'campaign_id': self.campaign2.id, 'amount': Decimal('10.00')},
+        ])
+
+        self.campaign.refresh_from_db()
+        self.campaign2.refresh_from_db()
+        self.assertEqual(self.campaign.status, CampaignStatus.PAUSED)
+        self.assertEqual(self.campaign2.status, CampaignStatus.ACTIVE)
+
+    def test_track_spends_bulk_rejects_unknown_campaign(self) -> None:
+        """Test that an unknown campaign rolls back the whole batch."""
+        import uuid
+
+        with self.assertRaises(ValueError):
+            self.service.track_spends_bulk([
+                {'campaign_id': self.campaign.id, 'amount': Decimal('10.00')},
+                {'campaign_id': uuid.uuid4(), 'amount': Decimal('10.00')},
+            ])
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('0.00'))
+        self.assertEqual(Spend.objects.count(), 0)
+
+    def test_track_spends_bulk_rejects_non_positive_amount(self) -> None:
+        """Test that non-positive amounts are rejected."""
+        with self.assertRaises(ValueError):
+            self.service.track_spends_bulk([
+                {'campaign_id': self.campaign.id, 'amount': Decimal('0.00')},
+            ])
+
+    def test_track_spends_bulk_query_count(self) -> None:
+        """Test that the number of queries does not grow with the number of spends."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def track(count: int) -> int:
+            entries = [
+                {'campaign_id': self.campaign.id, 'amount': Decimal('0.01')}
+                for _ in range(count)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                self.service.track_spends_bulk(entries)
+            return len(context.captured_queries)
+
+        self.assertEqual(track(10), track(100))
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('1.10'))
+
+
+class SpendingServiceIdempotencyTest(TestCase):
+    """Test cases for idempotent spend ingestion with external IDs."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            status=CampaignStatus.ACTIVE
+        )
+        self.service = SpendingService()
+
+    def test_track_spend_skips_redelivery(self) -> None:
+        """Test that a redelivered spend is returned without counting it again."""
+        first = self.service.track_spend(self.campaign, Decimal('10.00'), external_id='evt-1')
+        second = self.service.track_spend(self.campaign, Decimal('10.00'), external_id='evt-1')
+
+        self.assertFalse(first.duplicate)
+        self.assertTrue(second.duplicate)
+        self.assertEqual(second.id, first.id)
+        self.assertEqual(Spend.objects.count(), 1)
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('10.00'))
+        self.assertEqual(self.campaign.monthly_spend, Decimal('10.00'))
+
+    def test_track_spends_bulk_skips_redeliveries(self) -> None:
+        """Test that bulk ingestion only counts rows that were inserted."""
+        self.service.track_spend(self.campaign, Decimal('5.00'), external_id='evt-1')
+
+        created = self.service.track_spends_bulk([
+            {'campaign_id': self.campaign.id, 'amount': '5.00', 'external_id': 'evt-1'},
+            {'campaign_id': self.campaign.id, 'amount': '7.00', 'external_id': 'evt-2'},
+            {'campaign_id': self.campaign.id, 'amount': '7.00', 'external_id': 'evt-2'},
+            {'campaign_id': self.campaign.id, 'amount': '1.00'},
+        ])
+
+        self.assertEqual(sorted(spend.amount for spend in created), [Decimal('1.00'), Decimal('7.00')])
+        self.assertEqual(Spend.objects.count(), 3)
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('13.00'))
+
+    def test_client_spend_id_is_kept(self) -> None:
+        """Test that a keyed spend keeps its client-supplied ID, and a retry with it is skipped."""
+        spend_id = uuid.uuid4()
+        entry = {'id': spend_id, 'campaign_id': self.campaign.id, 'amount': '5.00', 'external_id': 'evt-1'}
+
+        created = self.service.track_spends_bulk([entry])
+        retried = self.service.track_spends_bulk([entry])
+
+        self.assertEqual([spend.id for spend in created], [spend_id])
+        self.assertEqual(retried, [])
+        self.assertEqual(Spend.objects.get().id, spend_id)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('5.00'))
+
+    def test_redelivery_on_a_later_date_is_skipped(self) -> None:
+        """Test that a key stays unique across spend dates, e.g. a retry after midnight."""
+        from datetime import timedelta
+
+        today = self.campaign.local_date()
+        first = self.service.track_spend(self.campaign, Decimal('10.00'), spend_date=today, external_id='evt-1')
+        retry = self.service.track_spend(
+            self.campaign, Decimal('10.00'), spend_date=today + timedelta(days=1), external_id='evt-1'
+        )
+        created = self.service.track_spends_bulk([
+            {'campaign_id': self.campaign.id, 'amount': '10.00',
+             'spend_date': today + timedelta(days=2), 'external_id': 'evt-1'},
+        ])
+
+        self.assertTrue(retry.duplicate)
+        self.assertEqual(retry.id, first.id)
+        self.assertEqual(created, [])
+        self.assertEqual(Spend.objects.count(), 1)
+
+        # Deleting the spend releases its key
+        first.delete()
+        self.assertFalse(self.service.track_spend(self.campaign, Decimal('10.00'), external_id='evt-1').duplicate)
+
+    def test_duplicates_skip_without_pre_check_query(self) -> None:
+        """Test that a redelivery costs the same queries as a fresh spend."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        entries = [{'campaign_id': self.campaign.id, 'amount': '1.00', 'external_id': f'evt-{i}'} for i in range(5)]
+
+        with CaptureQueriesContext(connection) as fresh:
+            self.service.track_spends_bulk(entries)
+        with CaptureQueriesContext(connection) as redelivered:
+            self.assertEqual(self.service.track_spends_bulk(entries), [])
+
+        self.assertLessEqual(len(redelivered), len(fresh))
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('5.00'))
+
+
+class SpendImportTest(TestCase):
+    """Test cases for the streaming spend importer."""
+
+    def setUp(self) -> None:
+        """Set up test data and a scratch directory."""
+        import tempfile
+
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            status=CampaignStatus.ACTIVE
+        )
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name: str, content: str) -> str:
+        import os
+
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w') as fh:
+            fh.write(content)
+        return path
+
+    def ndjson(self, count: int, spend_date: date) -> str:
+        import json
+
+        return ''.join(
+            json.dumps({'campaign_id': str(self.campaign.id), 'amount': '1.00', 'spend_date': spend_date.isoformat()}) + '\n'
+            for _ in range(count)
+        )
+
+    def test_import_ndjson_recomputes_counters(self) -> None:
+        """Test that an NDJSON import inserts rows and recomputes campaign totals."""
+        from django.core.management import call_command
+        from io import StringIO
+
+        today = date.today()
+        path = self.write('spends.ndjson', self.ndjson(5, today) + '{"amount": "1.00"}\n')
+        out = StringIO()
+
+        call_command('import_spends', path, '--chunk-size', '2', stdout=out)
+
+        self.assertEqual(Spend.objects.count(), 5)
+        self.assertIn('rows/sec', out.getvalue())
+        self.assertIn('1 invalid rows', out.getvalue())
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('5.00'))
+        self.assertEqual(self.campaign.monthly_spend, Decimal('5.00'))
+        self.assertEqual(SpendDailyRollup.objects.get(campaign=self.campaign).spend_count, 5)
+
+    def test_import_csv_skips_unknown_campaigns(self) -> None:
+        """Test CSV import with quoted fields and rows for unknown campaigns."""
+        from .importer import SpendImporter
+        import uuid
+
+        path = self.write('spends.csv', (
+            "campaign_id,amount,spend_date,description,external_id\n"
+            f"{self.campaign.id},2.50,2024-01-15,\"Exchange A, EU\",evt-1\n"
+            f"{uuid.uuid4()},3.00,2024-01-15,,evt-2\n"
+        ))
+
+        results = SpendImporter(path).run()
+
+        self.assertEqual(results['inserted'], 1)
+        self.assertEqual(results['skipped'], 1)
+        spend = Spend.objects.get()
+        self.assertEqual(spend.description, "Exchange A, EU")
+        self.assertEqual(spend.external_id, 'evt-1')
+        self.assertEqual(spend.spend_date, date(2024, 1, 15))
+
+    def test_import_resumes_after_interruption(self) -> None:
+        """Test that an interrupted import resumes without double counting."""
+        from unittest import mock
+        from .importer import SpendImporter
+
+        path = self.write('spends.ndjson', self.ndjson(10, date.today()))
+        importer = SpendImporter(path, chunk_size=3)
+        original_load = importer._load
+        calls = {'count': 0}
+
+        def flaky_load(spends: list) -> tuple:
+            calls['count'] += 1
+            if calls['count'] == 3:
+                raise RuntimeError("connection lost")
+            return original_load(spends)
+
+        with mock.patch.object(importer, '_load', side_effect=flaky_load):
+            with self.assertRaises(RuntimeError):
+                importer.run()
+        self.assertEqual(Spend.objects.count(), 6)
+
+        results = SpendImporter(path, chunk_size=3).run()
+
+        self.assertEqual(results['resumed_from'], 6)
+        self.assertEqual(results['rows'], 10)
+        self.assertEqual(Spend.objects.count(), 10)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('10.00'))
+
+    def test_reimport_is_idempotent(self) -> None:
+        """Test that importing the same file twice does not add rows."""
+        from .importer import SpendImporter
+
+        path = self.write('spends.ndjson', self.ndjson(4, date.today()))
+        SpendImporter(path).run()
+        results = SpendImporter(path).run()
+
+        self.assertEqual(results['inserted'], 0)
+        self.assertEqual(results['skipped'], 4)
+        self.assertEqual(Spend.objects.count(), 4)
+
+
+class SpendPartitionsTest(TestCase):
+    """Test cases for spends partition helpers."""
+
+    def test_month_bounds(self) -> None:
+        """Test half-open month ranges, including the year rollover."""
+        from .partitions import month_bounds
+
+        self.assertEqual(month_bounds(2024, 2), (date(2024, 2, 1), date(2024, 3, 1)))
+        self.assertEqual(month_bounds(2024, 12), (date(2024, 12, 1), date(2025, 1, 1)))
+
+    def test_add_months_and_partition_name(self) -> None:
+        """Test month arithmetic and partition naming."""
+        from .partitions import add_months, partition_name
+
+        self.assertEqual(add_months(date(2024, 1, 1), -1), date(2023, 12, 1))
+        self.assertEqual(add_months(date(2024, 11, 1), 3), date(2025, 2, 1))
+        self.assertEqual(partition_name(date(2025, 2, 1)), 'spends_2025_02')
+
+    def test_monthly_query_uses_date_range(self) -> None:
+        """Test that month filters compare spend_date directly so partitions can be pruned."""
+        from .partitions import month_bounds
+
+        start, end = month_bounds(2024, 1)
+        sql = str(Spend.objects.filter(spend_date__gte=start, spend_date__lt=end).query)
+        self.assertNotIn('strftime', sql.lower())
+        self.assertNotIn('extract', sql.lower())
+
+    def test_maintenance_is_noop_without_partitioning(self) -> None:
+        """Test that partition maintenance does nothing on unpartitioned databases."""
+        from django.core.management import call_command
+        from io import StringIO
+        from . import partitions
+
+        if partitions.is_partitioned():
+            self.skipTest("spends is partitioned on this database")
+
+        self.assertEqual(partitions.ensure_partitions(), [])
+        self.assertEqual(partitions.detach_old_partitions(), [])
+
+        out = StringIO()
+        call_command('manage_partitions', stdout=out)
+        self.assertIn('not partitioned', out.getvalue())
+
+
+class SpendDailyRollupTest(TestCase):
+    """Test cases for the incrementally maintained daily spend rollup."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('1000.00'),
+            monthly_budget=Decimal('10000.00')
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            status=CampaignStatus.ACTIVE
+        )
+        self.service = SpendingService()
+        self.today = date.today()
+
+    def rollup(self, spend_date: date, spend_type: str = SpendType.DAILY) -> SpendDailyRollup:
+        return SpendDailyRollup.objects.get(campaign=self.campaign, spend_date=spend_date, spend_type=spend_type)
+
+    def test_single_and_bulk_ingestion_increment_rollup(self) -> None:
+        """Test that every ingestion path adds to the same rollup row."""
+        self.service.track_spend(self.campaign, Decimal('10.00'))
+        self.service.track_spend(self.campaign, Decimal('2.00'), external_id='evt-1')
+        self.service.track_spend(self.campaign, Decimal('2.00'), external_id='evt-1')
+        self.service.track_spends_bulk([
+            {'campaign_id': self.campaign.id, 'amount': '3.00'},
+            {'campaign_id': self.campaign.id, 'amount': '4.00', 'spend_type': SpendType.MONTHLY},
+        ])
+
+        daily = self.rollup(self.today)
+        self.assertEqual(daily.amount, Decimal('15.00'))
+        self.assertEqual(daily.spend_count, 3)
+        self.assertEqual(self.rollup(self.today, SpendType.MONTHLY).amount, Decimal('4.00'))
+
+    def test_update_and_delete_adjust_rollup(self) -> None:
+        """Test that editing and deleting spends keep the rollup exact."""
+        yesterday = self.today - timedelta(days=1)
+        spend = self.service.track_spend(self.campaign, Decimal('10.00'))
+
+        spend.spend_date = yesterday
+        spend.amount = Decimal('6.00')
+        spend.save()
+        self.assertEqual(self.rollup(self.today).spend_count, 0)
+        self.assertEqual(self.rollup(yesterday).amount, Decimal('6.00'))
+
+        spend.delete()
+        self.assertEqual(self.rollup(yesterday).amount, Decimal('0.00'))
+        self.assertEqual(self.rollup(yesterday).spend_count, 0)
+
+    def test_rollup_reads_replace_raw_aggregates(self) -> None:
+        """Test that campaign spend lookups read the rollup instead of raw spends."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.service.track_spends_bulk([{'campaign_id': self.campaign.id, 'amount': '1.25'}] * 4)
+
+        with CaptureQueriesContext(connection) as context:
+            daily = Spend.get_daily_spend_for_campaign(self.campaign, self.today)
+            monthly = Spend.get_monthly_spend_for_campaign(self.campaign, self.today.year, self.today.month)
+
+        self.assertEqual(daily, Decimal('5.00'))
+        self.assertEqual(monthly, Decimal('0.00'))
+        self.assertFalse(any('"spends"' in query['sql'] for query in context.captured_queries))
+
+    def test_rebuild_matches_raw_spends(self) -> None:
+        """Test that rebuilding recomputes rollups from the spends table."""
+        from django.core.management import call_command
+        from io import StringIO
+
+        self.service.track_spends_bulk([{'campaign_id': self.campaign.id, 'amount': '2.00'}] * 3)
+        SpendDailyRollup.objects.update(amount=Decimal('999.00'), spend_count=99)
+
+        call_command('rebuild_spend_rollups', stdout=StringIO())
+
+        self.assertEqual(self.rollup(self.today).amount, Decimal('6.00'))
+        self.assertEqual(self.rollup(self.today).spend_count, 3)
+
+    def test_stats_api_uses_rollup(self) -> None:
+        """Test that the stats endpoint reports totals from the rollup."""
+        import json
+        from django.test import RequestFactory
+        from .views import spending_stats_api
+
+        self.service.track_spends_bulk([{'campaign_id': self.campaign.id, 'amount': '2.50'}] * 2)
+
+        stats = json.loads(spending_stats_api(RequestFactory().get('/')).content)
+
+        self.assertEqual(stats['total_spends'], 2)
+        self.assertEqual(stats['today_amount'], 5.0)
+        self.assertEqual(stats['today_count'], 2)
+
+
+@skipUnless(importlib.util.find_spec('fakeredis') is not None, "fakeredis is not installed")
+class SpendAccumulatorTest(TestCase):
+    """Test cases for the Redis write-behind spend accumulator."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        import fakeredis
+        from .accumulator import SpendAccumulator
+
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            status=CampaignStatus.ACTIVE
+        )
+        self.accumulator = SpendAccumulator(client=fakeredis.FakeRedis(), budget_ttl=60)
+        self.service = SpendingService(accumulator=self.accumulator)
+
+    def test_accumulate_spend_defers_database_writes(self) -> None:
+        """Test that accumulated spend stays in Redis until flushed."""
+        self.service.accumulate_spend(self.campaign, Decimal('1.25'))
+        result = self.service.accumulate_spend(self.campaign, Decimal('2.50'))
+
+        self.assertEqual(result['pending_amount'], 3.75)
+        self.assertFalse(result['flushed'])
+        self.assertEqual(Spend.objects.count(), 0)
+        self.assertEqual(self.accumulator.pending_amount(self.campaign.id), Decimal('3.75'))
+
+    def test_pending_amount_includes_batch_being_flushed(self) -> None:
+        """Test that spend added during a flush is checked against the in-flight batch too."""
+        self.accumulator.add(self.campaign.id, Decimal('60.00'), date(2024, 1, 15))
+        self.assertIsNotNone(self.accumulator.begin_flush(self.campaign.id))
+
+        pending = self.accumulator.add(self.campaign.id, Decimal('1.50'), date(2024, 1, 15))
+
+        self.assertEqual(pending, Decimal('61.50'))
+        self.assertEqual(self.accumulator.pending_amount(self.campaign.id), pending)
+
+    def test_flush_writes_spends_and_counters(self) -> None:
+        """Test that a flush writes one spend per date and increments counters."""
+        self.service.accumulate_spend(self.campaign, Decimal('1.25'))
+        self.service.accumulate_spend(self.campaign, Decimal('2.50'))
+        self.service.accumulate_spend(self.campaign, Decimal('4.00'), spend_date=date(2024, 1, 15))
+
+        results = self.service.flush_accumulated_spends()
+
+        self.assertEqual(results['campaigns'], 1)
+        self.assertEqual(results['spends'], 3)
+        self.assertEqual(Spend.objects.count(), 2)
+        self.assertEqual(Spend.objects.get(spend_date=date(2024, 1, 15)).amount, Decimal('4.00'))
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('7.75'))
+        self.assertEqual(self.accumulator.pending_amount(self.campaign.id), Decimal('0.00'))
+        self.assertEqual(self.accumulator.dirty_campaigns(), [])
+
+    def test_retried_flush_does_not_double_count(self) -> None:
+        """Test that a flush interrupted after commit is not applied twice."""
+        from unittest import mock
+
+        self.service.accumulate_spend(self.campaign, Decimal('5.00'))
+
+        with mock.patch.object(self.accumulator, 'complete_flush', side_effect=ConnectionError):
+            with self.assertRaises(ConnectionError):
+                self.service.flush_accumulated_spends()
+
+        # Spend that arrives while the in-flight batch is unacknowledged
+        self.service.accumulate_spend(self.campaign, Decimal('1.00'))
+
+        retry = self.service.flush_accumulated_spends()
+        self.assertEqual(retry['skipped'], 1)
+        self.service.flush_accumulated_spends()
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('6.00'))
+        self.assertEqual(Spend.objects.count(), 2)
+
+    def test_budget_crossing_flushes_and_pauses(self) -> None:
+        """Test that reaching the cached budget flushes and pauses immediately."""
+        self.service.accumulate_spend(self.campaign, Decimal('60.00'))
+        result = self.service.accumulate_spend(self.campaign, Decimal('40.00'))
+
+        self.assertTrue(result['flushed'])
+        self.assertTrue(result['daily_exceeded'])
+        self.assertEqual(result['status'], CampaignStatus.PAUSED)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, CampaignStatus.PAUSED)
+        self.assertEqual(self.campaign.daily_spend, Decimal('100.00'))
+
+    def test_brand_budget_change_applies_to_cached_state(self) -> None:
+        """Test that a lowered brand budget is enforced without waiting for the counters to expire."""
+        self.service.accumulate_spend(self.campaign, Decimal('10.00'))
+        self.brand.daily_budget = Decimal('50.00')
+        self.brand.save()
+
+        result = self.service.accumulate_spend(self.campaign, Decimal('40.00'))
+
+        self.assertTrue(result['flushed'])
+        self.assertEqual(result['status'], CampaignStatus.PAUSED)
+
+    def test_accumulate_spend_requires_accumulator(self) -> None:
+        """Test that accumulator mode must be configured."""
+        with self.assertRaises(RuntimeError):
+            SpendingService().accumulate_spend(self.campaign, Decimal('1.00'))
+
+
+class CounterReconciliationTest(TestCase):
+    """Test cases for reconciling spend counters with the spends table."""
+
+    def setUp(self) -> None:
+        """Set up campaigns with correctly tracked spends."""
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.service = SpendingService()
+        self.campaigns = []
+        for index in range(3):
+            campaign = Campaign.objects.create(brand=self.brand, name=f"Campaign {index}")
+            self.service.track_spend(campaign, Decimal('10.00'))
+            self.campaigns.append(campaign)
+
+    def test_repairs_drifted_counters(self) -> None:
+        """Test that drifted counters are found across chunks and repaired."""
+        from .reconciliation import CounterReconciler
+
+        Campaign.objects.filter(pk=self.campaigns[0].pk).update(daily_spend=Decimal('0.00'))
+        Campaign.objects.filter(pk=self.campaigns[1].pk).update(monthly_spend=Decimal('99.00'))
+
+        with self.assertLogs('spending.reconciliation', level='WARNING'):
+            results = CounterReconciler(chunk_size=1).run()
+
+        self.assertEqual(results['checked'], 3)
+        self.assertEqual(results['drifted'], 2)
+        self.assertEqual(results['repaired'], 2)
+        self.assertEqual(results['daily_drift'], 10.0)
+        self.assertEqual(results['monthly_drift'], 89.0)
+        self.assertEqual(results['max_drift'], 89.0)
+        for campaign in Campaign.objects.all():
+            self.assertEqual(campaign.daily_spend, Decimal('10.00'))
+            self.assertEqual(campaign.monthly_spend, Decimal('10.00'))
+
+        self.assertEqual(CounterReconciler().run()['drifted'], 0)
+
+    def test_dry_run_reports_only(self) -> None:
+        """Test that the command's dry run reports drift without repairing it."""
+        from django.core.management import call_command
+        from io import StringIO
+
+        Campaign.objects.filter(pk=self.campaigns[0].pk).update(daily_spend=Decimal('25.00'))
+
+        out = StringIO()
+        with self.assertLogs('spending.reconciliation', level='WARNING'):
+            call_command('reconcile_spends', '--dry-run', stdout=out)
+
+        self.assertIn('1 drifted, 0 repaired', out.getvalue())
+        self.assertEqual(Campaign.objects.get(pk=self.campaigns[0].pk).daily_spend, Decimal('25.00'))
+
+    def test_rollup_source_ignores_stale_counters(self) -> None:
+        """Test that a counter from an earlier day matches a day without spends."""
+        from .reconciliation import CounterReconciler
+
+        today = self.brand.local_date()
+        Campaign.objects.create(
+            brand=self.brand,
+            name="Stale Campaign",
+            daily_spend=Decimal('50.00'),
+            daily_period=today - timedelta(days=1),
+            monthly_period=today.replace(day=1)
+        )
+
+        results = CounterReconciler(source='rollups').run()
+
+        self.assertEqual(results['checked'], 4)
+        self.assertEqual(results['drifted'], 0)
+        with self.assertRaises(ValueError):
+            CounterReconciler(source='ledger')
+
+
+class PacingEngineTest(TestCase):
+    """Test cases for predictive budget pacing."""
+
+    def setUp(self) -> None:
+        """Set up a brand and an active campaign."""
+        self.brand = Brand.objects.create(
+            name="Pacing Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(brand=self.brand, name="Fast Campaign")
+
+    def test_velocity_converges_to_steady_rate(self) -> None:
+        """Test that a steady spend rate is estimated after a few windows."""
+        from django.utils import timezone
+        from .pacing import PacingEngine
+
+        engine = PacingEngine(window=60)
+        start = timezone.now()
+        for second in range(0, 600, 10):
+            engine.record_spend(self.campaign, Decimal('1.00'), start + timedelta(seconds=second))
+
+        rate = engine.velocity(self.campaign, start + timedelta(seconds=590))
+        self.assertAlmostEqual(rate, 0.1, delta=0.01)
+        self.assertLess(engine.velocity(self.campaign, start + timedelta(seconds=890)), rate / 100)
+
+    def test_track_spend_schedules_pause(self) -> None:
+        """Test that a spend projected to exhaust the budget soon queues a pause check."""
+        from unittest import mock
+        from .pacing import PacingEngine
+
+        service = SpendingService(pacing=PacingEngine(window=60, lookahead=300, lead=5))
+        with mock.patch('tasks.budget_tasks.pace_campaign_task.apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                service.track_spend(self.campaign, Decimal('90.00'))
+
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.kwargs['args'], [str(self.campaign.pk)])
+
+        summary = service.get_spending_summary(self.campaign)
+        self.assertIsNotNone(summary['projected_exhaustion_at'])
+
+    def test_replay_reduces_overspend(self) -> None:
+        """
+        Test the overspend of a replayed spend stream with pacing and with polling.
+
+        The stream's spends reach the counters without a per-spend budget
+        check (as with accumulated or bulk-loaded spends) and speed up over
+        time. Polling enforcement pauses at the first 5 minute poll after
+        the budget is reached; pacing pauses at its scheduled checks.
+        """
+        from datetime import timezone as dt_timezone
+        from django.core.cache import cache
+        from django.utils import timezone
+        from .pacing import PAUSE_KEY, PacingEngine
+
+        # Stay within today so the replay never crosses a budget day
+        start = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        stream = [
+            (start + timedelta(seconds=3 * index), Decimal('0.25') + Decimal('0.002') * index)
+            for index in range(400)
+        ]
+
+        spent = Decimal('0.00')
+        for moment, amount in stream:
+            spent += amount
+            if spent >= self.brand.daily_budget and (moment - start).total_seconds() % 300 < 3:
+                break
+        polling_overspend = spent - self.brand.daily_budget
+
+        engine = PacingEngine(window=60, lookahead=300, lead=5)
+        key = PAUSE_KEY.format('campaign', self.campaign.pk)
+        pending: Optional[datetime] = None
+        for moment, amount in stream:
+            while pending is not None and pending <= moment and self.campaign.is_active():
+                engine.apply_pause(self.campaign.pk, pending)
+                self.campaign.refresh_from_db()
+                next_check = cache.get(key)
+                pending = datetime.fromtimestamp(next_check, tz=dt_timezone.utc) if next_check else None
+            if not self.campaign.is_active():
+                break
+
+            self.campaign.add_spend(amount)
+            engine.record_spend(self.campaign, amount, moment)
+            scheduled = engine.schedule_pause(self.campaign, moment)
+            if scheduled is not None:
+                pending = scheduled
+        pacing_overspend = max(self.campaign.daily_spend - self.brand.daily_budget, Decimal('0.00'))
+
+        self.assertGreater(polling_overspend, Decimal('20.00'))
+        self.assertLess(pacing_overspend, polling_overspend / 10)
+        self.assertGreater(self.campaign.daily_spend, self.brand.daily_budget * Decimal('0.95'))
+        self.assertEqual(self.campaign.pause_reason, PauseReason.DAILY_BUDGET_EXCEEDED)
@@ -4,9 +4,10 @@ Views for spending app.
 
 from django.shortcuts import render, get_object_or_404
 from django.http import JsonResponse, HttpRequest
-from django.db.models import Sum, Avg, Count
+from django.db.models import Sum
 from datetime import date, timedelta
-from .models import Spend, SpendType
+from .models import Spend, SpendDailyRollup, SpendType
+from .partitions import month_bounds
 from .services import SpendingService
 from brands.models import Brand
 from campaigns.models import Campaign
@@ -16,26 +17,26 @@ from typing import Any
 def spending_dashboard(request: HttpRequest) -> Any:
     """Dashboard view for spending overview."""
     # Get spending statistics
-    total_spends = Spend.objects.count()
-    total_amount = Spend.objects.aggregate(total=Sum('amount'))['total'] or 0
+    rollups = SpendDailyRollup.objects.all()
+    total_spends = rollups.aggregate(count=Sum('spend_count'))['count'] or 0
+    total_amount = rollups.aggregate(total=Sum('amount'))['total'] or 0
     
     # Get today's spending
     today = date.today()
-    today_spends = Spend.objects.filter(spend_date=today)
+    today_spends = rollups.filter(spend_date=today)
     today_amount = today_spends.aggregate(total=Sum('amount'))['total'] or 0
     
     # Get this month's spending
-    current_month = today.month
-    current_year = today.year
-    month_spends = Spend.objects.filter(
-        spend_date__year=current_year,
-        spend_date__month=current_month
+    month_start, month_end = month_bounds(today.year, today.month)
+    month_spends = rollups.filter(
+        spend_date__gte=month_start,
+        spend_date__lt=month_end
     )
     month_amount = month_spends.aggregate(total=Sum('amount'))['total'] or 0
     
     # Get spending by type
-    daily_spends = Spend.objects.filter(spend_type=SpendType.DAILY)
-    monthly_spends = Spend.objects.filter(spend_type=SpendType.MONTHLY)
+    daily_spends = rollups.filter(spend_type=SpendType.DAILY)
+    monthly_spends = rollups.filter(spend_type=SpendType.MONTHLY)
     
     daily_amount = daily_spends.aggregate(total=Sum('amount'))['total'] or 0
     monthly_amount = monthly_spends.aggregate(total=Sum('amount'))['total'] or 0
@@ -45,7 +46,7 @@ def spending_dashboard(request: HttpRequest) -> Any:
     
     # Get top spending campaigns
     top_campaigns = Campaign.objects.annotate(
-        total_spend=Sum('spends__amount')
+        total_spend=Sum('daily_rollups__amount')
     ).filter(total_spend__isnull=False).order_by('-total_spend')[:5]
     
     context = {
@@ -70,16 +71,16 @@ def spending_analytics(request: HttpRequest) -> Any:
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
     
-    # Get spending data for the period
-    spends = Spend.objects.filter(
+    # Get spending data for the period from the daily rollup
+    spends = SpendDailyRollup.objects.filter(
         spend_date__gte=start_date,
         spend_date__lte=end_date
-    ).select_related('campaign__brand')
+    ).order_by()
     
     # Daily spending breakdown
     daily_breakdown = spends.values('spend_date').annotate(
         total=Sum('amount'),
-        count=Count('id')
+        count=Sum('spend_count')
     ).order_by('spend_date')
     
     # Spending by campaign
@@ -87,27 +88,29 @@ def spending_analytics(request: HttpRequest) -> Any:
         'campaign__name', 'campaign__brand__name'
     ).annotate(
         total=Sum('amount'),
-        count=Count('id')
+        count=Sum('spend_count')
     ).order_by('-total')
     
     # Spending by brand
     brand_breakdown = spends.values('campaign__brand__name').annotate(
         total=Sum('amount'),
-        count=Count('id')
+        count=Sum('spend_count')
     ).order_by('-total')
     
     # Spending by type
     type_breakdown = spends.values('spend_type').annotate(
         total=Sum('amount'),
-        count=Count('id')
+        count=Sum('spend_count')
     )
     
+    totals = spends.aggregate(total=Sum('amount'), count=Sum('spend_count'))
+    
     context = {
         'start_date': start_date,
         'end_date': end_date,
         'days': days,
-        'total_spends': spends.count(),
-        'total_amount': spends.aggregate(total=Sum('amount'))['total'] or 0,
+        'total_spends': totals['count'] or 0,
+        'total_amount': totals['total'] or 0,
         'daily_breakdown': daily_breakdown,
         'campaign_breakdown': campaign_breakdown,
         'brand_breakdown': brand_breakdown,
@@ -123,15 +126,17 @@ def campaign_spending_detail(request: HttpRequest, campaign_id: str) -> Any:
     
     # Get all spends for this campaign
     spends = campaign.spends.all().order_by('-spend_date')
+    rollups = campaign.daily_rollups.order_by()
     
     # Get spending statistics
-    total_spends = spends.count()
-    total_amount = spends.aggregate(total=Sum('amount'))['total'] or 0
-    avg_amount = spends.aggregate(avg=Avg('amount'))['avg'] or 0
+    totals = rollups.aggregate(total=Sum('amount'), count=Sum('spend_count'))
+    total_spends = totals['count'] or 0
+    total_amount = totals['total'] or 0
+    avg_amount = total_amount / total_spends if total_spends else 0
     
     # Get spending by type
-    daily_spends = spends.filter(spend_type=SpendType.DAILY)
-    monthly_spends = spends.filter(spend_type=SpendType.MONTHLY)
+    daily_spends = rollups.filter(spend_type=SpendType.DAILY)
+    monthly_spends = rollups.filter(spend_type=SpendType.MONTHLY)
     
     daily_amount = daily_spends.aggregate(total=Sum('amount'))['total'] or 0
     monthly_amount = monthly_spends.aggregate(total=Sum('amount'))['total'] or 0
@@ -139,11 +144,11 @@ def campaign_spending_detail(request: HttpRequest, campaign_id: str) -> Any:
     # Get spending by date (last 30 days)
     end_date = date.today()
     start_date = end_date - timedelta(days=30)
-    recent_spends = spends.filter(spend_date__gte=start_date)
+    recent_spends = rollups.filter(spend_date__gte=start_date)
     
     date_breakdown = recent_spends.values('spend_date').annotate(
         total=Sum('amount'),
-        count=Count('id')
+        count=Sum('spend_count')
     ).order_by('spend_date')
     
     context = {
@@ -165,30 +170,31 @@ def campaign_spending_detail(request: HttpRequest, campaign_id: str) -> Any:
 def spending_stats_api(request: HttpRequest) -> JsonResponse:
     """API endpoint for spending statistics."""
     # Get overall statistics
-    total_spends = Spend.objects.count()
-    total_amount = Spend.objects.aggregate(total=Sum('amount'))['total'] or 0
+    rollups = SpendDailyRollup.objects.all()
+    totals = rollups.aggregate(total=Sum('amount'), count=Sum('spend_count'))
+    total_spends = totals['count'] or 0
+    total_amount = totals['total'] or 0
     
     # Get today's statistics
     today = date.today()
-    today_spends = Spend.objects.filter(spend_date=today)
-    today_amount = today_spends.aggregate(total=Sum('amount'))['total'] or 0
-    today_count = today_spends.count()
+    today_totals = rollups.filter(spend_date=today).aggregate(total=Sum('amount'), count=Sum('spend_count'))
+    today_amount = today_totals['total'] or 0
+    today_count = today_totals['count'] or 0
     
     # Get this month's statistics
-    current_month = today.month
-    current_year = today.year
-    month_spends = Spend.objects.filter(
-        spend_date__year=current_year,
-        spend_date__month=current_month
-    )
-    month_amount = month_spends.aggregate(total=Sum('amount'))['total'] or 0
-    month_count = month_spends.count()
+    month_start, month_end = month_bounds(today.year, today.month)
+    month_totals = rollups.filter(
+        spend_date__gte=month_start,
+        spend_date__lt=month_end
+    ).aggregate(total=Sum('amount'), count=Sum('spend_count'))
+    month_amount = month_totals['total'] or 0
+    month_count = month_totals['count'] or 0
     
     # Get spending by type
-    daily_amount = Spend.objects.filter(spend_type=SpendType.DAILY).aggregate(
+    daily_amount = rollups.filter(spend_type=SpendType.DAILY).aggregate(
         total=Sum('amount')
     )['total'] or 0
-    monthly_amount = Spend.objects.filter(spend_type=SpendType.MONTHLY).aggregate(
+    monthly_amount = rollups.filter(spend_type=SpendType.MONTHLY).aggregate(
         total=Sum('amount')
     )['total'] or 0
     
@@ -3,16 +3,19 @@ Celery tasks for budget management system.
 """
 
 import logging
-from typing import Dict, Any, Optional
-from celery import shared_task
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from celery import chord, group, shared_task
+from django.conf import settings
 from django.utils import timezone
 from spending.services import SpendingService
 from scheduling.services import SchedulingService
+from .locks import lock_stats, singleton_task
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True)  # type: ignore[misc]
+@singleton_task()
 def enforce_budget_limits_task(self: Any) -> Dict[str, int]:
     """
     Celery task to enforce budget limits for all active campaigns.
@@ -39,12 +42,15 @@ def enforce_budget_limits_task(self: Any) -> Dict[str, int]:
 
 
 @shared_task(bind=True)  # type: ignore[misc]
+@singleton_task()
 def enforce_dayparting_task(self: Any) -> Dict[str, int]:
     """
     Celery task to enforce dayparting rules for all campaigns.
     
-    This task runs every minute to check if campaigns should be
-    active or paused based on their dayparting schedules.
+    Dayparting is applied by ``apply_dayparting_transitions_task`` as
+    schedule boundaries come due; this full scan is only a low-frequency
+    safety net (e.g. hourly) that also catches campaigns activated or
+    paused by hand.
     
     Returns:
         Dictionary with dayparting enforcement results
@@ -65,12 +71,142 @@ def enforce_dayparting_task(self: Any) -> Dict[str, int]:
 
 
 @shared_task(bind=True)  # type: ignore[misc]
+@singleton_task()
+def apply_dayparting_transitions_task(self: Any) -> Dict[str, Any]:
+    """
+    Celery task to apply due dayparting transitions.
+    
+    Only campaigns whose next schedule boundary has passed are flipped.
+    The task then schedules itself for the earliest remaining boundary, so
+    it runs when something changes rather than every minute. Schedule
+    edits wake it immediately.
+    
+    Returns:
+        Dictionary with transition results and the next wake-up time
+    """
+    from scheduling import transitions
+    
+    logger.info("Starting dayparting transitions task")
+    
+    try:
+        now = timezone.now()
+        transitions.release_wake(now)
+        results: Dict[str, Any] = dict(transitions.apply_due_transitions(now))
+        
+        next_due = transitions.next_due()
+        transitions.wake(next_due)
+        results['next_due'] = next_due.isoformat() if next_due else None
+        
+        logger.info(f"Dayparting transitions task completed: {results}")
+        return results
+        
+    except Exception as e:
+        logger.error(f"Error in dayparting transitions task: {e}")
+        # Retry the task with exponential backoff
+        raise self.retry(countdown=30, max_retries=3)
+
+
+@shared_task(bind=True)  # type: ignore[misc]
+def pace_campaign_task(self: Any, campaign_id: str) -> Dict[str, Any]:
+    """
+    Celery task to pause a campaign just before it exhausts its budget.
+    
+    Scheduled by the pacing engine with an ETA ahead of the campaign's
+    projected budget exhaustion. The projection is redone with the latest
+    spend velocity, so the task either pauses the campaign (or every
+    campaign of a brand enforcing its total) or schedules itself again.
+    
+    Args:
+        campaign_id: The campaign to check
+    
+    Returns:
+        Dictionary with the IDs of the paused campaigns
+    """
+    from spending.pacing import PacingEngine
+    
+    try:
+        paused = PacingEngine().apply_pause(campaign_id)
+        
+        results = {'campaign_id': campaign_id, 'paused': [str(paused_id) for paused_id in paused]}
+        logger.info(f"Pacing task completed: {results}")
+        return results
+        
+    except Exception as e:
+        logger.error(f"Error in pacing task for campaign {campaign_id}: {e}")
+        # Retry quickly, the pause is only useful before the budget runs out
+        raise self.retry(countdown=5, max_retries=3)
+
+
+@shared_task(bind=True)  # type: ignore[misc]
+@singleton_task()
+def rollover_budget_periods_task(self: Any) -> Dict[str, int]:
+    """
+    Celery task to reset spends of the timezones whose day or month rolled over.
+    
+    This task runs every 15 minutes. Each brand timezone is reset once,
+    shortly after its local midnight, which spreads the reset load across
+    the day instead of resetting every campaign at 00:00 server time.
+    
+    Returns:
+        Dictionary with reset results
+    """
+    logger.info("Starting budget period rollover task")
+    
+    try:
+        spending_service = SpendingService()
+        results = spending_service.reset_due_periods()
+        
+        logger.info(f"Budget period rollover task completed: {results}")
+        return results
+        
+    except Exception as e:
+        logger.error(f"Error in budget period rollover task: {e}")
+        # Retry the task with exponential backoff
+        raise self.retry(countdown=60, max_retries=3)
+
+
+@shared_task(bind=True)  # type: ignore[misc]
+@singleton_task()
+def reconcile_spend_counters_task(self: Any, repair: bool = True) -> Dict[str, Any]:
+    """
+    Celery task to reconcile campaign spend counters with the spends table.
+    
+    This task runs hourly. Counters that drifted from the true totals of
+    the current day and month are repaired in chunks and the drift is
+    reported.
+    
+    Args:
+        repair: Rewrite drifted counters; when False only report them
+    
+    Returns:
+        Dictionary with reconciliation results
+    """
+    logger.info("Starting spend counter reconciliation task")
+    
+    try:
+        from spending.reconciliation import CounterReconciler
+        
+        results = CounterReconciler(repair=repair).run()
+        
+        logger.info(f"Spend counter reconciliation task completed: {results}")
+        return results
+        
+    except Exception as e:
+        logger.error(f"Error in spend counter reconciliation task: {e}")
+        # Retry the task with exponential backoff
+        raise self.retry(countdown=300, max_retries=3)
+
+
+@shared_task(bind=True)  # type: ignore[misc]
+@singleton_task()
 def daily_reset_task(self: Any) -> Dict[str, int]:
     """
     Celery task to reset daily spends and reactivate eligible campaigns.
     
-    This task runs daily at 00:00 to reset all daily spend counters
-    and reactivate campaigns that were paused due to daily budget limits.
+    This task resets all daily spend counters at once, whatever the brand
+    timezone, and reactivates campaigns that were paused due to daily
+    budget limits. Schedule ``rollover_budget_periods_task`` instead to
+    reset each timezone at its own midnight.
     
     Returns:
         Dictionary with daily reset results
@@ -91,13 +227,15 @@ def daily_reset_task(self: Any) -> Dict[str, int]:
 
 
 @shared_task(bind=True)  # type: ignore[misc]
+@singleton_task()
 def monthly_reset_task(self: Any) -> Dict[str, int]:
     """
     Celery task to reset monthly spends and reactivate eligible campaigns.
     
-    This task runs monthly on the 1st day at 00:00 to reset all monthly
-    spend counters and reactivate campaigns that were paused due to
-    monthly budget limits.
+    This task resets all monthly spend counters at once, whatever the
+    brand timezone, and reactivates campaigns that were paused due to
+    monthly budget limits. Schedule ``rollover_budget_periods_task``
+    instead to reset each timezone when its own month starts.
     
     Returns:
         Dictionary with monthly reset results
@@ -117,15 +255,141 @@ def monthly_reset_task(self: Any) -> Dict[str, int]:
         raise self.retry(countdown=600, max_retries=3)
 
 
+# Periodic tasks, each run under a lease so runs never overlap
+PERIODIC_TASKS = (
+    'enforce_budget_limits_task',
+    'enforce_dayparting_task',
+    'apply_dayparting_transitions_task',
+    'rollover_budget_periods_task',
+    'reconcile_spend_counters_task',
+    'daily_reset_task',
+    'monthly_reset_task',
+    'flush_spend_accumulator_task',
+    'maintain_spend_partitions_task',
+    'health_check_task',
+)
+
+# Operations that can run sharded, each given the (index, count) of its shard
+SHARDED_OPERATIONS: Dict[str, Callable[[Tuple[int, int]], Dict[str, int]]] = {
+    'budget': lambda shard: SpendingService().enforce_budget_limits(shard=shard),
+    'dayparting': lambda shard: SchedulingService().enforce_dayparting(shard=shard),
+    'daily_reset': lambda shard: SpendingService().reset_daily_spends(shard=shard),
+    'monthly_reset': lambda shard: SpendingService().reset_monthly_spends(shard=shard),
+}
+
+
+@shared_task(bind=True)  # type: ignore[misc]
+def run_sharded_task(self: Any, operation: str, shards: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Celery task to fan an enforcement or reset operation out over shards.
+    
+    Campaigns are split into ``shards`` campaign ID ranges (defaults to
+    ``ENFORCEMENT_SHARDS``). One ``run_shard_task`` per range runs in a
+    ``group``, so the work spreads over the available workers, and
+    ``merge_shard_results_task`` adds up their results as the ``chord``
+    callback. Chords need a result backend, except in eager mode.
+    
+    Args:
+        operation: ``'budget'``, ``'dayparting'``, ``'daily_reset'`` or
+            ``'monthly_reset'``
+        shards: Number of shards
+    
+    Returns:
+        Dictionary with the operation, shard count and chord ID, plus the
+        merged results when tasks run eagerly
+    """
+    if operation not in SHARDED_OPERATIONS:
+        raise ValueError(f"Invalid sharded operation: {operation}")
+    
+    count = shards or settings.ENFORCEMENT_SHARDS
+    logger.info(f"Starting sharded {operation} task over {count} shards")
+    
+    try:
+        header = group(run_shard_task.s(operation, index, count) for index in range(count))
+        result = chord(header)(merge_shard_results_task.s(operation))
+        
+        results: Dict[str, Any] = {'operation': operation, 'shards': count, 'chord_id': result.id}
+        if self.app.conf.task_always_eager:
+            results['results'] = result.get(disable_sync_subtasks=False)
+        return results
+        
+    except Exception as e:
+        logger.error(f"Error in sharded {operation} task: {e}")
+        # Retry the task with exponential backoff
+        raise self.retry(countdown=60, max_retries=3)
+
+
 @shared_task(bind=True)  # type: ignore[misc]
-def track_spend_task(self: Any, campaign_id: str, amount: float, description: Optional[str] = None) -> Dict[str, Any]:
+@singleton_task(lambda self, operation, index, count: f'run_shard_task:{operation}:{index}:{count}')
+def run_shard_task(self: Any, operation: str, index: int, count: int) -> Dict[str, int]:
+    """
+    Celery task to run an operation on one shard of the campaigns.
+    
+    Args:
+        operation: Key of ``SHARDED_OPERATIONS``
+        index: Shard index, from 0 to ``count - 1``
+        count: Number of shards
+    
+    Returns:
+        The operation's results for the shard
+    """
+    try:
+        results = SHARDED_OPERATIONS[operation]((index, count))
+        
+        logger.info(f"Shard {index + 1}/{count} of {operation} completed: {results}")
+        return results
+        
+    except Exception as e:
+        logger.error(f"Error in shard {index + 1}/{count} of {operation}: {e}")
+        # Retry the task with exponential backoff
+        raise self.retry(countdown=30, max_retries=3)
+
+
+@shared_task  # type: ignore[misc]
+def merge_shard_results_task(shard_results: List[Dict[str, int]], operation: str) -> Dict[str, int]:
+    """
+    Celery task to add up the results of every shard of an operation.
+    
+    Args:
+        shard_results: Results of each ``run_shard_task``
+        operation: The operation that ran
+    
+    Returns:
+        The summed results
+    """
+    merged: Dict[str, int] = {}
+    for results in shard_results:
+        if results.get('skipped'):
+            # A previous run of this shard still holds its lease
+            merged['skipped_shards'] = merged.get('skipped_shards', 0) + 1
+            continue
+        for key, value in results.items():
+            merged[key] = merged.get(key, 0) + value
+    
+    logger.info(f"Sharded {operation} completed over {len(shard_results)} shards: {merged}")
+    return merged
+
+
+@shared_task(bind=True)  # type: ignore[misc]
+def track_spend_task(
+    self: Any,
+    campaign_id: str,
+    amount: float,
+    description: Optional[str] = None,
+    external_id: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Celery task to track a new spend for a campaign.
     
+    Accumulated spends are flushed as one row per date, so spends with a
+    description or external ID bypass the accumulator to keep them.
+    
     Args:
         campaign_id: UUID of the campaign
         amount: Amount spent (as float, will be converted to Decimal)
         description: Optional description of the spend
+        external_id: Optional idempotency key; redelivered spends with the
+            same key are skipped
         
     Returns:
         Dictionary with spend tracking results
@@ -142,12 +406,31 @@ def track_spend_task(self: Any, campaign_id: str, amount: float, description: Op
         except Campaign.DoesNotExist:
             raise ValueError(f"Campaign with ID {campaign_id} does not exist")
         
-        # Track the spend
         spending_service = SpendingService()
+
+        # In accumulator mode the spend is written behind via Redis
+        if spending_service.accumulator is not None and not external_id and not description:
+            accumulated = spending_service.accumulate_spend(
+                campaign=campaign,
+                amount=Decimal(str(amount))
+            )
+            results = {
+                'success': True,
+                'accumulated': True,
+                'campaign_id': str(campaign.id),
+                'amount': amount,
+                'pending_amount': accumulated['pending_amount'],
+                'flushed': accumulated['flushed']
+            }
+            logger.info(f"Spend tracking task completed: {results}")
+            return results
+
+        # Track the spend
         spend = spending_service.track_spend(
             campaign=campaign,
             amount=Decimal(str(amount)),
-            description=description
+            description=description,
+            external_id=external_id
         )
         
         results = {
@@ -155,7 +438,8 @@ def track_spend_task(self: Any, campaign_id: str, amount: float, description: Op
             'spend_id': str(spend.id),
             'campaign_id': str(campaign.id),
             'amount': float(spend.amount),
-            'spend_date': spend.spend_date.isoformat()
+            'spend_date': spend.spend_date.isoformat(),
+            'duplicate': spend.duplicate
         }
         
         logger.info(f"Spend tracking task completed: {results}")
@@ -173,6 +457,198 @@ def track_spend_task(self: Any, campaign_id: str, amount: float, description: Op
 
 
 @shared_task(bind=True)  # type: ignore[misc]
+def track_spend_batch_task(self: Any, spends: List[Dict[str, Any]], chunk_size: int = 500) -> Dict[str, Any]:
+    """
+    Celery task to track a batch of spends in one message.
+
+    Items are validated individually, grouped by campaign and applied in
+    chunks, each chunk in its own transaction via
+    ``SpendingService.track_spends_bulk``. A failing chunk only fails its
+    own items.
+
+    Args:
+        spends: Spend dictionaries with ``campaign_id`` and ``amount`` keys and
+            optional ``description``, ``spend_date`` (ISO format) and
+            ``external_id`` (redelivered spends are reported as duplicates)
+        chunk_size: Maximum number of spends applied per transaction
+
+    Returns:
+        Dictionary with batch totals and per-item results in input order
+    """
+    logger.info(f"Starting batch spend tracking task for {len(spends)} spends")
+
+    from decimal import Decimal, InvalidOperation
+    from datetime import date
+    import uuid
+    from campaigns.models import Campaign
+
+    results: List[Dict[str, Any]] = [{} for _ in spends]
+    by_campaign: Dict[uuid.UUID, List[int]] = {}
+    entries: Dict[int, Dict[str, Any]] = {}
+
+    for index, item in enumerate(spends):
+        try:
+            campaign_id = uuid.UUID(str(item['campaign_id']))
+            amount = Decimal(str(item['amount']))
+            if amount <= Decimal('0.00'):
+                raise ValueError("Spend amount must be positive")
+            spend_date = date.fromisoformat(item['spend_date']) if item.get('spend_date') else None
+        except (KeyError, TypeError, ValueError, InvalidOperation) as e:
+            results[index] = _batch_item_failure(item, e)
+            continue
+
+        entries[index] = {
+            'campaign_id': campaign_id,
+            'amount': amount,
+            'spend_date': spend_date,
+            'description': item.get('description'),
+            'external_id': item.get('external_id') or None,
+        }
+        by_campaign.setdefault(campaign_id, []).append(index)
+
+    # Resolve all campaigns with a single query
+    existing = set(Campaign.objects.filter(id__in=list(by_campaign)).values_list('id', flat=True))
+    for campaign_id in [campaign_id for campaign_id in by_campaign if campaign_id not in existing]:
+        for index in by_campaign.pop(campaign_id):
+            error = ValueError(f"Campaign with ID {campaign_id} does not exist")
+            results[index] = _batch_item_failure(spends[index], error)
+
+    # Build chunks of whole campaigns so each campaign is updated once per chunk
+    chunks: List[List[int]] = [[]]
+    for indexes in by_campaign.values():
+        if chunks[-1] and len(chunks[-1]) + len(indexes) > chunk_size:
+            chunks.append([])
+        chunks[-1].extend(indexes)
+
+    spending_service = SpendingService()
+    for chunk in chunks:
+        if not chunk:
+            continue
+        try:
+            created = spending_service.track_spends_bulk([entries[index] for index in chunk])
+        except Exception as e:
+            logger.error(f"Error in batch spend tracking chunk: {e}")
+            for index in chunk:
+                results[index] = _batch_item_failure(spends[index], e)
+            continue
+
+        # Match inserted rows back to items; keyed items that were not
+        # inserted are redeliveries
+        inserted = {spend.external_id: spend for spend in created if spend.external_id}
+        unkeyed = iter([spend for spend in created if not spend.external_id])
+        for index in chunk:
+            external_id = entries[index]['external_id']
+            if external_id and external_id not in inserted:
+                results[index] = {
+                    'success': True,
+                    'duplicate': True,
+                    'external_id': external_id,
+                    'campaign_id': str(entries[index]['campaign_id']),
+                    'amount': float(entries[index]['amount'])
+                }
+                continue
+
+            spend = inserted.pop(external_id) if external_id else next(unkeyed)
+            results[index] = {
+                'success': True,
+                'duplicate': False,
+                'spend_id': str(spend.id),
+                'campaign_id': str(spend.campaign_id),
+                'amount': float(spend.amount),
+                'spend_date': spend.spend_date.isoformat()
+            }
+
+    succeeded = sum(1 for result in results if result['success'])
+    summary = {
+        'success': succeeded == len(spends),
+        'processed': len(spends),
+        'succeeded': succeeded,
+        'failed': len(spends) - succeeded,
+        'results': results
+    }
+
+    logger.info(
+        f"Batch spend tracking task completed: {summary['succeeded']} succeeded, "
+        f"{summary['failed']} failed"
+    )
+    return summary
+
+
+def _batch_item_failure(item: Any, error: Exception) -> Dict[str, Any]:
+    """Build the per-item result for a spend that could not be tracked."""
+    item = item if isinstance(item, dict) else {}
+    return {
+        'success': False,
+        'error': str(error),
+        'campaign_id': item.get('campaign_id'),
+        'amount': item.get('amount')
+    }
+
+
+@shared_task(bind=True)  # type: ignore[misc]
+@singleton_task()
+def flush_spend_accumulator_task(self: Any) -> Dict[str, int]:
+    """
+    Celery task to flush spend accumulated in Redis to the database.
+
+    This task runs every few seconds when ``SPEND_ACCUMULATOR_ENABLED`` is
+    set. Flushes are idempotent, so retries never double count spend.
+
+    Returns:
+        Dictionary with flush results
+    """
+    logger.info("Starting spend accumulator flush task")
+
+    try:
+        spending_service = SpendingService()
+        if spending_service.accumulator is None:
+            return {'campaigns': 0, 'spends': 0, 'skipped': 0, 'errors': 0}
+
+        results = spending_service.flush_accumulated_spends()
+
+        logger.info(f"Spend accumulator flush task completed: {results}")
+        return results
+
+    except Exception as e:
+        logger.error(f"Error in spend accumulator flush task: {e}")
+        # Retry the task with exponential backoff
+        raise self.retry(countdown=10, max_retries=3)
+
+
+@shared_task(bind=True)  # type: ignore[misc]
+@singleton_task()
+def maintain_spend_partitions_task(self: Any) -> Dict[str, List[str]]:
+    """
+    Celery task to maintain the monthly partitions of the spends table.
+
+    This task runs daily to pre-create partitions for the coming months and
+    detach partitions older than the retention window. It does nothing
+    unless the spends table is partitioned (PostgreSQL).
+
+    Returns:
+        Dictionary with created and detached partition names
+    """
+    logger.info("Starting spend partition maintenance task")
+
+    try:
+        from spending import partitions
+
+        results = {
+            'created': partitions.ensure_partitions(),
+            'detached': partitions.detach_old_partitions()
+        }
+
+        logger.info(f"Spend partition maintenance task completed: {results}")
+        return results
+
+    except Exception as e:
+        logger.error(f"Error in spend partition maintenance task: {e}")
+        # Retry the task with exponential backoff
+        raise self.retry(countdown=300, max_retries=3)
+
+
+@shared_task(bind=True)  # type: ignore[misc]
+@singleton_task()
 def health_check_task(self: Any) -> Dict[str, Any]:
     """
     Celery task to perform system health check.
@@ -232,6 +708,27 @@ def health_check_task(self: Any) -> Dict[str, Any]:
             }
             health_results['status'] = 'unhealthy'
         
+        # Report skipped runs of the periodic tasks
+        health_results['checks']['task_locks'] = {
+            'status': 'healthy',
+            **lock_stats(PERIODIC_TASKS)
+        }
+        
+        # Check the budget state cache
+        try:
+            from campaigns import budget_cache
+            
+            health_results['checks']['budget_cache'] = {
+                'status': 'healthy',
+                **budget_cache.cache_stats()
+            }
+        except Exception as e:
+            health_results['checks']['budget_cache'] = {
+                'status': 'unhealthy',
+                'error': str(e)
+            }
+            health_results['status'] = 'unhealthy'
+        
         # Check services
         try:
             spending_service = SpendingService()
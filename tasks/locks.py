@@ -0,0 +1,276 @@
+"""
+Lease locks that keep periodic tasks from overlapping.
+
+Beat starts a periodic task on schedule whether or not its previous run has
+finished, and several beat or worker nodes may start the same task. Each
+periodic task therefore runs under a named lease: a run that cannot take
+the lease is skipped (and counted), and a running task renews its lease in
+the background so long runs keep it. A lease that is not renewed, because
+the worker died, lapses after its TTL and the next run takes it over.
+
+Leases live in Redis (``SET NX PX``) with ``TASK_LOCK_BACKEND=redis``, or in
+the ``task_leases`` table otherwise, which works on any database shared by
+the nodes.
+"""
+
+import functools
+import logging
+import threading
+import uuid
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Union, cast
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from .models import TaskLease
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'task-lock:{}'
+
+STATS_KEY = 'task-lock:stats:{}:{}'
+
+# Outcomes counted per task, as reported by lock_stats()
+OUTCOMES = ('acquired', 'skipped', 'lost')
+
+
+class LeaseLock:
+    """
+    A named lease held by one owner until it is released or expires.
+
+    Subclasses store the lease; every holder has its own random token, so a
+    holder whose lease lapsed and was taken over can neither renew nor
+    release the new holder's lease.
+    """
+
+    def __init__(self, name: str, ttl: float) -> None:
+        """
+        Initialize the lock.
+
+        Args:
+            name: Name of the lease
+            ttl: Seconds the lease lasts without being renewed
+        """
+        self.name = name
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+
+    def acquire(self) -> bool:
+        """Take the lease if it is free or lapsed."""
+        raise NotImplementedError
+
+    def renew(self) -> bool:
+        """Extend the lease by its TTL; False if it is no longer held."""
+        raise NotImplementedError
+
+    def release(self) -> None:
+        """Give the lease up if it is still held."""
+        raise NotImplementedError
+
+
+class RedisLeaseLock(LeaseLock):
+    """Lease stored as a Redis key set with ``NX PX``."""
+
+    def __init__(self, name: str, ttl: float, client: Optional[Any] = None) -> None:
+        """
+        Initialize the lock.
+
+        Args:
+            name: Name of the lease
+            ttl: Seconds the lease lasts without being renewed
+            client: Redis client (defaults to one built from ``REDIS_URL``)
+        """
+        super().__init__(name, ttl)
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(settings.REDIS_URL)
+        self.client = client
+        self.key = LOCK_KEY.format(name)
+
+    def acquire(self) -> bool:
+        return bool(self.client.set(self.key, self.token, nx=True, px=int(self.ttl * 1000)))
+
+    def _if_held(self, action: Callable[[Any], None]) -> bool:
+        """Apply an action to the key in a transaction if this lock still holds it."""
+        import redis
+
+        with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    pipe.watch(self.key)
+                    # Watched pipelines run commands immediately, returning the bytes value
+                    owner = cast(Optional[bytes], pipe.get(self.key))
+                    if owner is None or owner.decode() != self.token:
+                        pipe.reset()
+                        return False
+                    pipe.multi()
+                    action(pipe)
+                    pipe.execute()
+                    return True
+                except redis.WatchError:
+                    # The lease changed hands meanwhile; re-check
+                    continue
+
+    def renew(self) -> bool:
+        return self._if_held(lambda pipe: pipe.pexpire(self.key, int(self.ttl * 1000)))
+
+    def release(self) -> None:
+        self._if_held(lambda pipe: pipe.delete(self.key))
+
+
+class DatabaseLeaseLock(LeaseLock):
+    """Lease stored as a ``TaskLease`` row."""
+
+    def acquire(self) -> bool:
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=self.ttl)
+        try:
+            with transaction.atomic():
+                _, created = TaskLease.objects.get_or_create(
+                    name=self.name,
+                    defaults={'owner': self.token, 'expires_at': expires_at, 'acquired_at': now}
+                )
+        except IntegrityError:
+            created = False
+        if created:
+            return True
+
+        # Take over a lapsed lease; only one contender's UPDATE matches
+        return TaskLease.objects.filter(name=self.name, expires_at__lte=now).update(
+            owner=self.token,
+            expires_at=expires_at,
+            acquired_at=now
+        ) == 1
+
+    def renew(self) -> bool:
+        return TaskLease.objects.filter(name=self.name, owner=self.token).update(
+            expires_at=timezone.now() + timedelta(seconds=self.ttl)
+        ) == 1
+
+    def release(self) -> None:
+        TaskLease.objects.filter(name=self.name, owner=self.token).delete()
+
+
+def get_lock(name: str, ttl: Optional[float] = None) -> LeaseLock:
+    """
+    Build the lock of a task with the configured backend.
+
+    Args:
+        name: Name of the lease
+        ttl: Seconds the lease lasts without being renewed (defaults to
+            ``TASK_LOCK_TTL``)
+    """
+    ttl = ttl if ttl is not None else settings.TASK_LOCK_TTL
+    if settings.TASK_LOCK_BACKEND == 'redis':
+        return RedisLeaseLock(name, ttl)
+    return DatabaseLeaseLock(name, ttl)
+
+
+class LeaseRenewer:
+    """Renew a held lease from a background thread until stopped."""
+
+    def __init__(self, lock: LeaseLock, interval: Optional[float] = None) -> None:
+        """
+        Initialize the renewer.
+
+        Args:
+            lock: The held lock
+            interval: Seconds between renewals (defaults to a third of the TTL)
+        """
+        self.lock = lock
+        self.interval = interval if interval is not None else lock.ttl / 3
+        self.lost = False
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'lease-renewer-{lock.name}', daemon=True)
+
+    def _run(self) -> None:
+        try:
+            while not self._stopped.wait(self.interval):
+                if not self.lock.renew():
+                    self.lost = True
+                    _record(self.lock.name, 'lost')
+                    logger.warning(f"Lost the lease of task {self.lock.name} while it was running")
+                    return
+        except Exception as e:
+            logger.error(f"Error renewing the lease of task {self.lock.name}: {e}")
+        finally:
+            # The thread's own database connection is not closed by a request cycle
+            connection.close()
+
+    def __enter__(self) -> 'LeaseRenewer':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+
+def _record(name: str, outcome: str) -> None:
+    """Count an outcome of a locked task run."""
+    key = STATS_KEY.format(name, outcome)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def singleton_task(
+    name: Optional[Union[str, Callable[..., str]]] = None,
+    ttl: Optional[float] = None
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Run a task function under a lease so runs never overlap.
+
+    A run that cannot take the lease is skipped: it logs, counts the skip
+    and returns ``{'skipped': True, 'task': name}`` without running the
+    function. The lease is renewed in the background while the function
+    runs and released when it returns or raises. Apply it below
+    ``@shared_task``.
+
+    Args:
+        name: Lease name, or a function of the task's arguments returning
+            it (defaults to the function's name)
+        ttl: Seconds the lease lasts without being renewed (defaults to
+            ``TASK_LOCK_TTL``)
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            lock_name = name(*args, **kwargs) if callable(name) else name or func.__name__
+            lock = get_lock(lock_name, ttl)
+            if not lock.acquire():
+                _record(lock_name, 'skipped')
+                logger.warning(f"Skipped task {lock_name}: a previous run still holds its lease")
+                return {'skipped': True, 'task': lock_name}
+
+            _record(lock_name, 'acquired')
+            try:
+                with LeaseRenewer(lock):
+                    return func(*args, **kwargs)
+            finally:
+                lock.release()
+
+        return wrapper
+
+    return decorator
+
+
+def lock_stats(names: Any) -> Dict[str, Dict[str, int]]:
+    """
+    Get how often locked tasks ran, were skipped and lost their lease.
+
+    Args:
+        names: Lease names to report
+
+    Returns:
+        Mapping of lease name to its count of each outcome
+    """
+    keys = [STATS_KEY.format(name, outcome) for name in names for outcome in OUTCOMES]
+    counts = cache.get_many(keys)
+    return {
+        name: {outcome: counts.get(STATS_KEY.format(name, outcome), 0) for outcome in OUTCOMES}
+        for name in names
+    }
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskLease',
+            fields=[
+                ('name', models.CharField(help_text='Name of the locked task', max_length=100, primary_key=True, serialize=False)),
+                ('owner', models.CharField(help_text='Token of the run holding the lease', max_length=64)),
+                ('expires_at', models.DateTimeField(help_text='When the lease lapses unless renewed')),
+                ('acquired_at', models.DateTimeField(help_text='When the current holder acquired the lease')),
+            ],
+            options={
+                'verbose_name': 'Task Lease',
+                'verbose_name_plural': 'Task Leases',
+                'db_table': 'task_leases',
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+"""
+Task models for budget management system.
+"""
+
+from django.db import models
+
+
+class TaskLease(models.Model):
+    """
+    Lease held by the one running instance of a periodic task.
+
+    Used by the database lock backend. A lease past ``expires_at`` belongs
+    to a run that died without releasing it and can be taken over.
+    """
+
+    name: models.CharField = models.CharField(
+        max_length=100,
+        primary_key=True,
+        help_text="Name of the locked task"
+    )
+
+    owner: models.CharField = models.CharField(
+        max_length=64,
+        help_text="Token of the run holding the lease"
+    )
+
+    expires_at: models.DateTimeField = models.DateTimeField(
+        help_text="When the lease lapses unless renewed"
+    )
+
+    acquired_at: models.DateTimeField = models.DateTimeField(
+        help_text="When the current holder acquired the lease"
+    )
+
+    class Meta:
+        db_table = 'task_leases'
+        verbose_name = 'Task Lease'
+        verbose_name_plural = 'Task Leases'
+
+    def __str__(self) -> str:
+        return f"{self.name} held until {self.expires_at}"
@@ -0,0 +1,134 @@
+"""
+Client-side buffer that coalesces spends into batch Celery messages.
+"""
+
+import logging
+import threading
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class SpendBuffer:
+    """
+    Buffer spends in memory and send them as ``track_spend_batch_task`` messages.
+
+    The buffer is flushed when it holds ``max_size`` spends or when the
+    oldest buffered spend has waited ``max_wait`` seconds, whichever comes
+    first. It is thread-safe and can be used as a context manager, which
+    flushes any remaining spends on exit.
+
+    Example:
+        with SpendBuffer(max_size=500, max_wait=1.0) as buffer:
+            for event in events:
+                buffer.add(event.campaign_id, event.amount)
+    """
+
+    def __init__(
+        self,
+        max_size: int = 500,
+        max_wait: float = 1.0,
+        send: Optional[Callable[[List[Dict[str, Any]]], Any]] = None
+    ) -> None:
+        """
+        Initialize the spend buffer.
+
+        Args:
+            max_size: Number of buffered spends that triggers a flush
+            max_wait: Seconds the oldest buffered spend may wait before a flush
+            send: Callable receiving each batch (defaults to enqueueing
+                ``track_spend_batch_task``)
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._send = send or self._enqueue
+        self._items: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def __enter__(self) -> 'SpendBuffer':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def add(
+        self,
+        campaign_id: Any,
+        amount: Union[Decimal, float, str],
+        description: Optional[str] = None,
+        spend_date: Optional[date] = None
+    ) -> Optional[Any]:
+        """
+        Buffer a spend, flushing if the buffer is full.
+
+        Args:
+            campaign_id: UUID of the campaign
+            amount: Amount spent (sent as a decimal string to keep precision)
+            description: Optional description of the spend
+            spend_date: Optional date of the spend (defaults to today on the worker)
+
+        Returns:
+            The result of sending the batch if this spend triggered a flush
+        """
+        item: Dict[str, Any] = {
+            'campaign_id': str(campaign_id),
+            'amount': str(amount),
+            'description': description,
+        }
+        if spend_date is not None:
+            item['spend_date'] = spend_date.isoformat()
+
+        with self._lock:
+            self._items.append(item)
+            if len(self._items) >= self.max_size:
+                batch = self._take_locked()
+            else:
+                batch = None
+                if self._timer is None:
+                    self._timer = threading.Timer(self.max_wait, self.flush)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+        return self._send(batch) if batch else None
+
+    def flush(self) -> Optional[Any]:
+        """
+        Send all buffered spends as one batch.
+
+        Returns:
+            The result of sending the batch, or None if the buffer was empty
+        """
+        with self._lock:
+            batch = self._take_locked()
+
+        return self._send(batch) if batch else None
+
+    def close(self) -> None:
+        """Flush remaining spends and stop the flush timer."""
+        self.flush()
+
+    def _take_locked(self) -> List[Dict[str, Any]]:
+        """Take the buffered items and cancel the pending timer (lock must be held)."""
+        batch, self._items = self._items, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    @staticmethod
+    def _enqueue(batch: List[Dict[str, Any]]) -> Any:
+        """Send a batch to the Celery batch tracking task."""
+        from tasks.budget_tasks import track_spend_batch_task
+
+        logger.info(f"Flushing {len(batch)} buffered spends")
+        return track_spend_batch_task.delay(batch)
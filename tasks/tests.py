@@ -0,0 +1,300 @@
+"""
+Unit tests for tasks app.
+"""
+
+import threading
+import time
+import uuid
+from decimal import Decimal
+from typing import Any, Dict, List
+from django.test import TestCase
+from django.utils import timezone
+from brands.models import Brand
+from campaigns.models import Campaign, CampaignStatus
+from spending.models import Spend
+from .budget_tasks import track_spend_batch_task
+from .spend_buffer import SpendBuffer
+
+
+class TrackSpendBatchTaskTest(TestCase):
+    """Test cases for track_spend_batch_task."""
+
+    def setUp(self) -> None:
+        """Set up test data."""
+        self.brand = Brand.objects.create(
+            name="Test Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        self.campaign = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign",
+            status=CampaignStatus.ACTIVE
+        )
+        self.campaign2 = Campaign.objects.create(
+            brand=self.brand,
+            name="Test Campaign 2",
+            status=CampaignStatus.ACTIVE
+        )
+
+    def test_batch_applies_increments(self) -> None:
+        """Test that a batch creates spends and increments counters per campaign."""
+        result = track_spend_batch_task([
+            {'campaign_id': str(self.campaign.id), 'amount': 10.0},
+            {'campaign_id': str(self.campaign2.id), 'amount': '2.50', 'spend_date': '2024-01-15'},
+            {'campaign_id': str(self.campaign.id), 'amount': '5.00', 'description': "Exchange A"},
+        ])
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['succeeded'], 3)
+        self.assertEqual([item['campaign_id'] for item in result['results']], [
+            str(self.campaign.id), str(self.campaign2.id), str(self.campaign.id)
+        ])
+        self.assertEqual(result['results'][1]['spend_date'], '2024-01-15')
+
+        self.campaign.refresh_from_db()
+        self.campaign2.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('15.00'))
+        self.assertEqual(self.campaign2.daily_spend, Decimal('2.50'))
+
+    def test_described_spend_bypasses_accumulator(self) -> None:
+        """Test that accumulator mode writes a described spend directly, keeping its description."""
+        from unittest import mock
+        import fakeredis
+        from django.test import override_settings
+        from .budget_tasks import track_spend_task
+
+        with override_settings(SPEND_ACCUMULATOR_ENABLED=True), \
+                mock.patch('redis.Redis.from_url', return_value=fakeredis.FakeRedis()):
+            accumulated = track_spend_task(str(self.campaign.id), 1.0)
+            described = track_spend_task(str(self.campaign.id), 2.0, description="Exchange A")
+
+        self.assertTrue(accumulated['accumulated'])
+        self.assertNotIn('accumulated', described)
+        self.assertEqual(Spend.objects.get().description, "Exchange A")
+
+    def test_batch_reports_individual_failures(self) -> None:
+        """Test that invalid items fail individually without failing the batch."""
+        result = track_spend_batch_task([
+            {'campaign_id': str(self.campaign.id), 'amount': '10.00'},
+            {'campaign_id': str(uuid.uuid4()), 'amount': '10.00'},
+            {'campaign_id': str(self.campaign.id), 'amount': '-1.00'},
+            {'campaign_id': 'not-a-uuid', 'amount': '1.00'},
+            {'amount': '1.00'},
+        ])
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['succeeded'], 1)
+        self.assertEqual(result['failed'], 4)
+        self.assertEqual([item['success'] for item in result['results']], [True, False, False, False, False])
+        self.assertIn('does not exist', result['results'][1]['error'])
+        self.assertEqual(Spend.objects.count(), 1)
+
+    def test_batch_chunks_by_campaign(self) -> None:
+        """Test that small chunks still apply every spend exactly once."""
+        spends = [
+            {'campaign_id': str(campaign.id), 'amount': '1.00'}
+            for campaign in [self.campaign, self.campaign2] * 5
+        ]
+
+        result = track_spend_batch_task(spends, chunk_size=3)
+
+        self.assertEqual(result['succeeded'], 10)
+        self.campaign.refresh_from_db()
+        self.campaign2.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('5.00'))
+        self.assertEqual(self.campaign2.daily_spend, Decimal('5.00'))
+
+    def test_batch_reports_duplicates(self) -> None:
+        """Test that redelivered spends succeed as duplicates without being counted."""
+        spends = [
+            {'campaign_id': str(self.campaign.id), 'amount': '4.00', 'external_id': 'evt-1'},
+            {'campaign_id': str(self.campaign.id), 'amount': '1.00'},
+        ]
+        track_spend_batch_task(spends)
+
+        result = track_spend_batch_task(spends)
+
+        self.assertTrue(result['success'])
+        self.assertEqual([item['duplicate'] for item in result['results']], [True, False])
+        self.assertEqual(result['results'][0]['external_id'], 'evt-1')
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('6.00'))
+
+
+class SpendBufferTest(TestCase):
+    """Test cases for SpendBuffer."""
+
+    def setUp(self) -> None:
+        """Set up a buffer that records sent batches."""
+        self.batches: List[List[Dict[str, Any]]] = []
+        self.sent = threading.Event()
+
+    def send(self, batch: List[Dict[str, Any]]) -> int:
+        self.batches.append(batch)
+        self.sent.set()
+        return len(batch)
+
+    def test_flushes_by_size(self) -> None:
+        """Test that the buffer flushes when it reaches max_size."""
+        buffer = SpendBuffer(max_size=3, max_wait=60, send=self.send)
+        campaign_id = uuid.uuid4()
+
+        self.assertIsNone(buffer.add(campaign_id, Decimal('1.10')))
+        self.assertIsNone(buffer.add(campaign_id, Decimal('2.20')))
+        self.assertEqual(buffer.add(campaign_id, Decimal('3.30')), 3)
+
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual([item['amount'] for item in self.batches[0]], ['1.10', '2.20', '3.30'])
+        self.assertEqual(len(buffer), 0)
+        buffer.close()
+
+    def test_flushes_by_time(self) -> None:
+        """Test that the buffer flushes once max_wait has elapsed."""
+        buffer = SpendBuffer(max_size=100, max_wait=0.05, send=self.send)
+        buffer.add(uuid.uuid4(), '1.00')
+
+        self.assertTrue(self.sent.wait(timeout=5))
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(buffer), 0)
+
+    def test_context_manager_flushes_remaining(self) -> None:
+        """Test that leaving the context flushes buffered spends."""
+        with SpendBuffer(max_size=100, max_wait=60, send=self.send) as buffer:
+            buffer.add(uuid.uuid4(), '1.00')
+            buffer.add(uuid.uuid4(), '2.00')
+
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(self.batches[0]), 2)
+
+    def test_empty_flush_sends_nothing(self) -> None:
+        """Test that flushing an empty buffer does not send a batch."""
+        buffer = SpendBuffer(send=self.send)
+        self.assertIsNone(buffer.flush())
+        self.assertEqual(self.batches, [])
+
+
+class ShardedEnforcementTest(TestCase):
+    """Test cases for fanning enforcement out over shards."""
+
+    def setUp(self) -> None:
+        """Set up campaigns over and under budget and run tasks eagerly."""
+        from budget_system.celery import app
+
+        self.app = app
+        self.eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+
+        self.brand = Brand.objects.create(
+            name="Sharded Brand",
+            daily_budget=Decimal('100.00'),
+            monthly_budget=Decimal('1000.00')
+        )
+        for index in range(12):
+            Campaign.objects.create(
+                brand=self.brand,
+                name=f"Campaign {index}",
+                daily_spend=Decimal('150.00') if index % 3 == 0 else Decimal('10.00')
+            )
+
+    def tearDown(self) -> None:
+        """Restore the eager setting."""
+        self.app.conf.task_always_eager = self.eager
+
+    def test_sharded_budget_enforcement_merges_results(self) -> None:
+        """Test that shard results add up to a whole enforcement run."""
+        from .budget_tasks import run_sharded_task
+
+        result = run_sharded_task.delay('budget', shards=4).get()
+
+        self.assertEqual(result['shards'], 4)
+        self.assertEqual(result['results'], {'checked': 12, 'paused_daily': 4, 'paused_monthly': 0, 'errors': 0})
+        self.assertEqual(Campaign.objects.filter(status=CampaignStatus.PAUSED).count(), 4)
+
+    def test_shard_task_only_touches_its_range(self) -> None:
+        """Test that one shard only checks the campaigns in its ID range."""
+        from campaigns.models import shard_bounds
+        from .budget_tasks import run_shard_task
+
+        lower, upper = shard_bounds(0, 2)
+        in_shard = Campaign.objects.filter(pk__lt=upper)
+
+        result = run_shard_task('budget', 0, 2)
+
+        self.assertEqual(result['checked'], in_shard.count())
+        self.assertFalse(Campaign.objects.filter(pk__gte=upper, status=CampaignStatus.PAUSED).exists())
+
+
+class TaskLockTest(TestCase):
+    """Test cases for the lease locks of periodic tasks."""
+
+    def test_database_lease(self) -> None:
+        """Test that a database lease is exclusive until released or lapsed."""
+        from .locks import DatabaseLeaseLock
+        from .models import TaskLease
+
+        first = DatabaseLeaseLock('test-lease', ttl=60)
+        second = DatabaseLeaseLock('test-lease', ttl=60)
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        self.assertFalse(second.renew())
+        self.assertTrue(first.renew())
+
+        second.release()
+        self.assertFalse(second.acquire())
+        first.release()
+        self.assertTrue(second.acquire())
+
+        # A lease whose holder died is taken over once it lapses
+        TaskLease.objects.filter(name='test-lease').update(expires_at=timezone.now())
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.renew())
+
+    def test_redis_lease(self) -> None:
+        """Test that a Redis lease is exclusive, renewable and expires."""
+        import time
+        import fakeredis
+        from .locks import RedisLeaseLock
+
+        client = fakeredis.FakeRedis()
+        first = RedisLeaseLock('test-lease', ttl=0.2, client=client)
+        second = RedisLeaseLock('test-lease', ttl=0.2, client=client)
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        self.assertTrue(first.renew())
+        second.release()
+        self.assertTrue(client.exists('task-lock:test-lease'))
+
+        time.sleep(0.3)
+        self.assertTrue(second.acquire())
+        self.assertFalse(first.renew())
+
+    def test_overlapping_run_is_skipped(self) -> None:
+        """Test that a periodic task is skipped and counted while its lease is held."""
+        from .budget_tasks import enforce_budget_limits_task
+        from .locks import DatabaseLeaseLock, lock_stats
+
+        before = lock_stats(['enforce_budget_limits_task'])['enforce_budget_limits_task']
+        held = DatabaseLeaseLock('enforce_budget_limits_task', ttl=60)
+        self.assertTrue(held.acquire())
+
+        self.assertEqual(enforce_budget_limits_task(), {'skipped': True, 'task': 'enforce_budget_limits_task'})
+
+        held.release()
+        self.assertEqual(enforce_budget_limits_task()['errors'], 0)
+        after = lock_stats(['enforce_budget_limits_task'])['enforce_budget_limits_task']
+        self.assertEqual(after['skipped'], before['skipped'] + 1)
+        self.assertEqual(after['acquired'], before['acquired'] + 1)
+
+    def test_long_run_renews_lease(self) -> None:
+        """Test that a held lease is renewed in the background."""
+        from unittest import mock
+        from .locks import LeaseLock, LeaseRenewer
+
+        lock = mock.Mock(spec=LeaseLock, ttl=0.03)
+        lock.name = 'long-task'
+        lock.renew.return_value = True
+        with LeaseRenewer(lock):
+            time.sleep(0.1)
+
+        self.assertGreaterEqual(lock.renew.call_count, 2)
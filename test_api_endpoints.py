@@ -413,6 +413,66 @@ class SpendAPITests(BaseAPITestCase):
         with self.assertRaises(Spend.DoesNotExist):
             Spend.objects.get(id=self.spend.id)
 
+    def test_bulk_create_spends(self):
+        """Test POST /api/spends/bulk/ - Ingest many spends at once."""
+        url = f'{self.base_url}/spends/bulk/'
+        data = [
+            {'campaign': str(self.campaign.id), 'amount': '10.00'},
+            {'campaign': str(self.campaign.id), 'amount': '5.00', 'description': 'Exchange B'},
+        ]
+
+        response = self.client.post(url, data, format='json')
+        self.assert_response_success(response, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['campaigns'], 1)
+
+        # Existing test spend (25.00) plus the bulk spends
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('40.00'))
+
+    def test_bulk_create_spends_validation_error(self):
+        """Test POST /api/spends/bulk/ - Validation errors."""
+        url = f'{self.base_url}/spends/bulk/'
+
+        # Invalid amount
+        response = self.client.post(url, [{'campaign': str(self.campaign.id), 'amount': '-1.00'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Unknown campaign
+        data = [{'campaign': '99999999-9999-9999-9999-999999999999', 'amount': '1.00'}]
+        response = self.client.post(url, data, format='json')
+        self.assert_response_error(response)
+        self.assertEqual(Spend.objects.count(), 1)
+
+    def test_create_spend_with_external_id_is_idempotent(self):
+        """Test POST /api/spends/ - Redelivered external_id is not counted twice."""
+        url = f'{self.base_url}/spends/'
+        data = {
+            'campaign': str(self.campaign.id),
+            'amount': '10.00',
+            'spend_date': date.today().isoformat(),
+            'external_id': 'exchange-evt-1'
+        }
+
+        response = self.client.post(url, data, format='json')
+        self.assert_response_success(response, status.HTTP_201_CREATED)
+        spend_id = response.data['id']
+
+        response = self.client.post(url, data, format='json')
+        self.assert_response_success(response, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], spend_id)
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.daily_spend, Decimal('35.00'))
+
+        # Bulk redelivery of the same event is skipped too
+        response = self.client.post(f'{url}bulk/', [{
+            'campaign': str(self.campaign.id), 'amount': '10.00', 'external_id': 'exchange-evt-1'
+        }], format='json')
+        self.assert_response_success(response, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(response.data['duplicates'], 1)
+
 
 class ScheduleAPITests(BaseAPITestCase):
     """Test Schedule API endpoints."""
@@ -468,16 +528,21 @@ class ScheduleAPITests(BaseAPITestCase):
         self.assertIn('campaign', response.data)
         self.assertIn('day_of_week', response.data)
         
-        # Test invalid time range (end before start)
+        # Test invalid time range (empty window)
         data = {
             'campaign': str(self.campaign.id),
             'day_of_week': DayOfWeek.MONDAY,
             'start_time': '18:00:00',
-            'end_time': '09:00:00',  # End before start
+            'end_time': '18:00:00',  # Same as start
             'is_active': True
         }
         response = self.client.post(url, data, format='json')
         self.assert_response_error(response)
+        
+        # End before start is an overnight window
+        data['end_time'] = '02:00:00'
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
     def test_retrieve_schedule(self):
         """Test GET /api/schedules/{id}/ - Retrieve specific schedule."""